@@ -7,27 +7,78 @@ JavaScript will make the site breathe. Python will make it think.
 The pantry is the heart. The shopping list is what makes everything beat.
 """
 
-from fastapi import FastAPI
+import time
+
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+import asyncio
 import logging
 import os
 from dotenv import load_dotenv
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Configure logging (handlers write from a background thread, see utils/log_queue.py)
+from utils.log_queue import configure_logging
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Startup: create the Supabase client and start the Redis supervisor.
+    Neither waits on the network - requests are served (from the
+    database) until Redis answers, and caching turns on by itself.
+
+    Recently active households are warmed in the background (warmup.py).
+    With WARMUP_WAIT_SECONDS set, startup waits for that first pass.
+
+    Shutdown: flush buffered shopping check-offs, stop the supervisor,
+    the warmup and the invalidation listener.
+    """
+    from utils.supabase_client import connect_supabase
+    from utils.redis_client import supervise_redis
+    from utils.invalidation import start_listener, stop_listener
+    from toggle_buffer import ShoppingToggleBuffer
+    from warmup import WARMUP_WAIT_SECONDS, run_warmups
+
+    await asyncio.to_thread(connect_supabase)
+    redis_task = asyncio.create_task(supervise_redis(), name="redis-supervisor")
+    # Other workers' invalidations (subscribes once Redis is up)
+    start_listener()
+
+    warmed = asyncio.Event()
+    warmup_task = asyncio.create_task(run_warmups(warmed), name="cache-warmup")
+    if WARMUP_WAIT_SECONDS > 0:
+        try:
+            await asyncio.wait_for(warmed.wait(), WARMUP_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            logger.info(f"Cache warmup still running after {WARMUP_WAIT_SECONDS:g} s - serving anyway")
+
+    app.state.startup_ms = round((time.perf_counter() - _import_started) * 1000, 1)
+    logger.info(f"🚀 Ready in {app.state.startup_ms} ms")
+
+    try:
+        yield
+    finally:
+        redis_task.cancel()
+        warmup_task.cancel()
+        stop_listener()
+        # Make sure buffered shopping check-offs reach the database
+        ShoppingToggleBuffer.flush_all()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="Chef's Kiss API",
     description="Python Age 5.0 - Complete backend rebuild",
-    version="5.0.0"
+    version="5.0.0",
+    lifespan=lifespan
 )
 app.router.redirect_slashes = False
 
@@ -58,12 +109,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Household-Id"],
+    expose_headers=["X-Household-Id", "Idempotent-Replayed", "ETag", "Server-Timing", "X-Profile-Id"],
 )
 
+# Opt-in sampling profiler (PROFILE_TOKEN; inside the timing middleware so it sees only the request)
+from utils.profiling import ProfilerMiddleware
+app.add_middleware(ProfilerMiddleware)
+
+# Per-request phase timings (Server-Timing header + one JSON log line)
+from utils.timing import ServerTimingMiddleware
+app.add_middleware(ServerTimingMiddleware)
+
+# Route latency histograms for /metrics
+from utils.metrics import MetricsMiddleware
+app.add_middleware(MetricsMiddleware)
+
 # Import routes (deferred after middleware setup)
 try:
-    from routes import auth, pantry, recipes, meal_plans, shopping_list, alerts, settings, households
+    from routes import auth, pantry, recipes, meal_plans, shopping_list, alerts, settings, households, batch, autocomplete
 except Exception as exc:
     # Defensive: if route import fails, log the error but keep the startup trace clear for the logs.
     logger.exception("Failed to import routes at startup. Check that backend routes exist and imports succeed.")
@@ -78,6 +141,8 @@ app.include_router(shopping_list.router)
 app.include_router(alerts.router)
 app.include_router(settings.router)
 app.include_router(households.router)
+app.include_router(batch.router)
+app.include_router(autocomplete.router)
 
 @app.get("/")
 async def root():
@@ -105,19 +170,19 @@ async def realtime_config():
 @app.get("/health")
 async def health():
     """Health check endpoint"""
-    from utils.supabase_client import supabase
-    import redis
+    from utils.supabase_client import get_supabase
 
     health_status = {
         "status": "healthy",
         "version": "5.0.0",
         "supabase": "unknown",
-        "redis": "unknown"
+        "redis": "unknown",
+        "startup_ms": getattr(app.state, "startup_ms", None)
     }
 
     # Check Supabase
     try:
-        supabase.table('households').select('id').limit(1).execute()
+        get_supabase().table('households').select('id').limit(1).execute()
         health_status["supabase"] = "connected"
     except Exception as e:
         health_status["supabase"] = f"error: {str(e)}"
@@ -125,7 +190,8 @@ async def health():
 
     # Check Redis
     try:
-        from state_manager import redis_client
+        from utils.redis_client import get_redis
+        redis_client = get_redis()
         if redis_client:
             redis_client.ping()
             health_status["redis"] = "connected"
@@ -135,9 +201,56 @@ async def health():
         health_status["redis"] = f"error: {str(e)}"
         health_status["status"] = "degraded"
 
+    # Last cache warmup pass in this worker (None until one has run)
+    from warmup import last_warmup
+    health_status["warmup"] = last_warmup
+
     return health_status
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """
+    Prometheus metrics (latency, cache, state and Supabase).
+
+    If METRICS_TOKEN is set, scrapers must send it as a bearer token.
+    """
+    from utils.metrics import CONTENT_TYPE, render
+
+    token = os.getenv("METRICS_TOKEN")
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return JSONResponse(status_code=401, content={"detail": "Invalid metrics token"})
+    return Response(content=render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/debug/profiles/{profile_id}", include_in_schema=False)
+async def download_profile(profile_id: str, request: Request, format: str = "folded"):
+    """
+    Download a request profile (see utils/profiling.py).
+
+    Collapsed stacks by default (feed to flamegraph.pl or speedscope);
+    ?format=json adds the request details.
+    """
+    from utils.profiling import PROFILE_TOKEN, is_admin_token, load_profile
+
+    if not PROFILE_TOKEN:
+        return JSONResponse(status_code=404, content={"detail": "Profiling is disabled"})
+    authorization = request.headers.get("Authorization", "")
+    if not is_admin_token(authorization.removeprefix("Bearer ")):
+        return JSONResponse(status_code=401, content={"detail": "Invalid profile token"})
+
+    record = load_profile(profile_id)
+    if record is None:
+        return JSONResponse(status_code=404, content={"detail": "Profile not found"})
+    if format == "json":
+        return record
+    return Response(
+        content=record["stacks"],
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'}
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
@@ -155,14 +268,18 @@ if __name__ == "__main__":
     import uvicorn
 
     port = int(os.getenv("PORT", 8000))
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    reload = os.getenv("ENVIRONMENT") == "development" and workers == 1
 
     logger.info("🚀 Starting Chef's Kiss Backend - Python Age 5.0")
     logger.info(f"📍 Port: {port}")
     logger.info(f"🌍 Environment: {os.getenv('ENVIRONMENT', 'development')}")
+    logger.info(f"👷 Workers: {workers}")
 
     uvicorn.run(
-        app,
+        "app:app" if workers > 1 or reload else app,
         host="0.0.0.0",
         port=port,
-        reload=os.getenv("ENVIRONMENT") == "development"
+        workers=workers,
+        reload=reload
     )
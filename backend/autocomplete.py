@@ -0,0 +1,243 @@
+"""
+Item Name Autocomplete - Python Age 5.0
+
+Prefix trie over every item name a household uses: pantry items,
+recipe ingredients, manual shopping items and recent purchases.
+
+Each name is scored by how often it shows up (pantry and shopping count
+more than a recipe mention) and how recently it was bought. Every trie
+node keeps its best suggestions precomputed, so a lookup is just a walk
+down len(q) nodes. Names are also reachable from later words
+("oil" finds "Olive Oil").
+
+Built lazily on the first lookup at a state version and reused until the
+state changes. Recent purchases are cached on their own for
+RECENT_PURCHASES_TTL: every shopping check-off bumps the state version,
+and typing while shopping shouldn't query Supabase each time.
+"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import re
+import threading
+import time
+import logging
+
+from utils.supabase_client import get_supabase
+from utils.log_queue import log_sampled
+from utils.invalidation import on_invalidate
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = re.compile(r"\s+")
+
+# How much one mention from each source is worth
+SOURCE_WEIGHTS = {
+    "pantry": 3.0,
+    "shopping": 2.0,
+    "recipe": 1.0,
+    "purchase": 2.0,
+}
+RECENCY_HALF_LIFE_DAYS = 14.0  # a purchase counts half as much after two weeks
+RECENT_PURCHASES_LIMIT = 500
+RECENT_PURCHASES_TTL = 600  # seconds
+SUGGESTIONS_PER_NODE = 10
+
+
+def normalize(text: str) -> str:
+    return WHITESPACE.sub(" ", text.strip().lower())
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.top: List[str] = []  # best names below this node, best first
+
+
+class AutocompleteIndex:
+    """Trie for one household at one state version."""
+
+    MAX_HOUSEHOLDS = 256
+
+    _indexes: "OrderedDict[str, AutocompleteIndex]" = OrderedDict()
+    _purchases: "OrderedDict[str, Tuple[float, List[dict]]]" = OrderedDict()  # household -> (loaded at, rows)
+    _lock = threading.Lock()
+
+    def __init__(self, version: int):
+        self.version = version
+        self.root = _Node()
+        self.scores: Dict[str, float] = {}
+        self.details: Dict[str, dict] = {}  # normalized name -> display name, unit, category
+
+    @classmethod
+    def for_state(cls, state) -> "AutocompleteIndex":
+        """
+        Get the trie for a household state, building it if the state changed.
+
+        Args:
+            state: HouseholdState
+
+        Returns:
+            AutocompleteIndex for state.version
+        """
+        with cls._lock:
+            index = cls._indexes.get(state.household_id)
+            if index is not None and index.version == state.version:
+                cls._indexes.move_to_end(state.household_id)
+                return index
+
+        index = cls.build(state, cls._recent_purchases(state.household_id))
+        if log_sampled(state.household_id):
+            logger.info("🔤 Built autocomplete trie for household %s (%d names)",
+                        state.household_id, len(index.scores))
+
+        with cls._lock:
+            cls._indexes[state.household_id] = index
+            cls._indexes.move_to_end(state.household_id)
+            while len(cls._indexes) > cls.MAX_HOUSEHOLDS:
+                cls._indexes.popitem(last=False)
+        return index
+
+    @classmethod
+    def forget(cls, household_id: Optional[str]):
+        """Drop a household's trie (None drops all of them)."""
+        with cls._lock:
+            if household_id is None:
+                cls._indexes.clear()
+            else:
+                cls._indexes.pop(household_id, None)
+
+    @classmethod
+    def build(cls, state, recent_purchases: List[dict]) -> "AutocompleteIndex":
+        """
+        Score every name in the state (plus recent purchases) and build the trie.
+
+        Sources go in from most to least recent use - the shopping list,
+        purchases (newest first), the pantry, recipes - because a name's
+        unit and category come from the first source that has them.
+        """
+        index = cls(state.version)
+
+        for item in state.manual_shopping_items:
+            index._add(item.name, "shopping", unit=item.unit, category=item.category)
+
+        now = datetime.now(timezone.utc)
+        for purchase in recent_purchases:
+            weight = 1.0
+            purchased_at = _parse_time(purchase.get('purchased_at'))
+            if purchased_at:
+                age_days = max((now - purchased_at).total_seconds() / 86400, 0)
+                weight = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+            index._add(
+                purchase['item_name'], "purchase", weight,
+                unit=purchase.get('unit'), category=purchase.get('item_category')
+            )
+
+        for item in state.pantry_items:
+            index._add(item.name, "pantry", unit=item.unit, category=item.category)
+        for recipe in state.recipes:
+            for ingredient in recipe.ingredients:
+                index._add(ingredient.name, "recipe", unit=ingredient.unit)
+
+        index._insert_all()
+        return index
+
+    def suggest(self, q: str, limit: int = SUGGESTIONS_PER_NODE) -> List[dict]:
+        """
+        Best names starting with q (or with a word starting with q).
+
+        Returns:
+            [{"name", "unit", "category", "score"}] best first
+        """
+        node = self.root
+        for char in normalize(q):
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        return [
+            {**self.details[name], "score": round(self.scores[name], 2)}
+            for name in node.top[:limit]
+        ]
+
+    # ===== BUILD =====
+
+    def _add(self, name: str, source: str, weight: float = 1.0, unit: Optional[str] = None, category: Optional[str] = None):
+        key = normalize(name or "")
+        if not key:
+            return
+        self.scores[key] = self.scores.get(key, 0.0) + SOURCE_WEIGHTS[source] * weight
+
+        # Most recent use first (see build), so keep the first unit/category seen
+        details = self.details.setdefault(key, {"name": name.strip(), "unit": None, "category": None})
+        if unit and not details["unit"]:
+            details["unit"] = unit
+        if category and not details["category"]:
+            details["category"] = category
+
+    def _insert_all(self):
+        """
+        Insert names best-first, so the first SUGGESTIONS_PER_NODE names to
+        reach a node are its best ones - no ranking pass needed.
+        """
+        ranked = sorted(self.scores, key=lambda name: (-self.scores[name], name))
+        for key in ranked:
+            words = key.split(" ")
+            # Whole name, then from each later word on
+            for start in range(len(words)):
+                node = self.root
+                for char in " ".join(words[start:]):
+                    node = node.children.setdefault(char, _Node())
+                    if len(node.top) < SUGGESTIONS_PER_NODE and key not in node.top:
+                        node.top.append(key)
+
+    @classmethod
+    def _recent_purchases(cls, household_id: str) -> List[dict]:
+        """A household's recent purchases, newest first (cached for RECENT_PURCHASES_TTL)."""
+        now = time.monotonic()
+        with cls._lock:
+            cached = cls._purchases.get(household_id)
+            if cached is not None and now - cached[0] < RECENT_PURCHASES_TTL:
+                cls._purchases.move_to_end(household_id)
+                return cached[1]
+
+        purchases = cls._load_recent_purchases(household_id)
+        if purchases is None:
+            return []  # not cached, so the next build tries again
+
+        with cls._lock:
+            cls._purchases[household_id] = (now, purchases)
+            cls._purchases.move_to_end(household_id)
+            while len(cls._purchases) > cls.MAX_HOUSEHOLDS:
+                cls._purchases.popitem(last=False)
+        return purchases
+
+    @staticmethod
+    def _load_recent_purchases(household_id: str) -> Optional[List[dict]]:
+        try:
+            response = get_supabase().table('recent_purchases')\
+                .select('item_name, item_category, unit, purchased_at')\
+                .eq('household_id', household_id)\
+                .order('purchased_at', desc=True)\
+                .limit(RECENT_PURCHASES_LIMIT)\
+                .execute()
+            return response.data or []
+        except Exception as e:
+            logger.warning(f"Could not load recent purchases: {e}")
+            return None
+
+
+def _parse_time(value) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+on_invalidate("state", AutocompleteIndex.forget)
@@ -0,0 +1,6 @@
+"""
+Benchmarks - Python Age 5.0
+
+Synthetic households and timing suites for the state engine.
+Nothing here is imported by the app.
+"""
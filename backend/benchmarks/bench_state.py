@@ -0,0 +1,199 @@
+"""
+State Engine Benchmarks - Python Age 5.0
+
+Times the HouseholdState hot paths on synthetic households and writes
+comparable JSON, so a slowdown in state_manager.py shows up before it
+ships.
+
+Usage (from backend/):
+    python -m benchmarks.bench_state --scale large --output bench.json
+    python -m benchmarks.bench_state --scale large --compare bench.json
+
+--compare exits with status 1 if any benchmark's median got slower than
+--threshold (default 20%) versus the baseline file.
+"""
+
+from typing import Callable, Dict, List, Optional
+import argparse
+import gc
+import json
+import logging
+import os
+import pickle
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+# state_manager imports utils.supabase_client, which refuses to load without
+# credentials. Nothing here talks to Supabase, so placeholders will do.
+os.environ.setdefault("SUPABASE_URL", "http://supabase.bench.invalid")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench.state.key")
+
+from benchmarks.synthetic import SCALES, HouseholdGenerator, build_state  # noqa: E402
+
+FORMAT_VERSION = 1
+
+
+def measure(fn: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time fn() repeat times (after warmup runs) with the GC paused.
+
+    Returns:
+        min/median/p95/max/mean in milliseconds plus the run count
+    """
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    timings.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(timings[0], 4),
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        "max_ms": round(timings[-1], 4),
+        "mean_ms": round(statistics.fmean(timings), 4),
+    }
+
+
+def run_suite(seed: int, scale: str, repeat: int, only: Optional[List[str]] = None) -> dict:
+    """
+    Build a household and time every benchmark against it.
+
+    Args:
+        seed: Generator seed
+        scale: Name from SCALES
+        repeat: Timed runs per benchmark
+        only: Benchmark names to run (default all)
+
+    Returns:
+        JSON-ready result document
+    """
+    tables = HouseholdGenerator(seed=seed, **SCALES[scale]).tables()
+    state = build_state(tables)
+    pickled = pickle.dumps(state)
+
+    # Meals to validate: a fixed sample, same every run for the same seed
+    meal_ids = [meal.id for meal in state.meal_plans[:50]]
+
+    def validate_meals():
+        for meal_id in meal_ids:
+            state.validate_can_cook_meal(meal_id)
+
+    benchmarks = {
+        "build_state": lambda: build_state(tables),
+        "calculate_all": state.calculate_all,
+        "get_expiring_soon": state.get_expiring_soon,
+        "suggest_recipes_for_expiring_items": state.suggest_recipes_for_expiring_items,
+        f"validate_can_cook_meal_x{len(meal_ids)}": validate_meals,
+        "pickle_dumps": lambda: pickle.dumps(state),
+        "pickle_loads": lambda: pickle.loads(pickled),
+    }
+
+    results = {}
+    for name, fn in benchmarks.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        # Building is slow at large scale; fewer runs keep the suite quick
+        runs = max(3, repeat // 4) if name == "build_state" else repeat
+        results[name] = measure(fn, runs)
+        print(f"  {name:<40} median {results[name]['median_ms']:>10.3f} ms", file=sys.stderr)
+
+    return {
+        "format": FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "household": {
+            "seed": seed,
+            "scale": scale,
+            "pantry_items": len(state.pantry_items),
+            "pantry_locations": sum(len(item.locations) for item in state.pantry_items),
+            "recipes": len(state.recipes),
+            "meal_plans": len(state.meal_plans),
+            "manual_items": len(state.manual_shopping_items),
+            "shopping_list": len(state.shopping_list),
+            "pickle_bytes": len(pickled),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Benchmarks whose median regressed by more than threshold.
+
+    Returns:
+        Human-readable regression lines (empty if none)
+    """
+    if current["household"]["scale"] != baseline["household"]["scale"] or \
+            current["household"]["seed"] != baseline["household"]["seed"]:
+        print("⚠️  Baseline was run with a different seed/scale - numbers won't compare", file=sys.stderr)
+
+    regressions = []
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if not before or not before["median_ms"]:
+            continue
+        change = result["median_ms"] / before["median_ms"] - 1
+        marker = "🔴" if change > threshold else ("🟢" if change < -threshold else "  ")
+        print(f"{marker} {name:<40} {before['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms "
+              f"({change:+.1%})", file=sys.stderr)
+        if change > threshold:
+            regressions.append(f"{name}: {change:+.1%}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the HouseholdState engine")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="medium")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per benchmark")
+    parser.add_argument("--only", nargs="*", help="run only benchmarks starting with these names")
+    parser.add_argument("--output", help="write results JSON here (default stdout)")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20, help="allowed median slowdown (0.20 = 20%%)")
+    args = parser.parse_args(argv)
+
+    # State logging would swamp the timings
+    logging.disable(logging.INFO)
+
+    print(f"⏱️  Benchmarking scale={args.scale} seed={args.seed} repeat={args.repeat}", file=sys.stderr)
+    result = run_suite(args.seed, args.scale, args.repeat, args.only)
+
+    document = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(document + "\n")
+    else:
+        print(document)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}", file=sys.stderr)
+            return 1
+        print("✅ No regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,470 @@
+"""
+In-Memory Supabase & Redis - Python Age 5.0
+
+Stand-ins for load tests and benchmarks, so the API can be hammered
+without touching a real Supabase project or Redis.
+
+FakeSupabase covers the PostgREST query shapes the backend uses:
+select (with embedded children like "*, pantry_locations(*)"), eq, neq,
+gt/gte/lt/lte, in_, is_, order, limit, single, insert, upsert, update,
+delete and rpc. FakeRedis covers get/set/setex/delete/exists/ping/publish,
+the sorted-set commands the activity log uses (zadd, zrevrangebyscore,
+zremrangebyscore) and WATCH/MULTI pipelines, with TTLs.
+
+Both can inject latency (mean + jitter, in milliseconds) on every round
+trip, blocking like the real synchronous clients do. Round trips are
+counted per table/command.
+"""
+
+from collections import Counter
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+import copy
+import itertools
+import random
+import re
+import threading
+import time
+import uuid
+
+from redis import WatchError
+
+EMBED = re.compile(r"(\w+)\(\*\)")
+
+# Tables whose ids are BIGSERIAL rather than UUIDs
+SERIAL_TABLES = {"shopping_list_manual"}
+
+# Child rows that generated data nests inside the parent row
+NESTED_TABLES = {"pantry_items": "pantry_locations"}
+
+
+class Latency:
+    """Injected delay per round trip: mean_ms +/- jitter_ms (uniform)."""
+
+    def __init__(self, mean_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.mean_ms = mean_ms
+        self.jitter_ms = jitter_ms
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self.mean_ms <= 0 and self.jitter_ms <= 0:
+            return
+        with self._lock:
+            delay = self.mean_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(delay, 0) / 1000)
+
+
+# ===== SUPABASE =====
+
+class FakeResponse:
+    def __init__(self, data, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class FakeQuery:
+    """One chained PostgREST query (supabase.table(...)...execute())."""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self.db = db
+        self.table = table
+        self.operation = "select"
+        self.columns = "*"
+        self.payload = None
+        self.on_conflict = None
+        self.filters: List[Callable[[dict], bool]] = []
+        self.ordering = []
+        self.row_limit = None
+        self.single_row = False
+
+    # ----- operations -----
+
+    def select(self, columns: str = "*", **kwargs):
+        self.columns = columns
+        return self
+
+    def insert(self, payload, **kwargs):
+        self.operation, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = "id", **kwargs):
+        self.operation, self.payload, self.on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def update(self, payload, **kwargs):
+        self.operation, self.payload = "update", payload
+        return self
+
+    def delete(self, **kwargs):
+        self.operation = "delete"
+        return self
+
+    # ----- filters -----
+
+    def eq(self, column, value):
+        return self._filter(lambda row: _text(row.get(column)) == _text(value))
+
+    def neq(self, column, value):
+        return self._filter(lambda row: _text(row.get(column)) != _text(value))
+
+    def gt(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and _key(row[column]) > _key(value))
+
+    def gte(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and _key(row[column]) >= _key(value))
+
+    def lt(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and _key(row[column]) < _key(value))
+
+    def lte(self, column, value):
+        return self._filter(lambda row: row.get(column) is not None and _key(row[column]) <= _key(value))
+
+    def in_(self, column, values):
+        wanted = {_text(value) for value in values}
+        return self._filter(lambda row: _text(row.get(column)) in wanted)
+
+    def is_(self, column, value):
+        if value in (None, "null"):
+            return self._filter(lambda row: row.get(column) is None)
+        return self._filter(lambda row: _text(row.get(column)).lower() == _text(value).lower())
+
+    def order(self, column, desc: bool = False, **kwargs):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count: int, **kwargs):
+        self.row_limit = count
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def _filter(self, predicate):
+        self.filters.append(predicate)
+        return self
+
+    # ----- execution -----
+
+    def execute(self) -> FakeResponse:
+        self.db.latency.wait()
+        with self.db.lock:
+            self.db.calls[f"{self.operation}:{self.table}"] += 1
+            return getattr(self, f"_run_{self.operation}")()
+
+    def _matching(self) -> List[dict]:
+        return [row for row in self.db.rows(self.table) if all(f(row) for f in self.filters)]
+
+    def _run_select(self) -> FakeResponse:
+        rows = [copy.deepcopy(row) for row in self._matching()]
+
+        for child in EMBED.findall(self.columns):
+            foreign_key = f"{self.table.rstrip('s')}_id"  # pantry_items -> pantry_item_id
+            children = {}
+            for row in self.db.rows(child):
+                children.setdefault(_text(row.get(foreign_key)), []).append(row)
+            for row in rows:
+                row[child] = copy.deepcopy(children.get(_text(row.get("id")), []))
+
+        for column, desc in reversed(self.ordering):
+            rows.sort(key=lambda row: (row.get(column) is None, _key(row.get(column))), reverse=desc)
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+
+        if self.single_row:
+            if len(rows) != 1:
+                raise FakeAPIError(f"Expected one row from {self.table}, got {len(rows)}", code="PGRST116")
+            return FakeResponse(rows[0])
+        return FakeResponse(rows)
+
+    def _run_insert(self) -> FakeResponse:
+        return FakeResponse([self.db.add_row(self.table, row) for row in _as_list(self.payload)])
+
+    def _run_upsert(self) -> FakeResponse:
+        keys = [key.strip() for key in self.on_conflict.split(",")]
+        out = []
+        for row in _as_list(self.payload):
+            existing = next(
+                (r for r in self.db.rows(self.table) if all(_text(r.get(k)) == _text(row.get(k)) for k in keys)),
+                None
+            )
+            if existing is None:
+                out.append(self.db.add_row(self.table, row))
+            else:
+                existing.update(copy.deepcopy(row))
+                out.append(copy.deepcopy(existing))
+        return FakeResponse(out)
+
+    def _run_update(self) -> FakeResponse:
+        out = []
+        for row in self._matching():
+            row.update(copy.deepcopy(self.payload))
+            out.append(copy.deepcopy(row))
+        return FakeResponse(out)
+
+    def _run_delete(self) -> FakeResponse:
+        doomed = self._matching()
+        doomed_ids = {id(row) for row in doomed}
+        self.db.tables[self.table] = [row for row in self.db.rows(self.table) if id(row) not in doomed_ids]
+        return FakeResponse([copy.deepcopy(row) for row in doomed])
+
+
+class FakeAPIError(Exception):
+    """Raised where PostgREST would return an error (code like postgrest's APIError)."""
+
+    def __init__(self, message: str, code: Optional[str] = None):
+        super().__init__(message)
+        self.message, self.code = message, code
+
+
+class FakeRPC:
+    def __init__(self, db: "FakeSupabase", name: str, params: dict):
+        self.db, self.name, self.params = db, name, params
+
+    def execute(self) -> FakeResponse:
+        self.db.latency.wait()
+        with self.db.lock:
+            self.db.calls[f"rpc:{self.name}"] += 1
+            handler = self.db.functions.get(self.name)
+            if handler is None:
+                raise FakeAPIError(f"Could not find the function {self.name}", code="PGRST202")
+            return FakeResponse(handler(self.db, **self.params))
+
+
+class FakeSupabase:
+    """
+    In-memory Supabase client.
+
+    Args:
+        tables: Initial rows per table (copied)
+        latency: Delay per query (default none)
+    """
+
+    def __init__(self, tables: Optional[Dict[str, List[dict]]] = None, latency: Optional[Latency] = None):
+        self.tables: Dict[str, List[dict]] = copy.deepcopy(tables or {})
+        self.latency = latency or Latency()
+        self.functions: Dict[str, Callable] = {}  # rpc name -> fn(db, **params)
+        self.calls: Counter = Counter()
+        self.lock = threading.RLock()
+        self._serial = itertools.count(1)
+        self.auth = SimpleNamespace(get_user=self._get_user)
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[dict] = None) -> FakeRPC:
+        return FakeRPC(self, name, params or {})
+
+    def rows(self, table: str) -> List[dict]:
+        return self.tables.setdefault(table, [])
+
+    def add_row(self, table: str, row: dict) -> dict:
+        row = copy.deepcopy(row)
+        if "id" not in row:
+            row["id"] = next(self._serial) if table in SERIAL_TABLES else str(uuid.uuid4())
+        self.rows(table).append(row)
+        return copy.deepcopy(row)
+
+    def load(self, tables: Dict[str, List[dict]]):
+        """Add generated rows; nested pantry_locations become their own table."""
+        with self.lock:
+            for table, rows in tables.items():
+                child = NESTED_TABLES.get(table)
+                for row in rows:
+                    row = copy.deepcopy(row)
+                    if child:
+                        self.rows(child).extend(row.pop(child, []))
+                    if table in SERIAL_TABLES:
+                        row["id"] = next(self._serial)  # unique across households
+                    self.rows(table).append(row)
+
+    def _get_user(self, token: str):
+        raise FakeAPIError("FakeSupabase has no auth server - use locally verifiable tokens")
+
+
+# ===== REDIS =====
+
+class FakeRedis:
+    """In-memory Redis with TTLs and injected latency."""
+
+    def __init__(self, latency: Optional[Latency] = None):
+        self.latency = latency or Latency()
+        self.calls: Counter = Counter()
+        self.lock = threading.RLock()
+        self._data: Dict[str, bytes] = {}
+        self._expires: Dict[str, float] = {}
+        self._versions: Counter = Counter()  # bumped on every write, for WATCH
+        self._zsets: Dict[str, Dict[str, float]] = {}
+        self._exec = threading.local()  # commands queued in a MULTI share EXEC's round trip
+
+    def _round_trip(self, command: str):
+        if getattr(self._exec, "active", False):
+            return
+        self.latency.wait()
+        self.calls[command] += 1
+
+    def _alive(self, key: str) -> bool:
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def _write(self, key: str, value, ttl: Optional[float]):
+        self._data[key] = value if isinstance(value, bytes) else str(value).encode()
+        if ttl:
+            self._expires[key] = time.monotonic() + ttl
+        else:
+            self._expires.pop(key, None)
+        self._versions[key] += 1
+
+    def ping(self) -> bool:
+        self._round_trip("ping")
+        return True
+
+    def get(self, key: str) -> Optional[bytes]:
+        self._round_trip("get")
+        with self.lock:
+            return self._data[key] if self._alive(key) else None
+
+    def set(self, key: str, value, ex: Optional[int] = None, px: Optional[int] = None, nx: bool = False):
+        self._round_trip("set")
+        with self.lock:
+            if nx and self._alive(key):
+                return None
+            self._write(key, value, ex if ex else (px / 1000 if px else None))
+            return True
+
+    def setex(self, key: str, ttl: int, value) -> bool:
+        self._round_trip("setex")
+        with self.lock:
+            self._write(key, value, ttl)
+            return True
+
+    def delete(self, *keys: str) -> int:
+        self._round_trip("delete")
+        with self.lock:
+            removed = 0
+            for key in keys:
+                if self._alive(key):
+                    del self._data[key]
+                    self._expires.pop(key, None)
+                    self._versions[key] += 1
+                    removed += 1
+            return removed
+
+    def exists(self, *keys: str) -> int:
+        self._round_trip("exists")
+        with self.lock:
+            return sum(1 for key in keys if self._alive(key))
+
+    def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        self._round_trip("zadd")
+        with self.lock:
+            zset = self._zsets.setdefault(key, {})
+            added = sum(1 for member in mapping if member not in zset)
+            zset.update({member: float(score) for member, score in mapping.items()})
+            return added
+
+    def zrevrangebyscore(self, key: str, max, min, start: Optional[int] = None,
+                         num: Optional[int] = None) -> List[bytes]:
+        self._round_trip("zrevrangebyscore")
+        high, low = float(max), float(min)
+        with self.lock:
+            members = sorted(
+                ((score, member) for member, score in self._zsets.get(key, {}).items() if low <= score <= high),
+                reverse=True,
+            )
+        members = [member.encode() for _, member in members]
+        if start is not None and num is not None:
+            members = members[start:start + num]
+        return members
+
+    def zremrangebyscore(self, key: str, min, max) -> int:
+        self._round_trip("zremrangebyscore")
+        low, high = float(min), float(max)
+        with self.lock:
+            zset = self._zsets.get(key, {})
+            doomed = [member for member, score in zset.items() if low <= score <= high]
+            for member in doomed:
+                del zset[member]
+            return len(doomed)
+
+    def publish(self, channel: str, message) -> int:
+        """One round trip; nobody is subscribed in-process."""
+        self._round_trip("publish")
+        return 0
+
+    def pipeline(self) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """WATCH/MULTI/EXEC: queued writes fail if a watched key changed."""
+
+    def __init__(self, redis: FakeRedis):
+        self.redis = redis
+        self.watched: Dict[str, int] = {}
+        self.queued = []
+        self.buffering = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.reset()
+
+    def reset(self):
+        self.watched, self.queued, self.buffering = {}, [], False
+
+    def watch(self, *keys: str):
+        self.redis._round_trip("watch")
+        for key in keys:
+            self.watched[key] = self.redis._versions[key]
+
+    def multi(self):
+        self.buffering = True
+
+    def __getattr__(self, command):
+        method = getattr(self.redis, command)
+        if not callable(method):
+            raise AttributeError(command)
+
+        def call(*args, **kwargs):
+            if not self.buffering:
+                return method(*args, **kwargs)
+            self.queued.append((method, args, kwargs))
+            return self
+        return call
+
+    def execute(self):
+        self.redis._round_trip("exec")
+        with self.redis.lock:
+            if any(self.redis._versions[key] != version for key, version in self.watched.items()):
+                self.reset()
+                raise WatchError("Watched variable changed.")
+            self.redis._exec.active = True
+            try:
+                results = [method(*args, **kwargs) for method, args, kwargs in self.queued]
+            finally:
+                self.redis._exec.active = False
+        self.reset()
+        return results
+
+
+def _as_list(payload) -> List[dict]:
+    return payload if isinstance(payload, list) else [payload]
+
+
+def _text(value) -> str:
+    if isinstance(value, bool):
+        return str(value).lower()
+    return "" if value is None else str(value)
+
+
+def _key(value):
+    """Comparable form: numbers stay numbers, everything else compares as text."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value, "")
+    return (1, 0, _text(value))
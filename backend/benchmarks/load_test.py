@@ -0,0 +1,271 @@
+"""
+Offline Load Test - Python Age 5.0
+
+Drives the real FastAPI app (routes, auth, StateManager, caches) against
+in-memory Supabase/Redis stand-ins with injected latency, with many
+households hitting it at once. Reports p50/p95/p99 and throughput per
+endpoint, plus how many Supabase/Redis round trips each request cost.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --households 20 --concurrency 16 --duration 15
+    python -m benchmarks.load_test --supabase-ms 40 --no-redis --output load.json
+
+Requests go through httpx's in-process ASGI transport on one event loop,
+the way a single uvicorn worker sees them. Routes that call Supabase
+synchronously block that loop, so their latency shows up in everyone's
+numbers - as it does in production.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import SCALES, HouseholdGenerator
+from benchmarks.fakes import FakeRedis, FakeSupabase, Latency
+
+# name -> (weight, method, path, body(household) or None)
+SCENARIOS = {
+    "GET /api/pantry/": (12, "GET", "/api/pantry/", None),
+    "GET /api/recipes/": (8, "GET", "/api/recipes/", None),
+    "GET /api/shopping-list/": (14, "GET", "/api/shopping-list/", None),
+    "GET /api/meal-plans/": (6, "GET", "/api/meal-plans/", None),
+    "GET /api/alerts/dashboard": (8, "GET", "/api/alerts/dashboard", None),
+    "GET /api/recipes/search": (6, "GET", "/api/recipes/search?q=chicken", None),
+    "GET /api/autocomplete/": (10, "GET", "/api/autocomplete/?q=or", None),
+    "GET /api/settings/": (4, "GET", "/api/settings/", None),
+    "PATCH /api/shopping-list/items/{id}": (
+        6, "PATCH", "/api/shopping-list/items/{manual_item}",
+        lambda household: {"checked": household.rng.random() < 0.5}
+    ),
+    "POST /api/shopping-list/items": (
+        3, "POST", "/api/shopping-list/items",
+        lambda household: {"name": f"Load item {household.rng.randrange(1000)}", "quantity": 1, "unit": "each"}
+    ),
+    "POST /api/pantry/": (
+        3, "POST", "/api/pantry/",
+        lambda household: {
+            "name": f"Load pantry {household.rng.randrange(1000)}",
+            "category": "Other",
+            "unit": "each",
+            "locations": [{"location": "Pantry", "quantity": 1}]
+        }
+    ),
+}
+
+
+class VirtualHousehold:
+    """A seeded household plus a member who can call the API."""
+
+    def __init__(self, household_id: str, user_id: str, token: str, manual_items: List[str], seed: int):
+        self.household_id = household_id
+        self.user_id = user_id
+        self.headers = {"Authorization": f"Bearer {token}", "X-Household-Id": household_id}
+        self.manual_items = manual_items
+        self.rng = random.Random(seed)
+
+
+def prepare_environment():
+    """
+    Point the app at nothing real before it's imported.
+
+    Real credentials from .env are never used: the Supabase client and
+    Redis connection are swapped for fakes right after import.
+    """
+    os.environ["SUPABASE_URL"] = "http://supabase.loadtest.invalid"
+    os.environ["SUPABASE_SERVICE_KEY"] = "load.test.key"  # must look like a JWT
+    os.environ["REDIS_URL"] = "redis://127.0.0.1:1/0"  # refused at once; replaced below
+    os.environ.setdefault("SUPABASE_JWT_SECRET", uuid.uuid4().hex)
+    os.environ["AUTH_REMOTE_FALLBACK"] = "false"
+    os.environ.setdefault("QUERY_BUDGET_MODE", "strict")  # an N+1 regression shows up as errors
+
+
+def seed_households(db: FakeSupabase, count: int, scale: str, seed: int, jwt_secret: str) -> List[VirtualHousehold]:
+    """Generate households into the fake DB and mint a token per member."""
+    from jose import jwt
+
+    households = []
+    for i in range(count):
+        household_id = str(uuid.UUID(int=random.Random(seed * 7919 + i).getrandbits(128), version=4))
+        user_id = str(uuid.UUID(int=random.Random(seed * 104729 + i).getrandbits(128), version=4))
+
+        db.load(HouseholdGenerator(seed=seed + i, household_id=household_id, **SCALES[scale]).tables())
+        db.load({
+            "households": [{"id": household_id, "name": f"Load household {i}"}],
+            "household_members": [{"id": str(uuid.uuid4()), "household_id": household_id, "user_id": user_id, "role": "owner"}],
+        })
+
+        token = jwt.encode(
+            {"sub": user_id, "email": f"load{i}@example.com", "role": "authenticated",
+             "aud": "authenticated", "exp": int(time.time()) + 24 * 3600},
+            jwt_secret, algorithm="HS256"
+        )
+        manual_items = [
+            str(row["id"]) for row in db.rows("shopping_list_manual") if row["household_id"] == household_id
+        ]
+        households.append(VirtualHousehold(household_id, user_id, token, manual_items, seed + i))
+    return households
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: List[tuple], elapsed: float) -> Dict[str, dict]:
+    """samples: (scenario, status, ms) -> per-scenario stats plus "ALL"."""
+    grouped = defaultdict(list)
+    errors = defaultdict(int)
+    for scenario, status_code, ms in samples:
+        for name in (scenario, "ALL"):
+            grouped[name].append(ms)
+            if status_code >= 400:
+                errors[name] += 1
+
+    report = {}
+    for name, timings in sorted(grouped.items(), key=lambda kv: kv[0] == "ALL"):
+        timings.sort()
+        report[name] = {
+            "requests": len(timings),
+            "errors": errors[name],
+            "rps": round(len(timings) / elapsed, 2),
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "p99_ms": round(percentile(timings, 99), 3),
+            "max_ms": round(timings[-1], 3),
+        }
+    return report
+
+
+async def drive(app, households: List[VirtualHousehold], concurrency: int, duration: float,
+                scenarios: Dict[str, tuple], seed: int) -> tuple:
+    """Run `concurrency` virtual users for `duration` seconds."""
+    import httpx
+
+    names = list(scenarios)
+    weights = [scenarios[name][0] for name in names]
+    samples = []
+    deadline = time.perf_counter() + duration
+
+    async def user(worker: int, client):
+        rng = random.Random(seed * 31 + worker)
+        while time.perf_counter() < deadline:
+            household = rng.choice(households)
+            name = rng.choices(names, weights)[0]
+            _, method, path, body = scenarios[name]
+            if "{manual_item}" in path:
+                if not household.manual_items:
+                    continue
+                path = path.replace("{manual_item}", rng.choice(household.manual_items))
+
+            started = time.perf_counter()
+            response = await client.request(
+                method, path, headers=household.headers,
+                json=body(household) if body else None
+            )
+            samples.append((name, response.status_code, (time.perf_counter() - started) * 1000))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(user(worker, client) for worker in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return samples, elapsed
+
+
+def run(args) -> dict:
+    prepare_environment()
+
+    import app as app_module
+    import utils.auth
+    import utils.redis_client
+    import utils.supabase_client
+
+    db = FakeSupabase(latency=Latency(args.supabase_ms, args.supabase_jitter, seed=args.seed))
+    redis = None if args.no_redis else FakeRedis(latency=Latency(args.redis_ms, args.redis_ms / 2, seed=args.seed))
+    utils.supabase_client.supabase = db
+    utils.redis_client.redis_client = redis
+
+    print(f"🌱 Seeding {args.households} {args.scale} households...", file=sys.stderr)
+    households = seed_households(db, args.households, args.scale, args.seed, utils.auth.JWT_SECRET)
+    db.calls.clear()
+
+    print(f"🚀 {args.concurrency} users for {args.duration}s "
+          f"(supabase {args.supabase_ms}±{args.supabase_jitter} ms, "
+          f"redis {'off' if redis is None else f'{args.redis_ms} ms'})", file=sys.stderr)
+    samples, elapsed = asyncio.run(
+        drive(app_module.app, households, args.concurrency, args.duration, SCENARIOS, args.seed)
+    )
+
+    report = summarize(samples, elapsed)
+    total = max(len(samples), 1)
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "households": args.households,
+            "scale": args.scale,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "supabase_ms": args.supabase_ms,
+            "supabase_jitter_ms": args.supabase_jitter,
+            "redis_ms": None if redis is None else args.redis_ms,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "endpoints": report,
+        "round_trips_per_request": {
+            "supabase": round(sum(db.calls.values()) / total, 3),
+            "redis": round(sum(redis.calls.values()) / total, 3) if redis else 0,
+        },
+        "supabase_calls": dict(db.calls.most_common()),
+        "redis_calls": dict(redis.calls.most_common()) if redis else {},
+    }
+
+
+def print_report(result: dict):
+    print(f"\n{'endpoint':<40} {'reqs':>7} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}", file=sys.stderr)
+    for name, row in result["endpoints"].items():
+        print(f"{name:<40} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+              f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}", file=sys.stderr)
+    trips = result["round_trips_per_request"]
+    print(f"\nRound trips per request: supabase {trips['supabase']}, redis {trips['redis']}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the API against in-memory Supabase/Redis")
+    parser.add_argument("--households", type=int, default=20)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--supabase-ms", type=float, default=20.0, help="injected latency per Supabase query")
+    parser.add_argument("--supabase-jitter", type=float, default=5.0)
+    parser.add_argument("--redis-ms", type=float, default=0.5, help="injected latency per Redis command")
+    parser.add_argument("--no-redis", action="store_true", help="run without a cache")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args(argv)
+
+    # Per-request logging would dominate the run
+    logging.disable(logging.WARNING)
+
+    result = run(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(json.dumps(result, indent=2) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+Synthetic Households - Python Age 5.0
+
+Seeded generator for realistic households at any scale. The same seed
+and sizes always produce the same rows, so benchmark runs compare.
+
+Rows have the shape Supabase returns (pantry_items with nested
+pantry_locations, JSONB recipe ingredients, planned_date/is_cooked meal
+plans, ...) and are turned into models with the same from_supabase
+converters StateManager uses.
+
+The data is messy the way real data is: the same ingredient written as
+"Egg", "eggs" and "EGGS", mixed unit families (cups in recipes, litres
+in the pantry), items split across fridge/freezer lots with staggered
+expiry dates, and empty or unspecified quantities.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+import random
+import uuid
+
+from models.pantry import PantryItem
+from models.recipe import Recipe
+from models.meal_plan import MealPlan
+from models.shopping import ShoppingItem
+
+# Named sizes: pantry items, recipes, planned meals, manual shopping items
+SCALES = {
+    "small": {"pantry_items": 200, "recipes": 50, "meal_plans": 20, "manual_items": 10},
+    "medium": {"pantry_items": 2000, "recipes": 400, "meal_plans": 100, "manual_items": 40},
+    "large": {"pantry_items": 10000, "recipes": 2000, "meal_plans": 500, "manual_items": 100},
+}
+
+# Base ingredients with their category and the unit family people use
+FOODS = [
+    ("egg", "Dairy", "count"), ("milk", "Dairy", "volume"), ("butter", "Dairy", "mass"),
+    ("cheddar", "Dairy", "mass"), ("yogurt", "Dairy", "volume"), ("cream", "Dairy", "volume"),
+    ("flour", "Baking", "mass"), ("sugar", "Baking", "mass"), ("baking soda", "Baking", "volume"),
+    ("rice", "Grains", "mass"), ("pasta", "Grains", "mass"), ("oat", "Grains", "mass"),
+    ("bread", "Grains", "other"), ("tortilla", "Grains", "count"),
+    ("chicken breast", "Meat", "mass"), ("ground beef", "Meat", "mass"), ("bacon", "Meat", "other"),
+    ("salmon", "Meat", "mass"), ("tofu", "Meat", "mass"),
+    ("onion", "Produce", "count"), ("garlic", "Produce", "other"), ("tomato", "Produce", "count"),
+    ("potato", "Produce", "mass"), ("carrot", "Produce", "count"), ("spinach", "Produce", "mass"),
+    ("apple", "Produce", "count"), ("lemon", "Produce", "count"), ("bell pepper", "Produce", "count"),
+    ("olive oil", "Pantry", "volume"), ("vinegar", "Pantry", "volume"), ("soy sauce", "Pantry", "volume"),
+    ("black bean", "Pantry", "other"), ("chickpea", "Pantry", "other"), ("honey", "Pantry", "volume"),
+    ("salt", "Spices", "volume"), ("pepper", "Spices", "volume"), ("cumin", "Spices", "volume"),
+    ("paprika", "Spices", "volume"), ("oregano", "Spices", "volume"), ("cinnamon", "Spices", "volume"),
+]
+MODIFIERS = [
+    "", "", "", "fresh", "organic", "frozen", "red", "green", "smoked", "whole",
+    "low fat", "wild", "baby", "sweet", "spicy", "dried", "roasted", "aged",
+]
+UNITS = {
+    "mass": ["g", "kg", "oz", "lb", "lbs", "grams"],
+    "volume": ["ml", "l", "cup", "cups", "tbsp", "tsp", "fl oz"],
+    "count": ["each", "whole", "pcs", "dozen"],
+    "other": ["can", "bunch", "clove", "slice", "package", "jar"],
+}
+LOCATIONS = ["Pantry", "Fridge", "Freezer", "Garage", "Unspecified"]
+TAGS = ["Quick", "Dinner", "Breakfast", "Vegetarian", "Italian", "Mexican", "Asian", "Baking", "Comfort", "Healthy"]
+RECIPE_WORDS = ["Skillet", "Bake", "Stew", "Salad", "Bowl", "Tacos", "Soup", "Curry", "Stir Fry", "Pie"]
+
+
+class HouseholdGenerator:
+    """
+    Builds one synthetic household.
+
+    Example:
+        tables = HouseholdGenerator(seed=42, **SCALES["large"]).tables()
+        state = build_state(tables)
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        pantry_items: int = 200,
+        recipes: int = 50,
+        meal_plans: int = 20,
+        manual_items: int = 10,
+        household_id: Optional[str] = None,
+        today: Optional[date] = None
+    ):
+        self.rng = random.Random(seed)
+        self.sizes = {
+            "pantry_items": pantry_items,
+            "recipes": recipes,
+            "meal_plans": meal_plans,
+            "manual_items": manual_items,
+        }
+        self.household_id = household_id or self._uuid()
+        self.today = today or date.today()
+        self.vocabulary = self._vocabulary(max(pantry_items, 50))
+
+    def tables(self) -> Dict[str, List[dict]]:
+        """
+        Generate every table for the household.
+
+        Returns:
+            {table name: rows}; pantry rows carry their pantry_locations
+        """
+        pantry = self._pantry_items()
+        recipes = self._recipes()
+        return {
+            "pantry_items": pantry,
+            "recipes": recipes,
+            "meal_plans": self._meal_plans(recipes),
+            "shopping_list_manual": self._manual_items(),
+            "recent_purchases": self._recent_purchases(),
+        }
+
+    # ===== TABLES =====
+
+    def _pantry_items(self) -> List[dict]:
+        rows = []
+        for _ in range(self.sizes["pantry_items"]):
+            name, category, family = self._pick_food()
+            item_id = self._uuid()
+            rows.append({
+                "id": item_id,
+                "household_id": self.household_id,
+                "name": self._spelling(name),
+                "category": category,
+                "unit": self.rng.choice(UNITS[family]),
+                "min_threshold": self.rng.choice([0, 0, 0, 1, 2]),
+                "pantry_locations": [
+                    self._location(item_id) for _ in range(self.rng.choice([1, 1, 1, 2, 2, 3]))
+                ],
+            })
+        return rows
+
+    def _location(self, item_id: str) -> dict:
+        expiration = None
+        if self.rng.random() < 0.6:
+            expiration = (self.today + timedelta(days=self.rng.randint(-5, 60))).isoformat()
+        return {
+            "id": self._uuid(),
+            "pantry_item_id": item_id,
+            "location_name": self.rng.choice(LOCATIONS),
+            "quantity": self.rng.choice([0, 0.5, 1, 1, 2, 3, 5, 10, 250, 500]),
+            "expiration_date": expiration,
+        }
+
+    def _recipes(self) -> List[dict]:
+        rows = []
+        for i in range(self.sizes["recipes"]):
+            ingredients = []
+            for _ in range(self.rng.randint(4, 14)):
+                name, _, family = self._pick_food()
+                ingredients.append({
+                    "name": self._spelling(name),
+                    "quantity": self.rng.choice([0.25, 0.5, 1, 1, 2, 3, 100, 200]),
+                    "unit": self.rng.choice(UNITS[family]),
+                })
+            main = ingredients[0]["name"].title()
+            rows.append({
+                "id": self._uuid(),
+                "household_id": self.household_id,
+                "name": f"{main} {self.rng.choice(RECIPE_WORDS)} #{i}",
+                "category": self.rng.choice(["Dinner", "Lunch", "Breakfast", "Dessert", None]),
+                "tags": self.rng.sample(TAGS, self.rng.randint(0, 3)),
+                "instructions": "1. Prep\n2. Cook\n3. Serve",
+                "ingredients": ingredients,
+            })
+        return rows
+
+    def _meal_plans(self, recipes: List[dict]) -> List[dict]:
+        if not recipes:
+            return []
+        # A few favourites get planned over and over
+        favourites = self.rng.sample(recipes, min(len(recipes), 20))
+        rows = []
+        for _ in range(self.sizes["meal_plans"]):
+            recipe = self.rng.choice(favourites if self.rng.random() < 0.5 else recipes)
+            rows.append({
+                "id": self._uuid(),
+                "household_id": self.household_id,
+                "recipe_id": recipe["id"],
+                "planned_date": (self.today + timedelta(days=self.rng.randint(0, 28))).isoformat(),
+                "serving_multiplier": self.rng.choice([1, 1, 1, 1.5, 2]),
+                "is_cooked": self.rng.random() < 0.1,
+            })
+        return rows
+
+    def _manual_items(self) -> List[dict]:
+        rows = []
+        for i in range(self.sizes["manual_items"]):
+            name, category, family = self._pick_food()
+            rows.append({
+                "id": i + 1,
+                "household_id": self.household_id,
+                "name": self._spelling(name),
+                "quantity": self.rng.choice([1, 2, 3]),
+                "unit": self.rng.choice(UNITS[family]),
+                "category": category,
+                "checked": self.rng.random() < 0.2,
+            })
+        return rows
+
+    def _recent_purchases(self) -> List[dict]:
+        now = datetime.combine(self.today, datetime.min.time(), tzinfo=timezone.utc)
+        rows = []
+        for _ in range(min(self.sizes["pantry_items"], 500)):
+            name, category, family = self._pick_food()
+            rows.append({
+                "id": self._uuid(),
+                "household_id": self.household_id,
+                "item_name": self._spelling(name),
+                "item_category": category,
+                "quantity": self.rng.choice([1, 2, 3]),
+                "unit": self.rng.choice(UNITS[family]),
+                "purchased_at": (now - timedelta(hours=self.rng.randint(0, 24 * 90))).isoformat(),
+            })
+        return rows
+
+    # ===== HELPERS =====
+
+    def _vocabulary(self, size: int) -> List[tuple]:
+        """Distinct ingredient names ("smoked salmon", "red onion", ...)."""
+        natural = len(FOODS) * len(set(MODIFIERS))
+        names = {}
+        while len(names) < size:
+            food, category, family = self.rng.choice(FOODS)
+            modifier = self.rng.choice(MODIFIERS)
+            if len(names) >= natural:
+                modifier = f"{modifier} v{len(names)}"  # ran out of natural names
+            name = f"{modifier} {food}".strip()
+            names.setdefault(name, (name, category, family))
+        return list(names.values())
+
+    def _pick_food(self) -> tuple:
+        # Skewed: a small set of staples shows up everywhere
+        index = int(len(self.vocabulary) * self.rng.random() ** 2.5)
+        return self.vocabulary[index]
+
+    def _spelling(self, name: str) -> str:
+        roll = self.rng.random()
+        if roll < 0.15:
+            return name + "s"
+        if roll < 0.25:
+            return name.title()
+        if roll < 0.30:
+            return f"  {name.upper()} "
+        return name
+
+    def _uuid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+
+def build_state(tables: Dict[str, List[dict]], household_id: Optional[str] = None):
+    """
+    Turn generated rows into a HouseholdState (as StateManager would).
+
+    Args:
+        tables: Output of HouseholdGenerator.tables()
+        household_id: Defaults to the household of the rows
+
+    Returns:
+        HouseholdState (already calculated)
+    """
+    from state_manager import HouseholdState
+
+    pantry_items = []
+    for row in tables["pantry_items"]:
+        row = dict(row)
+        locations = row.pop("pantry_locations", [])
+        pantry_items.append(PantryItem.from_supabase(row, locations))
+    household_id = household_id or (pantry_items[0].household_id if pantry_items else "synthetic")
+
+    recipes = [Recipe.from_supabase(row) for row in tables["recipes"]]
+    meal_plans = [
+        MealPlan.from_supabase({**row, "date": row["planned_date"], "cooked": row["is_cooked"]})
+        for row in tables["meal_plans"]
+    ]
+    manual_items = [
+        ShoppingItem(
+            id=str(row["id"]),
+            name=row["name"],
+            quantity=row["quantity"],
+            unit=row["unit"],
+            category=row.get("category", "Other"),
+            source="Manual",
+            checked=row.get("checked", False),
+            household_id=household_id
+        )
+        for row in tables["shopping_list_manual"]
+    ]
+
+    return HouseholdState(
+        household_id=household_id,
+        pantry_items=pantry_items,
+        recipes=recipes,
+        meal_plans=meal_plans,
+        manual_shopping_items=manual_items
+    )
+
+
+def generate_household(seed: int = 0, scale: str = "small", **sizes):
+    """
+    Shortcut: generate a household and build its state.
+
+    Args:
+        seed: Random seed
+        scale: Name from SCALES; keyword sizes override it
+
+    Returns:
+        HouseholdState
+    """
+    return build_state(HouseholdGenerator(seed=seed, **{**SCALES[scale], **sizes}).tables())
@@ -0,0 +1,164 @@
+"""
+Ingredient Matching - Python Age 5.0
+
+Recipes and the pantry are written by people: "Eggs" vs "egg",
+"lbs" vs "lb", "Olive  Oil " vs "olive oil". Every calculation in
+HouseholdState matches on canonical keys built here, once per state
+load, instead of comparing raw strings.
+
+- Names: lowercased, whitespace collapsed, last word singular
+- Units: lowercased, trailing dots dropped, aliases resolved (UNIT_ALIASES),
+  then converted to their family's base unit (units.py). A bare "oz" of
+  a liquid (LIQUIDS) is read as "fl oz", so "16 oz milk" and "2 cup
+  milk" add up
+"""
+
+from functools import lru_cache
+from typing import Dict, Tuple
+import re
+
+from units import to_base
+
+WHITESPACE = re.compile(r"\s+")
+
+# Canonical unit -> spellings people use (plurals are added automatically)
+UNIT_SPELLINGS = {
+    "each": ["ea", "whole", "piece", "pc", "pcs", "item", "count", "ct", "unit"],
+    "dozen": ["doz", "dz"],
+    "lb": ["lbs", "pound", "#"],
+    "oz": ["ounce"],
+    "fl oz": ["fluid ounce", "fl. oz", "floz"],
+    "g": ["gram", "gr", "grm"],
+    "kg": ["kilogram", "kilo", "kgs"],
+    "mg": ["milligram"],
+    "cup": ["c"],
+    "tbsp": ["tablespoon", "tbs", "tbl", "tbsps"],
+    "tsp": ["teaspoon", "tsps"],
+    "ml": ["milliliter", "millilitre", "mls"],
+    "l": ["liter", "litre", "ltr"],
+    "gallon": ["gal"],
+    "quart": ["qt"],
+    "pint": ["pt"],
+    "can": ["tin"],
+    "bottle": [],
+    "bag": [],
+    "box": [],
+    "package": ["pkg", "pack", "packet"],
+    "bunch": [],
+    "clove": [],
+    "slice": [],
+    "strip": [],
+    "stick": [],
+    "jar": [],
+    "head": [],
+    "loaf": [],
+    "pinch": [],
+    "dash": [],
+}
+
+# Last words of ingredient names sold by volume - "oz" on these means fluid ounces
+LIQUIDS = {
+    "milk", "water", "juice", "oil", "broth", "stock", "cream", "buttermilk",
+    "vinegar", "wine", "beer", "soda", "syrup", "sauce", "creamer", "kefir",
+    "lemonade", "coffee", "tea", "half-and-half", "extract",
+}
+
+# Plurals that the suffix rules below get wrong
+IRREGULAR_PLURALS = {
+    "leaves": "leaf",
+    "loaves": "loaf",
+    "halves": "half",
+    "knives": "knife",
+    "calves": "calf",
+    "wolves": "wolf",
+    "potatoes": "potato",
+    "tomatoes": "tomato",
+    "mangoes": "mango",
+    "cherries": "cherry",
+    "anchovies": "anchovy",
+    "teeth": "tooth",
+    "geese": "goose",
+    "mice": "mouse",
+}
+
+# Words that end in "s" but aren't plural
+SINGULAR_S = {
+    "asparagus", "couscous", "hummus", "molasses", "swiss", "grits",
+    "citrus", "bass", "floss", "glass", "hibiscus", "octopus", "series",
+    "species", "chess", "watercress", "cress", "lemongrass", "gas",
+}
+
+# Singulars ending in "ie", so "-ies" is "-ie" + "s" rather than "-y" -> "-ies"
+SINGULAR_IE = {
+    "cookie", "pie", "brownie", "smoothie", "veggie", "hoagie", "pierogie",
+    "potpie", "calorie",
+}
+
+
+def singularize(word: str) -> str:
+    """Best-effort singular form of a lowercase word."""
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    if len(word) <= 3 or word in SINGULAR_S or word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-1] if word[:-1] in SINGULAR_IE else word[:-3] + "y"
+    if word.endswith(("ches", "shes", "xes", "zes", "sses")):
+        return word[:-2]
+    if word.endswith("oes"):
+        return word[:-2]
+    if word.endswith("s"):
+        return word[:-1]
+    return word
+
+
+def _build_unit_aliases() -> Dict[str, str]:
+    aliases = {}
+    for canonical, spellings in UNIT_SPELLINGS.items():
+        for spelling in [canonical] + spellings:
+            aliases[spelling] = canonical
+            if not spelling.endswith("s") and spelling.isalpha() and len(spelling) > 2:
+                aliases[spelling + ("es" if spelling.endswith(("ch", "sh", "x")) else "s")] = canonical
+    aliases["loaves"] = "loaf"
+    aliases["fl ozs"] = "fl oz"
+    return aliases
+
+
+# Every accepted spelling -> canonical unit, built once at import
+UNIT_ALIASES: Dict[str, str] = _build_unit_aliases()
+
+
+@lru_cache(maxsize=8192)
+def normalize_name(name: str) -> str:
+    """
+    Canonical ingredient name ("  Large  Eggs" -> "large egg").
+
+    Only the last word is singularized ("green beans" -> "green bean").
+    """
+    words = WHITESPACE.sub(" ", name.strip().lower()).split(" ")
+    if words and words[-1]:
+        words[-1] = singularize(words[-1])
+    return " ".join(words)
+
+
+@lru_cache(maxsize=1024)
+def normalize_unit(unit: str) -> str:
+    """Canonical unit ("Lbs." -> "lb"); unknown units are just cleaned up."""
+    cleaned = WHITESPACE.sub(" ", (unit or "").strip().lower()).rstrip(".")
+    return UNIT_ALIASES.get(cleaned, cleaned)
+
+
+@lru_cache(maxsize=8192)
+def ingredient_key(name: str, unit: str) -> Tuple[str, float]:
+    """
+    Canonical "name|base unit" key used by all state calculations.
+
+    Returns:
+        (key, factor) - multiply a quantity in unit by factor to get base units
+        ("Milk", "cups" -> ("milk|ml", 236.59), "Milk", "oz" -> ("milk|ml", 29.57))
+    """
+    canonical_name, canonical_unit = normalize_name(name), normalize_unit(unit)
+    if canonical_unit == "oz" and canonical_name.rsplit(" ", 1)[-1] in LIQUIDS:
+        canonical_unit = "fl oz"
+    base_unit, factor = to_base(canonical_unit)
+    return f"{canonical_name}|{base_unit}", factor
@@ -5,9 +5,10 @@ Python Age 5.0
 
 from .pantry import PantryItem, PantryLocation, PantryItemCreate, PantryItemUpdate
 from .recipe import Recipe, RecipeIngredient, RecipeCreate, RecipeUpdate
-from .meal_plan import MealPlan, MealPlanCreate, MealPlanUpdate
+from .meal_plan import MealPlan, MealPlanCreate, MealPlanBatchCreate, MealPlanUpdate
 from .shopping import ShoppingItem, ManualShoppingItemCreate, ShoppingItemUpdate
 from .user import User, Household
+from .batch import BatchOperation, BatchRequest
 
 __all__ = [
     'PantryItem',
@@ -20,10 +21,13 @@ __all__ = [
     'RecipeUpdate',
     'MealPlan',
     'MealPlanCreate',
+    'MealPlanBatchCreate',
     'MealPlanUpdate',
     'ShoppingItem',
     'ManualShoppingItemCreate',
     'ShoppingItemUpdate',
     'User',
     'Household',
+    'BatchOperation',
+    'BatchRequest',
 ]
@@ -0,0 +1,36 @@
+"""
+Batch Models - Python Age 5.0
+
+One request, many changes, one recalculation.
+"""
+
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+BATCH_OPS = (
+    "pantry.add", "pantry.update", "pantry.delete",
+    "recipes.add", "recipes.update", "recipes.delete",
+    "meal_plans.add", "meal_plans.update", "meal_plans.delete",
+    "shopping.add", "shopping.update", "shopping.delete",
+)
+
+
+class BatchOperation(BaseModel):
+    """Single operation inside a batch"""
+    op: str = Field(..., pattern="^(" + "|".join(op.replace(".", r"\.") for op in BATCH_OPS) + ")$")
+    id: Optional[str] = None  # Required for update/delete
+    data: Dict[str, Any] = Field(default_factory=dict)  # Body of the matching endpoint
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "op": "pantry.update",
+                "id": "uuid",
+                "data": {"locations": [{"location": "Fridge", "quantity": 2}]}
+            }
+        }
+
+
+class BatchRequest(BaseModel):
+    """Ordered list of operations applied together"""
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=200)
@@ -3,7 +3,7 @@ Meal Plan Models - Python Age 5.0
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import date
 
 
@@ -24,7 +24,7 @@ class MealPlan(BaseModel):
             household_id=meal_data['household_id'],
             date=meal_data['date'] if isinstance(meal_data['date'], date) else date.fromisoformat(meal_data['date']),
             recipe_id=meal_data['recipe_id'],
-            serving_multiplier=meal_data.get('serving_multiplier', 1.0),
+            serving_multiplier=float(meal_data.get('serving_multiplier') or 1.0),
             cooked=meal_data.get('cooked', False)
         )
 
@@ -45,6 +45,21 @@ class MealPlanCreate(BaseModel):
         }
 
 
+class MealPlanBatchCreate(BaseModel):
+    """Plan many meals at once (e.g. a whole week)"""
+    meals: List[MealPlanCreate] = Field(..., min_length=1, max_length=100)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "meals": [
+                    {"date": "2024-12-23", "recipe_id": "550e8400-e29b-41d4-a716-446655440000"},
+                    {"date": "2024-12-24", "recipe_id": "550e8400-e29b-41d4-a716-446655440001", "serving_multiplier": 2}
+                ]
+            }
+        }
+
+
 class MealPlanUpdate(BaseModel):
     """Update existing meal plan"""
     date: Optional[date] = None
@@ -2,6 +2,6 @@
 Chef's Kiss API Routes - Python Age 5.0
 """
 
-from . import auth, pantry, recipes, meal_plans, shopping_list, alerts, settings, households
+from . import auth, pantry, recipes, meal_plans, shopping_list, alerts, settings, households, batch, autocomplete
 
-__all__ = ['auth', 'pantry', 'recipes', 'meal_plans', 'shopping_list', 'alerts', 'settings', 'households']
+__all__ = ['auth', 'pantry', 'recipes', 'meal_plans', 'shopping_list', 'alerts', 'settings', 'households', 'batch', 'autocomplete']
@@ -4,15 +4,17 @@ Alerts & Suggestions Routes - Python Age 5.0
 Smart features that make the app feel ALIVE!
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 
 from utils.auth import get_current_household
+from utils.query_budget import query_budget
 from state_manager import StateManager
 
 router = APIRouter(prefix="/api/alerts", tags=["alerts"])
 
 
 @router.get("/expiring")
+@query_budget(0)
 async def get_expiring_items(
     days: int = 3,
     household_id: str = Depends(get_current_household)
@@ -38,6 +40,7 @@ async def get_expiring_items(
 
 
 @router.get("/suggestions/use-expiring")
+@query_budget(0)
 async def suggest_recipes_for_expiring(household_id: str = Depends(get_current_household)):
     """
     Smart suggestions: Recipes that use expiring ingredients.
@@ -58,6 +61,7 @@ async def suggest_recipes_for_expiring(household_id: str = Depends(get_current_h
 
 
 @router.get("/suggestions/ready-to-cook")
+@query_budget(0)
 async def suggest_ready_recipes(household_id: str = Depends(get_current_household)):
     """
     Get recipes you can make RIGHT NOW with what you have.
@@ -79,7 +83,42 @@ async def suggest_ready_recipes(household_id: str = Depends(get_current_househol
     }
 
 
+@router.get("/suggestions/almost-ready")
+@query_budget(0)
+async def suggest_almost_ready_recipes(
+    max_missing: int = Query(2, ge=1, le=3),
+    limit: int = Query(10, ge=1, le=25),
+    household_id: str = Depends(get_current_household)
+):
+    """
+    Recipes you could cook with a few more items.
+
+    Ranked by number of missing ingredients, then by how much is missing.
+    Worked out together with ready-to-cook whenever the state changes,
+    so this is just a read.
+
+    Args:
+        max_missing: Only recipes missing at most this many ingredients
+        limit: Maximum number of recipes
+
+    Returns:
+        Recipes with what's missing from each
+    """
+    state = StateManager.get_state(household_id)
+
+    almost_ready = [
+        entry for entry in state.near_miss_recipes
+        if entry["missing_count"] <= max_missing
+    ][:limit]
+
+    return {
+        "almost_ready": almost_ready,
+        "total": len(almost_ready)
+    }
+
+
 @router.get("/pantry-health")
+@query_budget(0)
 async def get_pantry_health(household_id: str = Depends(get_current_household)):
     """
     Get overall pantry health status.
@@ -95,6 +134,7 @@ async def get_pantry_health(household_id: str = Depends(get_current_household)):
 
 
 @router.get("/dashboard")
+@query_budget(0)
 async def get_dashboard_summary(household_id: str = Depends(get_current_household)):
     """
     Complete dashboard summary.
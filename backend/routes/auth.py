@@ -8,6 +8,7 @@ from fastapi import APIRouter, HTTPException, status, Header
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from utils.supabase_client import get_supabase
+from utils.memberships import MembershipCache
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
@@ -58,6 +59,7 @@ async def signup(request: SignUpRequest):
             'user_id': user.id,
             'role': 'owner'
         }).execute()
+        MembershipCache.invalidate(user.id)
 
         return {
             "user": {
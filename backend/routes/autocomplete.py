@@ -0,0 +1,47 @@
+"""
+Autocomplete Routes - Python Age 5.0
+
+Item name suggestions for the add-item and shopping forms.
+"""
+
+from fastapi import APIRouter, Depends, Query
+import time
+
+from utils.auth import get_current_household
+from utils.query_budget import query_budget
+from state_manager import StateManager
+from autocomplete import AutocompleteIndex
+
+router = APIRouter(prefix="/api/autocomplete", tags=["autocomplete"])
+
+
+@router.get("")
+@router.get("/", include_in_schema=False)
+@query_budget(1)
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=10),
+    household_id: str = Depends(get_current_household)
+):
+    """
+    Suggest item names starting with q.
+
+    Draws on pantry items, recipe ingredients, manual shopping items and
+    recent purchases, weighted by how often and how recently each name
+    was used. Suggestions include the unit/category last used with the
+    name so the form can prefill them.
+
+    Args:
+        q: What the user has typed so far
+        limit: Maximum suggestions
+    """
+    state = StateManager.get_state(household_id)
+    index = AutocompleteIndex.for_state(state)
+
+    started = time.perf_counter()
+    suggestions = index.suggest(q, limit)
+
+    return {
+        "suggestions": suggestions,
+        "took_ms": round((time.perf_counter() - started) * 1000, 3)
+    }
@@ -0,0 +1,158 @@
+"""
+Batch Routes - Python Age 5.0
+
+Apply many changes in one request: a grocery unload, a recipe import,
+a week of meal planning. Operations run in order, the household is
+recalculated once at the end and the response covers every section
+that was touched.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import ValidationError
+from typing import Optional
+import logging
+
+from models.batch import BatchRequest
+from models.pantry import PantryItemCreate, PantryItemUpdate
+from models.recipe import RecipeCreate, RecipeUpdate
+from models.meal_plan import MealPlanCreate, MealPlanUpdate
+from models.shopping import ManualShoppingItemCreate, ShoppingItemUpdate
+from utils.auth import get_current_household, get_current_user
+from utils.supabase_client import get_supabase
+from utils.responses import RETURN_MODE_PATTERN, capture_previous, mutation_response
+from utils.idempotency import CommittedError, idempotent, get_idempotency_key
+from state_manager import StateManager
+from . import pantry, recipes, meal_plans, shopping_list
+
+router = APIRouter(prefix="/api/batch", tags=["batch"])
+logger = logging.getLogger(__name__)
+
+# Per resource: (create model, update model, insert, update, delete, sections)
+BATCH_HANDLERS = {
+    "pantry": (
+        PantryItemCreate, PantryItemUpdate,
+        pantry.insert_pantry_items, pantry.update_pantry_item_rows, pantry.delete_pantry_item_rows,
+        pantry.PANTRY_SECTIONS
+    ),
+    "recipes": (
+        RecipeCreate, RecipeUpdate,
+        recipes.insert_recipes, recipes.update_recipe_row, recipes.delete_recipe_row,
+        recipes.RECIPE_SECTIONS
+    ),
+    "meal_plans": (
+        MealPlanCreate, MealPlanUpdate,
+        meal_plans.insert_meal_plans, meal_plans.update_meal_plan_row, meal_plans.delete_meal_plan_row,
+        meal_plans.MEAL_PLAN_SECTIONS
+    ),
+    "shopping": (
+        ManualShoppingItemCreate, ShoppingItemUpdate,
+        shopping_list.insert_manual_items, shopping_list.update_manual_item_row, shopping_list.delete_manual_item_row,
+        shopping_list.SHOPPING_SECTIONS
+    ),
+}
+
+
+@router.post("")
+@router.post("/", include_in_schema=False)
+@idempotent("batch")
+async def apply_batch(
+    batch: BatchRequest,
+    return_mode: str = Query("delta", alias="return", pattern=RETURN_MODE_PATTERN),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    user: dict = Depends(get_current_user),
+    household_id: str = Depends(get_current_household)
+):
+    """
+    Apply an ordered list of operations.
+
+    Each operation is {"op": "<resource>.<add|update|delete>", "id": ..., "data": {...}}
+    where data is the body the single-item endpoint takes. Everything is
+    validated before anything is written; consecutive adds to the same
+    resource go in one insert. Returns one result per operation plus what
+    changed (delta by default, ?return=full or ?return=none also work).
+
+    If a write fails, the earlier operations stay applied and the error
+    says which operation failed so the client can resend the rest (with a
+    new Idempotency-Key - the old one replays this error).
+    """
+    supabase = get_supabase()
+
+    # Validate everything up front - a typo in op 40 shouldn't leave 39 applied
+    steps = []
+    for index, operation in enumerate(batch.operations):
+        resource, action = operation.op.split(".")
+        create_model, update_model = BATCH_HANDLERS[resource][:2]
+
+        if action != "add" and not operation.id:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"message": f"{operation.op} needs an id", "failed_index": index}
+            )
+
+        payload = None
+        if action != "delete":
+            model = create_model if action == "add" else update_model
+            try:
+                payload = model.model_validate(operation.data)
+            except ValidationError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail={"message": f"Invalid data for {operation.op}", "failed_index": index, "errors": e.errors(include_url=False)}
+                )
+
+        steps.append((resource, action, operation.id, payload))
+
+    sections = []
+    for resource, _, _, _ in steps:
+        for section in BATCH_HANDLERS[resource][5]:
+            if section not in sections:
+                sections.append(section)
+
+    previous = capture_previous(household_id, return_mode)
+    results = []
+
+    def update():
+        index = 0
+        while index < len(steps):
+            resource, action, item_id, payload = steps[index]
+            _, _, insert, update_row, delete_row, _ = BATCH_HANDLERS[resource]
+
+            try:
+                if action == "add":
+                    # Run of adds to the same resource -> one insert
+                    end = index
+                    while end < len(steps) and steps[end][:2] == (resource, "add"):
+                        end += 1
+                    new_ids = insert(supabase, household_id, [step[3] for step in steps[index:end]])
+                    for offset, new_id in enumerate(new_ids):
+                        results.append({"op": batch.operations[index + offset].op, "id": new_id})
+                    index = end
+                    continue
+
+                if action == "update":
+                    if resource == "shopping":
+                        update_row(supabase, household_id, item_id, payload, user['id'])
+                    else:
+                        update_row(supabase, household_id, item_id, payload)
+                else:
+                    delete_row(supabase, household_id, item_id)
+            except Exception as e:
+                logger.error(f"❌ Batch operation {index} ({batch.operations[index].op}) failed: {e}")
+                # Once something was written, the key must not let a retry re-apply it
+                error = CommittedError if results else HTTPException
+                raise error(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail={
+                        "message": f"{batch.operations[index].op} failed",
+                        "failed_index": index,
+                        "results": results
+                    }
+                )
+
+            results.append({"op": batch.operations[index].op, "id": item_id})
+            index += 1
+
+    StateManager.update_and_invalidate(household_id, update)
+    logger.info(f"📦 Applied batch of {len(steps)} operations for household {household_id}")
+
+    return mutation_response(household_id, return_mode, sections, previous, results=results)
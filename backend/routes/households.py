@@ -15,6 +15,7 @@ from datetime import datetime, timedelta, timezone
 
 from utils.supabase_client import get_supabase
 from utils.auth import get_current_user
+from utils.memberships import MembershipCache
 
 router = APIRouter(prefix="/api/households", tags=["households"])
 
@@ -38,15 +39,12 @@ async def list_my_households(user: dict = Depends(get_current_user)):
     """List all households the current user belongs to."""
     supabase = get_supabase()
 
-    memberships = supabase.table('household_members')\
-        .select('household_id, role')\
-        .eq('user_id', user['id'])\
-        .execute()
+    memberships = MembershipCache.get(user['id'])
 
-    if not memberships.data:
+    if not memberships:
         return {"households": []}
 
-    household_ids = [m['household_id'] for m in memberships.data]
+    household_ids = [m['household_id'] for m in memberships]
 
     households = supabase.table('households')\
         .select('id, name, created_at')\
@@ -54,7 +52,7 @@ async def list_my_households(user: dict = Depends(get_current_user)):
         .execute()
 
     # Merge role info
-    role_map = {m['household_id']: m['role'] for m in memberships.data}
+    role_map = {m['household_id']: m['role'] for m in memberships}
     result = []
     for h in households.data:
         result.append({
@@ -221,6 +219,7 @@ async def accept_invite(
         'user_id': user['id'],
         'role': role
     }).execute()
+    MembershipCache.invalidate(user['id'])
 
     # Mark invite as used
     supabase.table('household_invites')\
@@ -278,6 +277,7 @@ async def leave_household(
         .eq('household_id', request.household_id)\
         .eq('user_id', user['id'])\
         .execute()
+    MembershipCache.invalidate(user['id'])
 
     return {"message": "Left household successfully"}
 
@@ -285,21 +285,12 @@ async def leave_household(
 # ===== HELPERS =====
 
 def _get_user_household(supabase, user_id: str) -> Optional[str]:
-    """Get the first household for a user."""
-    response = supabase.table('household_members')\
-        .select('household_id')\
-        .eq('user_id', user_id)\
-        .limit(1)\
-        .execute()
-    return response.data[0]['household_id'] if response.data else None
+    """Get the first household for a user (cached)."""
+    household_ids = MembershipCache.household_ids(user_id)
+    return household_ids[0] if household_ids else None
 
 
 def _verify_membership(supabase, user_id: str, household_id: str):
-    """Verify a user is a member of a household."""
-    check = supabase.table('household_members')\
-        .select('id')\
-        .eq('user_id', user_id)\
-        .eq('household_id', household_id)\
-        .execute()
-    if not check.data:
+    """Verify a user is a member of a household (cached)."""
+    if MembershipCache.role(user_id, household_id) is None:
         raise HTTPException(status_code=403, detail="Not a member of this household")
@@ -4,36 +4,71 @@ Meal Plan Routes - Python Age 5.0
 Plan your meals, and everything syncs automatically.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
 from datetime import date
+import logging
 
-from models.meal_plan import MealPlanCreate, MealPlanUpdate
+from models.meal_plan import MealPlan, MealPlanCreate, MealPlanBatchCreate, MealPlanUpdate
 from utils.auth import get_current_household
 from utils.supabase_client import get_supabase
+from utils.responses import RETURN_MODE_PATTERN, get_return_mode, capture_previous, mutation_response
+from utils.idempotency import idempotent, get_idempotency_key
+from utils.query_budget import query_budget
+from utils.pagination import PageParams, get_page_params, paginate
 from state_manager import StateManager
+from .pantry import set_location_quantities
 
 router = APIRouter(prefix="/api/meal-plans", tags=["meal_plans"])
+logger = logging.getLogger(__name__)
+
+# What meal plan mutations report back
+MEAL_PLAN_SECTIONS = ["meal_plans", "reserved_ingredients", "shopping_list"]
+COOK_SECTIONS = ["meal_plans", "pantry_items", "shopping_list"]
+
+# PostgREST "column not in schema cache" / Postgres undefined_column
+MISSING_COLUMN_CODES = ('PGRST204', '42703')
 
 
 @router.get("/")
-async def get_meal_plans(household_id: str = Depends(get_current_household)):
+@query_budget(0)
+async def get_meal_plans(
+    page: PageParams = Depends(get_page_params),
+    household_id: str = Depends(get_current_household)
+):
     """
     Get all upcoming meal plans.
 
     Returns meal plans + reserved ingredients + shopping list.
+    Meal plans can be paged (?limit=&cursor=, ordered by date) and
+    trimmed (?fields=date,recipe_id).
     """
     state = StateManager.get_state(household_id)
 
-    return {
-        "meal_plans": [meal.model_dump() for meal in state.meal_plans],
+    meal_plans, next_cursor = paginate(
+        state.meal_plans,
+        lambda meal: (meal.date.isoformat(), meal.id),
+        page,
+        set(MealPlan.model_fields)
+    )
+
+    response = {
+        "meal_plans": meal_plans,
         "reserved_ingredients": state.reserved_ingredients,
         "shopping_list": [item.model_dump() for item in state.shopping_list]
     }
+    if page.paginated:
+        response["next_cursor"] = next_cursor
+    return response
 
 
 @router.post("/")
+@query_budget(1, mutation=True)
+@idempotent("meal_plans:add")
 async def add_meal_plan(
     meal: MealPlanCreate,
+    return_mode: str = Depends(get_return_mode),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
     household_id: str = Depends(get_current_household)
 ):
     """
@@ -42,71 +77,70 @@ async def add_meal_plan(
     Reserved ingredients and shopping list update automatically!
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        response = supabase.table('meal_plans').insert({
-            'household_id': household_id,
-            'planned_date': meal.date.isoformat(),
-            'recipe_id': meal.recipe_id,
-            'is_cooked': False
-        }).execute()
-
-        return response.data[0]['id']
+        return insert_meal_plans(supabase, household_id, [meal])[0]
 
     meal_id = StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
+    return mutation_response(household_id, return_mode, MEAL_PLAN_SECTIONS, previous, id=meal_id)
 
-    return {
-        "id": meal_id,
-        "meal_plans": [meal.model_dump() for meal in state.meal_plans],
-        "reserved_ingredients": state.reserved_ingredients,
-        "shopping_list": [item.model_dump() for item in state.shopping_list]
-    }
+
+@router.post("/batch")
+@query_budget(1, mutation=True)
+@idempotent("meal_plans:batch")
+async def add_meal_plans_batch(
+    batch: MealPlanBatchCreate,
+    return_mode: str = Query("delta", alias="return", pattern=RETURN_MODE_PATTERN),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
+    household_id: str = Depends(get_current_household)
+):
+    """
+    Plan many meals at once (e.g. a whole week).
+
+    All meals are inserted in one statement and reservations are
+    recalculated once. Returns what changed (shopping list included)
+    unless ?return=full or ?return=none is given.
+    """
+    supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
+
+    def update():
+        return insert_meal_plans(supabase, household_id, batch.meals)
+
+    meal_ids = StateManager.update_and_invalidate(household_id, update)
+
+    return mutation_response(household_id, return_mode, MEAL_PLAN_SECTIONS, previous, ids=meal_ids)
 
 
 @router.put("/{meal_id}")
+@query_budget(1, mutation=True)
 async def update_meal_plan(
     meal_id: str,
     meal: MealPlanUpdate,
+    return_mode: str = Depends(get_return_mode),
     household_id: str = Depends(get_current_household)
 ):
     """
     Update meal plan.
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        update_data = {}
-        if meal.date is not None:
-            update_data['planned_date'] = meal.date.isoformat()
-        if meal.recipe_id is not None:
-            update_data['recipe_id'] = meal.recipe_id
-        if meal.cooked is not None:
-            update_data['is_cooked'] = meal.cooked
-
-        if update_data:
-            supabase.table('meal_plans').update(update_data)\
-                .eq('id', meal_id)\
-                .eq('household_id', household_id)\
-                .execute()
+        update_meal_plan_row(supabase, household_id, meal_id, meal)
 
     StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
-
-    return {
-        "meal_plans": [meal.model_dump() for meal in state.meal_plans],
-        "reserved_ingredients": state.reserved_ingredients,
-        "shopping_list": [item.model_dump() for item in state.shopping_list]
-    }
+    return mutation_response(household_id, return_mode, MEAL_PLAN_SECTIONS, previous)
 
 
 @router.delete("/{meal_id}")
+@query_budget(1, mutation=True)
 async def delete_meal_plan(
     meal_id: str,
+    return_mode: str = Depends(get_return_mode),
     household_id: str = Depends(get_current_household)
 ):
     """
@@ -115,27 +149,18 @@ async def delete_meal_plan(
     Shopping list updates automatically!
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        supabase.table('meal_plans')\
-            .delete()\
-            .eq('id', meal_id)\
-            .eq('household_id', household_id)\
-            .execute()
+        delete_meal_plan_row(supabase, household_id, meal_id)
 
     StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
-
-    return {
-        "meal_plans": [meal.model_dump() for meal in state.meal_plans],
-        "reserved_ingredients": state.reserved_ingredients,
-        "shopping_list": [item.model_dump() for item in state.shopping_list]
-    }
+    return mutation_response(household_id, return_mode, MEAL_PLAN_SECTIONS, previous)
 
 
 @router.post("/{meal_id}/validate")
+@query_budget(0)
 async def validate_can_cook(
     meal_id: str,
     household_id: str = Depends(get_current_household)
@@ -153,16 +178,19 @@ async def validate_can_cook(
 
 
 @router.post("/{meal_id}/cook")
+@query_budget(3, mutation=True)
 async def mark_meal_cooked(
     meal_id: str,
     force: bool = False,
+    return_mode: str = Depends(get_return_mode),
     household_id: str = Depends(get_current_household)
 ):
     """
     Mark meal as cooked and deplete pantry.
 
-    Uses database transaction to prevent race conditions!
-    Validates ingredients first unless force=True.
+    Validates ingredients first unless force=True. Ingredients are
+    matched and depleted against the household state, so the write is
+    one upsert plus the meal update.
     """
     state = StateManager.get_state(household_id)
 
@@ -182,8 +210,9 @@ async def mark_meal_cooked(
 
     supabase = get_supabase()
 
-    def update():
-        # Get the meal
+    meal = next((m for m in state.meal_plans if m.id == meal_id), None)
+    if meal is None:
+        # The state only holds upcoming meals; a past one can still be cooked (force=True)
         meal_response = supabase.table('meal_plans')\
             .select('*')\
             .eq('id', meal_id)\
@@ -193,71 +222,108 @@ async def mark_meal_cooked(
         if not meal_response.data:
             raise HTTPException(404, "Meal not found")
 
-        meal = meal_response.data[0]
+        meal_data = meal_response.data[0]
+        meal = MealPlan.from_supabase({**meal_data, 'date': meal_data['planned_date']})
 
-        # Get the recipe with ingredients
-        recipe_response = supabase.table('recipes')\
-            .select('*, recipes_ingredients(*)')\
-            .eq('id', meal['recipe_id'])\
-            .execute()
+    if not state._get_recipe(meal.recipe_id):
+        raise HTTPException(404, "Recipe not found")
 
-        recipe = recipe_response.data[0]
+    # Depletion is planned against the state (FIFO - oldest expiration first)
+    changes = state.plan_meal_depletion(meal)
 
-        # Deplete pantry for each ingredient
-        for ingredient in recipe['recipes_ingredients']:
-            qty_needed = ingredient['quantity'] * meal['serving_multiplier']
-
-            # Find pantry item
-            pantry_response = supabase.table('pantry_items')\
-                .select('*, pantry_locations(*)')\
-                .eq('household_id', household_id)\
-                .eq('name', ingredient['name'])\
-                .eq('unit', ingredient['unit'])\
-                .execute()
-
-            if pantry_response.data:
-                pantry_item = pantry_response.data[0]
-
-                # Deplete from locations (FIFO - oldest expiration first)
-                locations = sorted(
-                    pantry_item['pantry_locations'],
-                    key=lambda loc: loc.get('expiration_date') or '9999-12-31'
-                )
-
-                remaining = qty_needed
-                for location in locations:
-                    if remaining <= 0:
-                        break
-
-                    if location['quantity'] >= remaining:
-                        # This location has enough
-                        new_qty = location['quantity'] - remaining
-                        supabase.table('pantry_locations')\
-                            .update({'quantity': new_qty})\
-                            .eq('id', location['id'])\
-                            .execute()
-                        remaining = 0
-                    else:
-                        # Use all from this location
-                        remaining -= location['quantity']
-                        supabase.table('pantry_locations')\
-                            .update({'quantity': 0})\
-                            .eq('id', location['id'])\
-                            .execute()
+    def update():
+        # Two round trips, however many ingredients the recipe has
+        set_location_quantities(supabase, changes)
 
         # Mark meal as cooked
         supabase.table('meal_plans')\
             .update({'is_cooked': True})\
             .eq('id', meal_id)\
+            .eq('household_id', household_id)\
             .execute()
 
     StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
+    return mutation_response(household_id, return_mode, COOK_SECTIONS, state)
 
-    return {
-        "meal_plans": [meal.model_dump() for meal in state.meal_plans],
-        "pantry_items": [item.model_dump() for item in state.pantry_items],
-        "shopping_list": [item.model_dump() for item in state.shopping_list]
-    }
+
+# ===== WRITES =====
+# Shared by the endpoints above and POST /api/batch
+
+def insert_meal_plans(supabase, household_id: str, meals: List[MealPlanCreate]) -> List[str]:
+    """
+    Insert meal plans in one round trip.
+
+    Returns:
+        New meal plan IDs, in the same order as meals
+    """
+    rows = [
+        {
+            'household_id': household_id,
+            'planned_date': meal.date.isoformat(),
+            'recipe_id': meal.recipe_id,
+            'serving_multiplier': meal.serving_multiplier,
+            'is_cooked': False
+        }
+        for meal in meals
+    ]
+
+    try:
+        response = supabase.table('meal_plans').insert(rows).execute()
+    except Exception as e:
+        if not _multiplier_missing(e):
+            raise
+        for row in rows:
+            del row['serving_multiplier']
+        response = supabase.table('meal_plans').insert(rows).execute()
+
+    return [row['id'] for row in response.data]
+
+
+def update_meal_plan_row(supabase, household_id: str, meal_id: str, meal: MealPlanUpdate):
+    """Apply a partial update to a meal plan."""
+    update_data = {}
+    if meal.date is not None:
+        update_data['planned_date'] = meal.date.isoformat()
+    if meal.recipe_id is not None:
+        update_data['recipe_id'] = meal.recipe_id
+    if meal.serving_multiplier is not None:
+        update_data['serving_multiplier'] = meal.serving_multiplier
+    if meal.cooked is not None:
+        update_data['is_cooked'] = meal.cooked
+
+    if not update_data:
+        return
+
+    try:
+        supabase.table('meal_plans').update(update_data)\
+            .eq('id', meal_id)\
+            .eq('household_id', household_id)\
+            .execute()
+    except Exception as e:
+        if not _multiplier_missing(e):
+            raise
+        update_data.pop('serving_multiplier')
+        if update_data:
+            supabase.table('meal_plans').update(update_data)\
+                .eq('id', meal_id)\
+                .eq('household_id', household_id)\
+                .execute()
+
+
+def _multiplier_missing(error: Exception) -> bool:
+    """Whether a write failed because meal_plans.serving_multiplier doesn't exist yet."""
+    if getattr(error, 'code', None) not in MISSING_COLUMN_CODES or 'serving_multiplier' not in str(error):
+        return False
+    logger.warning("meal_plans.serving_multiplier missing (run migration_meal_plan_serving_multiplier.sql), "
+                   "saving the meal at 1x")
+    return True
+
+
+def delete_meal_plan_row(supabase, household_id: str, meal_id: str):
+    """Remove a meal from the plan."""
+    supabase.table('meal_plans')\
+        .delete()\
+        .eq('id', meal_id)\
+        .eq('household_id', household_id)\
+        .execute()
@@ -4,84 +4,100 @@ Pantry Routes - Python Age 5.0
 The pantry is the heart of Chef's Kiss.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from typing import List, Optional
 
-from models.pantry import PantryItemCreate, PantryItemUpdate
+from models.pantry import PantryItem, PantryItemCreate, PantryItemUpdate
 from utils.auth import get_current_household
 from utils.supabase_client import get_supabase
+from utils.responses import get_return_mode, capture_previous, mutation_response
+from utils.idempotency import idempotent, get_idempotency_key
+from utils.pagination import PageParams, get_page_params, paginate
+from utils.query_budget import query_budget
 from state_manager import StateManager
 
 router = APIRouter(prefix="/api/pantry", tags=["pantry"])
 
+# What pantry mutations report back
+PANTRY_SECTIONS = ["pantry_items", "shopping_list", "ready_recipes"]
+
+# Suggested when a household hasn't used many units yet
+COMMON_UNITS = ['each', 'lb', 'oz', 'cup', 'tbsp', 'tsp', 'gallon', 'quart', 'pint', 'g', 'kg', 'ml', 'l', 'bunch', 'can', 'bottle', 'bag', 'box', 'package']
+
 
 @router.get("/")
-async def get_pantry(household_id: str = Depends(get_current_household)):
+@query_budget(0)
+async def get_pantry(
+    page: PageParams = Depends(get_page_params),
+    household_id: str = Depends(get_current_household)
+):
     """
     Get all pantry items with automatically calculated data.
 
     Returns pantry + shopping list + ready recipes all at once!
     Everything syncs automatically.
+
+    Pantry items can be paged (?limit=&cursor=, ordered by name) and
+    trimmed (?fields=name,locations).
     """
     state = StateManager.get_state(household_id)
 
-    return {
-        "pantry_items": [item.model_dump() for item in state.pantry_items],
+    pantry_items, next_cursor = paginate(
+        state.pantry_items,
+        lambda item: (item.name.lower(), item.id),
+        page,
+        set(PantryItem.model_fields)
+    )
+
+    response = {
+        "pantry_items": pantry_items,
         "shopping_list": [item.model_dump() for item in state.shopping_list],
         "ready_recipes": state.ready_to_cook_recipe_ids,
         "pantry_health": state.get_pantry_health(),
         "last_updated": state.last_updated.isoformat()
     }
+    if page.paginated:
+        response["next_cursor"] = next_cursor
+    return response
 
 
 @router.get("/units")
-async def get_units(household_id: str = Depends(get_current_household)):
+@query_budget(0)
+async def get_units(
+    request: Request,
+    response: Response,
+    household_id: str = Depends(get_current_household)
+):
     """
     Get all distinct units used in this household's pantry and recipes.
 
     Useful for autocomplete/suggestions when adding new items.
+    Served from the cached state; send If-None-Match with the last ETag
+    to get a 304 when nothing changed.
     """
-    supabase = get_supabase()
-
-    # Get units from pantry
-    pantry_units = supabase.table('pantry_items')\
-        .select('unit')\
-        .eq('household_id', household_id)\
-        .execute()
-
-    # Get units from recipe ingredients
-    recipes = supabase.table('recipes')\
-        .select('ingredients')\
-        .eq('household_id', household_id)\
-        .execute()
-
-    units = set()
+    state = StateManager.get_state(household_id)
+    etag = state.units_etag
 
-    # Add pantry units
-    for item in pantry_units.data:
-        if item.get('unit'):
-            units.add(item['unit'].lower().strip())
+    if request.headers.get("If-None-Match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
 
-    # Add recipe ingredient units
-    for recipe in recipes.data:
-        ingredients = recipe.get('ingredients', []) or []
-        for ing in ingredients:
-            if ing.get('unit'):
-                units.add(ing['unit'].lower().strip())
+    units = set(state.unit_vocabulary)
 
     # Add some common defaults if we don't have many
-    common_units = ['each', 'lb', 'oz', 'cup', 'tbsp', 'tsp', 'gallon', 'quart', 'pint', 'g', 'kg', 'ml', 'l', 'bunch', 'can', 'bottle', 'bag', 'box', 'package']
     if len(units) < 5:
-        for u in common_units[:10]:
-            units.add(u)
+        units.update(COMMON_UNITS[:10])
 
-    # Sort and return
-    return {"units": sorted(list(units))}
+    response.headers["ETag"] = etag
+    return {"units": sorted(units)}
 
 
 @router.post("/")
+@query_budget(2, mutation=True)
+@idempotent("pantry:add")
 async def add_pantry_item(
     item: PantryItemCreate,
+    return_mode: str = Depends(get_return_mode),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
     household_id: str = Depends(get_current_household)
 ):
     """
@@ -90,47 +106,22 @@ async def add_pantry_item(
     Shopping list automatically updates!
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        # Insert pantry item
-        item_response = supabase.table('pantry_items').insert({
-            'household_id': household_id,
-            'name': item.name,
-            'category': item.category,
-            'unit': item.unit,
-            'min_threshold': item.min_threshold
-        }).execute()
-
-        item_id = item_response.data[0]['id']
-
-        # Insert locations (if any provided)
-        for location in item.locations:
-            supabase.table('pantry_locations').insert({
-                'pantry_item_id': item_id,
-                'location_name': location.get('location', 'Unspecified'),
-                'quantity': location.get('quantity', 0),
-                'expiration_date': location.get('expiration_date')
-            }).execute()
-
-        return item_id
+        return insert_pantry_items(supabase, household_id, [item])[0]
 
     item_id = StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
-
-    return {
-        "id": item_id,
-        "pantry_items": [item.model_dump() for item in state.pantry_items],
-        "shopping_list": [item.model_dump() for item in state.shopping_list],
-        "ready_recipes": state.ready_to_cook_recipe_ids
-    }
+    return mutation_response(household_id, return_mode, PANTRY_SECTIONS, previous, id=item_id)
 
 
 @router.put("/{item_id}")
+@query_budget(3, mutation=True)
 async def update_pantry_item(
     item_id: str,
     item: PantryItemUpdate,
+    return_mode: str = Depends(get_return_mode),
     household_id: str = Depends(get_current_household)
 ):
     """
@@ -139,57 +130,21 @@ async def update_pantry_item(
     Everything syncs automatically!
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        # Build update dict (only include provided fields)
-        update_data = {}
-        if item.name is not None:
-            update_data['name'] = item.name
-        if item.category is not None:
-            update_data['category'] = item.category
-        if item.unit is not None:
-            update_data['unit'] = item.unit
-        if item.min_threshold is not None:
-            update_data['min_threshold'] = item.min_threshold
-
-        if update_data:
-            supabase.table('pantry_items').update(update_data)\
-                .eq('id', item_id)\
-                .eq('household_id', household_id)\
-                .execute()
-
-        # Update locations if provided
-        if item.locations is not None:
-            # Delete old locations
-            supabase.table('pantry_locations')\
-                .delete()\
-                .eq('pantry_item_id', item_id)\
-                .execute()
-
-            # Insert new locations
-            for location in item.locations:
-                supabase.table('pantry_locations').insert({
-                    'pantry_item_id': item_id,
-                    'location_name': location.get('location', 'Unspecified'),
-                    'quantity': location.get('quantity', 0),
-                    'expiration_date': location.get('expiration_date')
-                }).execute()
+        update_pantry_item_rows(supabase, household_id, item_id, item)
 
     StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
-
-    return {
-        "pantry_items": [item.model_dump() for item in state.pantry_items],
-        "shopping_list": [item.model_dump() for item in state.shopping_list],
-        "ready_recipes": state.ready_to_cook_recipe_ids
-    }
+    return mutation_response(household_id, return_mode, PANTRY_SECTIONS, previous)
 
 
 @router.delete("/{item_id}")
+@query_budget(2, mutation=True)
 async def delete_pantry_item(
     item_id: str,
+    return_mode: str = Depends(get_return_mode),
     household_id: str = Depends(get_current_household)
 ):
     """
@@ -198,28 +153,130 @@ async def delete_pantry_item(
     Shopping list updates automatically!
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        # Delete locations first (foreign key constraint)
+        delete_pantry_item_rows(supabase, household_id, item_id)
+
+    StateManager.update_and_invalidate(household_id, update)
+
+    return mutation_response(household_id, return_mode, PANTRY_SECTIONS, previous)
+
+
+# ===== WRITES =====
+# Shared by the endpoints above and POST /api/batch
+
+def insert_pantry_items(supabase, household_id: str, items: List[PantryItemCreate]) -> List[str]:
+    """
+    Insert pantry items and their locations.
+
+    Two round trips no matter how many items or locations.
+
+    Returns:
+        New item IDs, in the same order as items
+    """
+    item_response = supabase.table('pantry_items').insert([
+        {
+            'household_id': household_id,
+            'name': item.name,
+            'category': item.category,
+            'unit': item.unit,
+            'min_threshold': item.min_threshold
+        }
+        for item in items
+    ]).execute()
+
+    item_ids = [row['id'] for row in item_response.data]
+
+    # Insert locations (if any provided)
+    location_rows = [
+        _location_row(item_id, location)
+        for item_id, item in zip(item_ids, items)
+        for location in item.locations
+    ]
+    if location_rows:
+        supabase.table('pantry_locations').insert(location_rows).execute()
+
+    return item_ids
+
+
+def update_pantry_item_rows(supabase, household_id: str, item_id: str, item: PantryItemUpdate):
+    """Apply a partial update to a pantry item (and replace its locations if given)."""
+    # Build update dict (only include provided fields)
+    update_data = {}
+    if item.name is not None:
+        update_data['name'] = item.name
+    if item.category is not None:
+        update_data['category'] = item.category
+    if item.unit is not None:
+        update_data['unit'] = item.unit
+    if item.min_threshold is not None:
+        update_data['min_threshold'] = item.min_threshold
+
+    if update_data:
+        supabase.table('pantry_items').update(update_data)\
+            .eq('id', item_id)\
+            .eq('household_id', household_id)\
+            .execute()
+
+    # Update locations if provided
+    if item.locations is not None:
+        # Delete old locations
         supabase.table('pantry_locations')\
             .delete()\
             .eq('pantry_item_id', item_id)\
             .execute()
 
-        # Delete item
-        supabase.table('pantry_items')\
-            .delete()\
-            .eq('id', item_id)\
-            .eq('household_id', household_id)\
-            .execute()
+        # Insert new locations
+        if item.locations:
+            supabase.table('pantry_locations')\
+                .insert([_location_row(item_id, location) for location in item.locations])\
+                .execute()
 
-    StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
+def delete_pantry_item_rows(supabase, household_id: str, item_id: str):
+    """Delete a pantry item and its locations."""
+    # Delete locations first (foreign key constraint)
+    supabase.table('pantry_locations')\
+        .delete()\
+        .eq('pantry_item_id', item_id)\
+        .execute()
+
+    # Delete item
+    supabase.table('pantry_items')\
+        .delete()\
+        .eq('id', item_id)\
+        .eq('household_id', household_id)\
+        .execute()
+
 
+def set_location_quantities(supabase, changes: List[tuple]):
+    """
+    Set new quantities on existing pantry locations in one round trip.
+
+    Args:
+        changes: (pantry_item_id, PantryLocation, new_quantity) tuples
+    """
+    if not changes:
+        return
+
+    # Upsert on id; the full row is sent so the insert half of the upsert is valid too
+    supabase.table('pantry_locations').upsert([
+        {
+            'id': location.id,
+            'pantry_item_id': item_id,
+            'location_name': location.location,
+            'quantity': quantity,
+            'expiration_date': location.expiration_date.isoformat() if location.expiration_date else None
+        }
+        for item_id, location, quantity in changes
+    ], on_conflict='id').execute()
+
+
+def _location_row(item_id: str, location: dict) -> dict:
     return {
-        "pantry_items": [item.model_dump() for item in state.pantry_items],
-        "shopping_list": [item.model_dump() for item in state.shopping_list],
-        "ready_recipes": state.ready_to_cook_recipe_ids
+        'pantry_item_id': item_id,
+        'location_name': location.get('location', 'Unspecified'),
+        'quantity': location.get('quantity', 0),
+        'expiration_date': location.get('expiration_date')
     }
@@ -6,29 +6,55 @@ Recipes with smart search and filtering.
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
+import time
 
-from models.recipe import RecipeCreate, RecipeUpdate
+from models.recipe import Recipe, RecipeCreate, RecipeUpdate
 from utils.auth import get_current_household
 from utils.supabase_client import get_supabase
+from utils.responses import get_return_mode, capture_previous, mutation_response
+from utils.pagination import PageParams, get_page_params, paginate
+from utils.query_budget import query_budget
 from state_manager import StateManager
+from search_index import RecipeSearchIndex
 
 router = APIRouter(prefix="/api/recipes", tags=["recipes"])
 
+# What recipe mutations report back
+RECIPE_SECTIONS = ["recipes", "ready_to_cook"]
+
 
 @router.get("/")
-async def get_recipes(household_id: str = Depends(get_current_household)):
+@query_budget(0)
+async def get_recipes(
+    page: PageParams = Depends(get_page_params),
+    household_id: str = Depends(get_current_household)
+):
     """
     Get all recipes.
+
+    Recipes can be paged (?limit=&cursor=, ordered by name) and trimmed
+    (?fields=name,tags leaves out instructions and ingredients).
     """
     state = StateManager.get_state(household_id)
 
-    return {
-        "recipes": [recipe.model_dump() for recipe in state.recipes],
+    recipes, next_cursor = paginate(
+        state.recipes,
+        lambda recipe: (recipe.name.lower(), recipe.id),
+        page,
+        set(Recipe.model_fields)
+    )
+
+    response = {
+        "recipes": recipes,
         "ready_to_cook": state.ready_to_cook_recipe_ids
     }
+    if page.paginated:
+        response["next_cursor"] = next_cursor
+    return response
 
 
 @router.get("/search")
+@query_budget(0)
 async def search_recipes(
     q: Optional[str] = None,
     tags: Optional[List[str]] = Query(None),
@@ -39,43 +65,36 @@ async def search_recipes(
     """
     Search and filter recipes.
 
+    Uses the household's search index (rebuilt only when state changes).
+    Results are ranked: exact/prefix/whole-word name hits first, then
+    matched ingredients, then ready-to-cook.
+
     Args:
         q: Search term (searches recipe name)
         tags: Filter by tags
         ready_only: Only show ready-to-cook recipes
         has_ingredients: Filter by ingredients
     """
+    started = time.perf_counter()
     state = StateManager.get_state(household_id)
-    recipes = state.recipes
 
-    # Filter by search term
-    if q:
-        q_lower = q.lower()
-        recipes = [r for r in recipes if q_lower in r.name.lower()]
-
-    # Filter by tags
-    if tags:
-        recipes = [r for r in recipes if any(tag in r.tags for tag in tags)]
-
-    # Filter by ready to cook
-    if ready_only:
-        recipes = [r for r in recipes if r.id in state.ready_to_cook_recipe_ids]
-
-    # Filter by ingredients
-    if has_ingredients:
-        has_lower = [ing.lower() for ing in has_ingredients]
-        recipes = [
-            r for r in recipes
-            if any(ing.lower() in [i.name.lower() for i in r.ingredients] for ing in has_lower)
-        ]
+    recipes = RecipeSearchIndex.for_state(state).search(
+        q=q,
+        tags=tags,
+        has_ingredients=has_ingredients,
+        ready_ids=set(state.ready_to_cook_recipe_ids),
+        ready_only=ready_only
+    )
 
     return {
         "recipes": [recipe.model_dump() for recipe in recipes],
-        "total": len(recipes)
+        "total": len(recipes),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2)
     }
 
 
 @router.get("/{recipe_id}")
+@query_budget(0)
 async def get_recipe(
     recipe_id: str,
     household_id: str = Depends(get_current_household)
@@ -97,122 +116,71 @@ async def get_recipe(
 
 
 @router.post("/")
+@query_budget(1, mutation=True)
 async def add_recipe(
     recipe: RecipeCreate,
+    return_mode: str = Depends(get_return_mode),
     household_id: str = Depends(get_current_household)
 ):
     """
     Add new recipe.
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        # Insert recipe with ingredients as JSONB
-        recipe_response = supabase.table('recipes').insert({
-            'household_id': household_id,
-            'name': recipe.name,
-            'category': recipe.category,
-            'tags': recipe.tags,
-            'instructions': recipe.instructions,
-            'ingredients': recipe.ingredients  # Store as JSONB
-        }).execute()
-
-        recipe_id = recipe_response.data[0]['id']
-        return recipe_id
+        return insert_recipes(supabase, household_id, [recipe])[0]
 
     recipe_id = StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
-
-    return {
-        "id": recipe_id,
-        "recipes": [recipe.model_dump() for recipe in state.recipes],
-        "ready_to_cook": state.ready_to_cook_recipe_ids
-    }
+    return mutation_response(household_id, return_mode, RECIPE_SECTIONS, previous, id=recipe_id)
 
 
 @router.put("/{recipe_id}")
+@query_budget(1, mutation=True)
 async def update_recipe(
     recipe_id: str,
     recipe: RecipeUpdate,
+    return_mode: str = Depends(get_return_mode),
     household_id: str = Depends(get_current_household)
 ):
     """
     Update existing recipe.
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        # Build update dict
-        update_data = {}
-        if recipe.name is not None:
-            update_data['name'] = recipe.name
-        if recipe.category is not None:
-            update_data['category'] = recipe.category
-        if recipe.tags is not None:
-            update_data['tags'] = recipe.tags
-        if recipe.instructions is not None:
-            update_data['instructions'] = recipe.instructions
-
-        if update_data:
-            supabase.table('recipes').update(update_data)\
-                .eq('id', recipe_id)\
-                .eq('household_id', household_id)\
-                .execute()
-
-        # Update ingredients if provided (stored as JSONB)
-        if recipe.ingredients is not None:
-            if 'ingredients' not in update_data:
-                update_data['ingredients'] = recipe.ingredients
-            # Re-run update if ingredients were provided separately
-            if update_data and 'ingredients' in update_data:
-                supabase.table('recipes').update({'ingredients': update_data['ingredients']})\
-                    .eq('id', recipe_id)\
-                    .eq('household_id', household_id)\
-                    .execute()
+        update_recipe_row(supabase, household_id, recipe_id, recipe)
 
     StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
-
-    return {
-        "recipes": [recipe.model_dump() for recipe in state.recipes],
-        "ready_to_cook": state.ready_to_cook_recipe_ids
-    }
+    return mutation_response(household_id, return_mode, RECIPE_SECTIONS, previous)
 
 
 @router.delete("/{recipe_id}")
+@query_budget(1, mutation=True)
 async def delete_recipe(
     recipe_id: str,
+    return_mode: str = Depends(get_return_mode),
     household_id: str = Depends(get_current_household)
 ):
     """
     Delete recipe.
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        # Delete recipe (ingredients stored as JSONB, no separate table)
-        supabase.table('recipes')\
-            .delete()\
-            .eq('id', recipe_id)\
-            .eq('household_id', household_id)\
-            .execute()
+        delete_recipe_row(supabase, household_id, recipe_id)
 
     StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
-
-    return {
-        "recipes": [recipe.model_dump() for recipe in state.recipes],
-        "ready_to_cook": state.ready_to_cook_recipe_ids
-    }
+    return mutation_response(household_id, return_mode, RECIPE_SECTIONS, previous)
 
 
 @router.get("/{recipe_id}/scaled")
+@query_budget(0)
 async def get_scaled_recipe(
     recipe_id: str,
     multiplier: float = 1.0,
@@ -243,3 +211,59 @@ async def get_scaled_recipe(
     ]
 
     return {"recipe": scaled_recipe}
+
+
+# ===== WRITES =====
+# Shared by the endpoints above and POST /api/batch
+
+def insert_recipes(supabase, household_id: str, recipes: List[RecipeCreate]) -> List[str]:
+    """
+    Insert recipes (ingredients stored as JSONB) in one round trip.
+
+    Returns:
+        New recipe IDs, in the same order as recipes
+    """
+    recipe_response = supabase.table('recipes').insert([
+        {
+            'household_id': household_id,
+            'name': recipe.name,
+            'category': recipe.category,
+            'tags': recipe.tags,
+            'instructions': recipe.instructions,
+            'ingredients': recipe.ingredients  # Store as JSONB
+        }
+        for recipe in recipes
+    ]).execute()
+
+    return [row['id'] for row in recipe_response.data]
+
+
+def update_recipe_row(supabase, household_id: str, recipe_id: str, recipe: RecipeUpdate):
+    """Apply a partial update to a recipe."""
+    # Build update dict
+    update_data = {}
+    if recipe.name is not None:
+        update_data['name'] = recipe.name
+    if recipe.category is not None:
+        update_data['category'] = recipe.category
+    if recipe.tags is not None:
+        update_data['tags'] = recipe.tags
+    if recipe.instructions is not None:
+        update_data['instructions'] = recipe.instructions
+    if recipe.ingredients is not None:
+        update_data['ingredients'] = recipe.ingredients  # Stored as JSONB
+
+    if update_data:
+        supabase.table('recipes').update(update_data)\
+            .eq('id', recipe_id)\
+            .eq('household_id', household_id)\
+            .execute()
+
+
+def delete_recipe_row(supabase, household_id: str, recipe_id: str):
+    """Delete a recipe (ingredients stored as JSONB, no separate table)."""
+    supabase.table('recipes')\
+        .delete()\
+        .eq('id', recipe_id)\
+        .eq('household_id', household_id)\
+        .execute()
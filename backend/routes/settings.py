@@ -3,14 +3,20 @@ Settings Routes - Python Age 5.0
 
 Household settings for categories, locations, etc.
 Replaces localStorage with proper database storage.
+
+Reads come from the settings cache (StateManager). Changes to single
+locations/categories are atomic JSONB operations in Postgres (see
+database/migration_settings_atomic_ops.sql) that return the new row,
+which goes straight back into the cache.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 import logging
 
 from models.settings import HouseholdSettings, SettingsUpdate
 from utils.auth import get_current_household
 from utils.supabase_client import get_supabase
+from state_manager import StateManager
 
 router = APIRouter(prefix="/api/settings", tags=["settings"])
 logger = logging.getLogger(__name__)
@@ -19,6 +25,9 @@ logger = logging.getLogger(__name__)
 DEFAULT_LOCATIONS = ['Pantry', 'Refrigerator', 'Freezer', 'Cabinet', 'Counter']
 DEFAULT_CATEGORIES = ['Meat', 'Dairy', 'Produce', 'Pantry', 'Frozen', 'Spices', 'Beverages', 'Snacks', 'Other']
 
+# PostgREST "function not in schema cache" / Postgres undefined_function
+MISSING_FUNCTION_CODES = ('PGRST202', '42883')
+
 
 @router.get("/")
 async def get_settings(household_id: str = Depends(get_current_household)):
@@ -28,28 +37,8 @@ async def get_settings(household_id: str = Depends(get_current_household)):
     Creates default settings if none exist.
     Falls back to defaults if table doesn't exist yet.
     """
-    supabase = get_supabase()
-
     try:
-        # Try to get existing settings
-        response = supabase.table('household_settings')\
-            .select('*')\
-            .eq('household_id', household_id)\
-            .execute()
-
-        if response.data:
-            settings = HouseholdSettings.from_supabase(response.data[0])
-        else:
-            # Create default settings
-            logger.info(f"Creating default settings for household {household_id}")
-            insert_response = supabase.table('household_settings').insert({
-                'household_id': household_id,
-                'locations': DEFAULT_LOCATIONS,
-                'categories': DEFAULT_CATEGORIES,
-                'category_emojis': {}
-            }).execute()
-
-            settings = HouseholdSettings.from_supabase(insert_response.data[0])
+        settings = HouseholdSettings.from_supabase(load_settings_row(household_id))
 
         return {
             "settings": settings.model_dump(),
@@ -94,26 +83,15 @@ async def update_settings(
         return await get_settings(household_id)
 
     try:
-        # Check if settings exist
-        existing = supabase.table('household_settings')\
-            .select('id')\
-            .eq('household_id', household_id)\
+        # One statement whether or not the row exists yet
+        update_data['household_id'] = household_id
+        response = supabase.table('household_settings')\
+            .upsert(update_data, on_conflict='household_id')\
             .execute()
 
-        if existing.data:
-            # Update existing
-            response = supabase.table('household_settings')\
-                .update(update_data)\
-                .eq('household_id', household_id)\
-                .execute()
-        else:
-            # Create new with updates
-            update_data['household_id'] = household_id
-            response = supabase.table('household_settings')\
-                .insert(update_data)\
-                .execute()
-
-        settings = HouseholdSettings.from_supabase(response.data[0])
+        row = response.data[0]
+        StateManager.cache_settings(household_id, row)
+        settings = HouseholdSettings.from_supabase(row)
 
         return {
             "settings": settings.model_dump(),
@@ -142,37 +120,19 @@ async def add_location(
     """Add a new location."""
     name = location.get('name', '').strip()
     if not name:
-        return {"error": "Location name required"}, 400
-
-    supabase = get_supabase()
-
-    # Get current settings
-    response = supabase.table('household_settings')\
-        .select('locations')\
-        .eq('household_id', household_id)\
-        .execute()
+        raise HTTPException(status_code=400, detail="Location name required")
 
-    if response.data:
-        locations = response.data[0].get('locations', DEFAULT_LOCATIONS)
-    else:
-        locations = DEFAULT_LOCATIONS.copy()
+    def add(row):
+        if name not in row['locations']:
+            row['locations'].append(name)
 
-    # Add if not already present
-    if name not in locations:
-        locations.append(name)
+    row = apply_settings_op(
+        household_id, 'settings_add_item',
+        {'p_field': 'locations', 'p_value': name},
+        add
+    )
 
-        if response.data:
-            supabase.table('household_settings')\
-                .update({'locations': locations})\
-                .eq('household_id', household_id)\
-                .execute()
-        else:
-            supabase.table('household_settings').insert({
-                'household_id': household_id,
-                'locations': locations
-            }).execute()
-
-    return {"locations": locations, "message": f"Location '{name}' added"}
+    return {"locations": row['locations'], "message": f"Location '{name}' added"}
 
 
 @router.delete("/locations/{location_name}")
@@ -181,23 +141,17 @@ async def remove_location(
     household_id: str = Depends(get_current_household)
 ):
     """Remove a location."""
-    supabase = get_supabase()
+    def remove(row):
+        if location_name in row['locations']:
+            row['locations'].remove(location_name)
 
-    response = supabase.table('household_settings')\
-        .select('locations')\
-        .eq('household_id', household_id)\
-        .execute()
-
-    if response.data:
-        locations = response.data[0].get('locations', DEFAULT_LOCATIONS)
-        if location_name in locations:
-            locations.remove(location_name)
-            supabase.table('household_settings')\
-                .update({'locations': locations})\
-                .eq('household_id', household_id)\
-                .execute()
+    row = apply_settings_op(
+        household_id, 'settings_remove_item',
+        {'p_field': 'locations', 'p_value': location_name},
+        remove
+    )
 
-    return {"locations": locations, "message": f"Location '{location_name}' removed"}
+    return {"locations": row['locations'], "message": f"Location '{location_name}' removed"}
 
 
 @router.post("/categories")
@@ -210,47 +164,52 @@ async def add_category(
     emoji = category.get('emoji', '')
 
     if not name:
-        return {"error": "Category name required"}, 400
+        raise HTTPException(status_code=400, detail="Category name required")
 
-    supabase = get_supabase()
+    def add(row):
+        if name not in row['categories']:
+            row['categories'].append(name)
+        if emoji:
+            row['category_emojis'][name] = emoji
 
-    # Get current settings
-    response = supabase.table('household_settings')\
-        .select('categories, category_emojis')\
-        .eq('household_id', household_id)\
-        .execute()
+    row = apply_settings_op(
+        household_id, 'settings_add_item',
+        {'p_field': 'categories', 'p_value': name, 'p_emoji': emoji or None},
+        add
+    )
+
+    return {
+        "categories": row['categories'],
+        "category_emojis": row['category_emojis'],
+        "message": f"Category '{name}' added"
+    }
 
-    if response.data:
-        categories = response.data[0].get('categories', DEFAULT_CATEGORIES)
-        emojis = response.data[0].get('category_emojis', {})
-    else:
-        categories = DEFAULT_CATEGORIES.copy()
-        emojis = {}
 
-    # Add if not already present
-    if name not in categories:
-        categories.append(name)
+@router.put("/categories/{category_name}/emoji")
+async def set_category_emoji(
+    category_name: str,
+    body: dict,
+    household_id: str = Depends(get_current_household)
+):
+    """Set a category's emoji (empty emoji removes it)."""
+    emoji = (body.get('emoji') or '').strip()
 
-    # Update emoji if provided
-    if emoji:
-        emojis[name] = emoji
+    def set_emoji(row):
+        if emoji:
+            row['category_emojis'][category_name] = emoji
+        else:
+            row['category_emojis'].pop(category_name, None)
 
-    if response.data:
-        supabase.table('household_settings')\
-            .update({'categories': categories, 'category_emojis': emojis})\
-            .eq('household_id', household_id)\
-            .execute()
-    else:
-        supabase.table('household_settings').insert({
-            'household_id': household_id,
-            'categories': categories,
-            'category_emojis': emojis
-        }).execute()
+    row = apply_settings_op(
+        household_id, 'settings_set_emoji',
+        {'p_category': category_name, 'p_emoji': emoji},
+        set_emoji
+    )
 
     return {
-        "categories": categories,
-        "category_emojis": emojis,
-        "message": f"Category '{name}' added"
+        "categories": row['categories'],
+        "category_emojis": row['category_emojis'],
+        "message": f"Emoji for '{category_name}' updated"
     }
 
 
@@ -260,32 +219,109 @@ async def remove_category(
     household_id: str = Depends(get_current_household)
 ):
     """Remove a category."""
-    supabase = get_supabase()
+    def remove(row):
+        if category_name in row['categories']:
+            row['categories'].remove(category_name)
+        row['category_emojis'].pop(category_name, None)
+
+    row = apply_settings_op(
+        household_id, 'settings_remove_item',
+        {'p_field': 'categories', 'p_value': category_name},
+        remove
+    )
+
+    return {
+        "categories": row['categories'],
+        "category_emojis": row['category_emojis'],
+        "message": f"Category '{category_name}' removed"
+    }
+
+
+# ===== HELPERS =====
+
+def load_settings_row(household_id: str) -> dict:
+    """
+    Get the household_settings row (cache first), creating defaults if missing.
+    """
+    cached = StateManager.get_cached_settings(household_id)
+    if cached:
+        return cached
 
+    supabase = get_supabase()
     response = supabase.table('household_settings')\
-        .select('categories, category_emojis')\
+        .select('*')\
         .eq('household_id', household_id)\
         .execute()
 
     if response.data:
-        categories = response.data[0].get('categories', DEFAULT_CATEGORIES)
-        emojis = response.data[0].get('category_emojis', {})
+        row = response.data[0]
+    else:
+        # Create default settings
+        logger.info(f"Creating default settings for household {household_id}")
+        row = supabase.table('household_settings').upsert({
+            'household_id': household_id,
+            'locations': DEFAULT_LOCATIONS,
+            'categories': DEFAULT_CATEGORIES,
+            'category_emojis': {}
+        }, on_conflict='household_id').execute().data[0]
+
+    StateManager.cache_settings(household_id, row)
+    return row
 
-        if category_name in categories:
-            categories.remove(category_name)
-        if category_name in emojis:
-            del emojis[category_name]
 
-        supabase.table('household_settings')\
-            .update({'categories': categories, 'category_emojis': emojis})\
+def apply_settings_op(household_id: str, function: str, params: dict, fallback) -> dict:
+    """
+    Run one atomic settings function and cache the row it returns.
+
+    Args:
+        household_id: Household to change
+        function: Postgres function (settings_add_item, settings_remove_item, settings_set_emoji)
+        params: Function arguments (p_household_id is added)
+        fallback: Mutates a row dict in place - used (non-atomically) if the
+            migration hasn't been run yet
+
+    Returns:
+        The new settings row (locations, categories and category_emojis filled in)
+    """
+    supabase = get_supabase()
+
+    try:
+        row = supabase.rpc(function, {'p_household_id': household_id, **params}).execute().data
+        if isinstance(row, list):
+            row = row[0]
+    except Exception as e:
+        # Anything but a missing function (timeouts, constraint errors) is a real failure
+        if not _function_missing(e):
+            raise
+        logger.warning(f"{function} unavailable (run migration_settings_atomic_ops.sql), "
+                       f"falling back to read-modify-write: {e}")
+        StateManager.invalidate_settings(household_id)
+        row = _normalized(load_settings_row(household_id))
+        fallback(row)
+        row = supabase.table('household_settings')\
+            .update({
+                'locations': row['locations'],
+                'categories': row['categories'],
+                'category_emojis': row['category_emojis']
+            })\
             .eq('household_id', household_id)\
-            .execute()
-    else:
-        categories = DEFAULT_CATEGORIES
-        emojis = {}
+            .execute().data[0]
 
+    row = _normalized(row)
+    StateManager.cache_settings(household_id, row)
+    return row
+
+
+def _function_missing(error: Exception) -> bool:
+    """Whether PostgREST couldn't find the function (migration not run yet)."""
+    return getattr(error, 'code', None) in MISSING_FUNCTION_CODES
+
+
+def _normalized(row: dict) -> dict:
+    """Fill in defaults for NULL JSONB columns."""
     return {
-        "categories": categories,
-        "category_emojis": emojis,
-        "message": f"Category '{category_name}' removed"
+        **row,
+        'locations': list(row.get('locations') or DEFAULT_LOCATIONS),
+        'categories': list(row.get('categories') or DEFAULT_CATEGORIES),
+        'category_emojis': dict(row.get('category_emojis') or {})
     }
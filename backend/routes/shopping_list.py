@@ -11,17 +11,30 @@ Features:
 """
 
 from fastapi import APIRouter, Depends, HTTPException
+from typing import List, Optional
 from datetime import datetime
 
+from models.pantry import PantryItemCreate
 from models.shopping import ManualShoppingItemCreate, ShoppingItemUpdate
 from utils.auth import get_current_household, get_current_user
 from utils.supabase_client import get_supabase
+from utils.responses import get_return_mode, capture_previous, mutation_response
+from utils.idempotency import idempotent, get_idempotency_key
+from utils.query_budget import query_budget
 from state_manager import StateManager
+from toggle_buffer import ShoppingToggleBuffer
+from ingredients import ingredient_key
+from .pantry import insert_pantry_items, set_location_quantities
 
 router = APIRouter(prefix="/api/shopping-list", tags=["shopping"])
 
+# What shopping list mutations report back
+SHOPPING_SECTIONS = ["shopping_list"]
+RESTOCK_SECTIONS = ["pantry_items", "shopping_list"]
+
 
 @router.get("/")
+@query_budget(0)
 async def get_shopping_list(household_id: str = Depends(get_current_household)):
     """
     Get complete shopping list.
@@ -43,6 +56,7 @@ async def get_shopping_list(household_id: str = Depends(get_current_household)):
 
 
 @router.post("/regenerate")
+@query_budget(0)
 async def regenerate_shopping_list(household_id: str = Depends(get_current_household)):
     """
     Force regeneration of shopping list.
@@ -60,8 +74,12 @@ async def regenerate_shopping_list(household_id: str = Depends(get_current_house
 
 
 @router.post("/items")
+@query_budget(1, mutation=True)
+@idempotent("shopping:add")
 async def add_manual_item(
     item: ManualShoppingItemCreate,
+    return_mode: str = Depends(get_return_mode),
+    idempotency_key: Optional[str] = Depends(get_idempotency_key),
     household_id: str = Depends(get_current_household)
 ):
     """
@@ -70,34 +88,22 @@ async def add_manual_item(
     These persist separately from auto-generated items.
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        response = supabase.table('shopping_list_manual').insert({
-            'household_id': household_id,
-            'name': item.name,
-            'quantity': item.quantity,
-            'unit': item.unit,
-            'category': item.category,
-            'checked': False
-        }).execute()
-
-        return response.data[0]['id']
+        return insert_manual_items(supabase, household_id, [item])[0]
 
     item_id = StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
-
-    return {
-        "id": item_id,
-        "shopping_list": [item.model_dump() for item in state.shopping_list]
-    }
+    return mutation_response(household_id, return_mode, SHOPPING_SECTIONS, previous, id=item_id)
 
 
 @router.patch("/items/{item_id}")
+@query_budget(1, mutation=True)
 async def update_shopping_item(
     item_id: str,
     update: ShoppingItemUpdate,
+    return_mode: str = Depends(get_return_mode),
     household_id: str = Depends(get_current_household),
     user: dict = Depends(get_current_user)
 ):
@@ -105,50 +111,49 @@ async def update_shopping_item(
     Update shopping item (mainly for checking off).
 
     Only works for manual items (auto-generated items can't be edited).
+
+    Plain check-offs go through the write-behind buffer: they're applied
+    to the cached state right away and written to the database in batches.
     """
-    supabase = get_supabase()
+    toggle_only = (
+        update.checked is not None and
+        update.quantity is None and
+        update.name is None and
+        update.category is None
+    )
 
-    def update_item():
-        update_data = {}
+    if toggle_only:
+        state = StateManager.get_state(household_id)
+        is_manual_item = any(item.id == str(item_id) for item in state.manual_shopping_items)
 
-        if update.checked is not None:
-            update_data['checked'] = update.checked
-            if update.checked:
-                update_data['checked_at'] = datetime.now().isoformat()
-                update_data['checked_by'] = user['id']
-            else:
-                update_data['checked_at'] = None
-                update_data['checked_by'] = None
+        if is_manual_item:
+            update_data = ShoppingToggleBuffer.record(household_id, item_id, update.checked, user['id'])
 
-        if update.quantity is not None:
-            update_data['quantity'] = update.quantity
+            def apply_toggle(state):
+                for item in state.manual_shopping_items:
+                    if item.id == str(item_id):
+                        ShoppingToggleBuffer.apply(item, update_data)
 
-        if update.name is not None:
-            update_data['name'] = update.name
+            updated = StateManager.update_cached_state(household_id, apply_toggle)
 
-        if update.category is not None:
-            update_data['category'] = update.category
+            return mutation_response(household_id, return_mode, SHOPPING_SECTIONS, state, updated)
 
-        if update_data:
-            supabase.table('shopping_list_manual')\
-                .update(update_data)\
-                .eq('id', item_id)\
-                .eq('household_id', household_id)\
-                .execute()
+    supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
-    StateManager.update_and_invalidate(household_id, update_item)
+    def update_item():
+        update_manual_item_row(supabase, household_id, item_id, update, user['id'])
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
+    StateManager.update_and_invalidate(household_id, update_item)
 
-    return {
-        "shopping_list": [item.model_dump() for item in state.shopping_list]
-    }
+    return mutation_response(household_id, return_mode, SHOPPING_SECTIONS, previous)
 
 
 @router.delete("/items/{item_id}")
+@query_budget(1, mutation=True)
 async def delete_manual_item(
     item_id: str,
+    return_mode: str = Depends(get_return_mode),
     household_id: str = Depends(get_current_household)
 ):
     """
@@ -157,32 +162,29 @@ async def delete_manual_item(
     Only works for manual items (can't delete auto-generated items).
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
-        supabase.table('shopping_list_manual')\
-            .delete()\
-            .eq('id', item_id)\
-            .eq('household_id', household_id)\
-            .execute()
+        delete_manual_item_row(supabase, household_id, item_id)
 
     StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
-
-    return {
-        "shopping_list": [item.model_dump() for item in state.shopping_list]
-    }
+    return mutation_response(household_id, return_mode, SHOPPING_SECTIONS, previous)
 
 
 @router.post("/clear-checked")
-async def clear_checked_items(household_id: str = Depends(get_current_household)):
+@query_budget(1, mutation=True)
+async def clear_checked_items(
+    return_mode: str = Depends(get_return_mode),
+    household_id: str = Depends(get_current_household)
+):
     """
     Delete all checked manual items.
 
     Useful after shopping is complete.
     """
     supabase = get_supabase()
+    previous = capture_previous(household_id, return_mode)
 
     def update():
         supabase.table('shopping_list_manual')\
@@ -193,17 +195,18 @@ async def clear_checked_items(household_id: str = Depends(get_current_household)
 
     StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
-
-    return {
-        "shopping_list": [item.model_dump() for item in state.shopping_list],
-        "message": "Checked items cleared"
-    }
+    return mutation_response(
+        household_id, return_mode, SHOPPING_SECTIONS, previous,
+        message="Checked items cleared"
+    )
 
 
 @router.post("/add-checked-to-pantry")
-async def add_checked_to_pantry(household_id: str = Depends(get_current_household)):
+@query_budget(4, mutation=True)
+async def add_checked_to_pantry(
+    return_mode: str = Depends(get_return_mode),
+    household_id: str = Depends(get_current_household)
+):
     """
     Add all checked items to pantry.
 
@@ -212,80 +215,128 @@ async def add_checked_to_pantry(household_id: str = Depends(get_current_househol
     state = StateManager.get_state(household_id)
     supabase = get_supabase()
 
+    location_changes = {}  # location id -> (pantry item id, location, new quantity)
+    new_locations = {}     # pantry item id -> quantity (items with no location yet)
+    new_items = {}         # canonical key -> (PantryItemCreate, base units per its unit)
     added_count = 0
 
-    def update():
-        nonlocal added_count
-
-        for item in state.shopping_list:
-            if not item.checked:
-                continue
-
-            # Check if item already exists in pantry
-            existing = supabase.table('pantry_items')\
-                .select('id')\
-                .eq('household_id', household_id)\
-                .eq('name', item.name)\
-                .eq('unit', item.unit)\
-                .execute()
-
-            if existing.data:
-                # Update existing item quantity
-                pantry_id = existing.data[0]['id']
-
-                # Get current location or create default
-                location_response = supabase.table('pantry_locations')\
-                    .select('*')\
-                    .eq('pantry_item_id', pantry_id)\
-                    .limit(1)\
-                    .execute()
-
-                if location_response.data:
-                    # Add to existing location
-                    location = location_response.data[0]
-                    new_qty = location['quantity'] + item.quantity
-                    supabase.table('pantry_locations')\
-                        .update({'quantity': new_qty})\
-                        .eq('id', location['id'])\
-                        .execute()
-                else:
-                    # Create new location
-                    supabase.table('pantry_locations').insert({
-                        'pantry_item_id': pantry_id,
-                        'location_name': 'Pantry',
-                        'quantity': item.quantity
-                    }).execute()
-
-                added_count += 1
+    for item in state.shopping_list:
+        if not item.checked:
+            continue
+        added_count += 1
+
+        # Canonical name + unit, so "Eggs"/"lbs" lands on "egg"/"lb" (quantity converted)
+        match = state.match_pantry_item(item.name, item.unit)
+        if match is None:
+            # Same ingredient twice on the list -> one new pantry item, in the first one's unit
+            key, factor = ingredient_key(item.name, item.unit)
+            if key in new_items:
+                new_item, item_factor = new_items[key]
+                new_item.locations[0]['quantity'] += item.quantity * factor / item_factor
             else:
-                # Create new pantry item
-                pantry_response = supabase.table('pantry_items').insert({
-                    'household_id': household_id,
-                    'name': item.name,
-                    'unit': item.unit,
-                    'category': item.category,
-                    'min_threshold': 0
-                }).execute()
-
-                pantry_id = pantry_response.data[0]['id']
-
-                # Create location
-                supabase.table('pantry_locations').insert({
-                    'pantry_item_id': pantry_id,
-                    'location_name': 'Pantry',
-                    'quantity': item.quantity
-                }).execute()
-
-                added_count += 1
+                new_items[key] = (PantryItemCreate.model_construct(
+                    name=item.name, category=item.category, unit=item.unit, min_threshold=0,
+                    locations=[{'location': 'Pantry', 'quantity': item.quantity}]
+                ), factor)
+            continue
+
+        pantry_item, ratio = match
+        quantity = item.quantity * ratio  # in the pantry item's unit
+        if pantry_item.locations:
+            # Add to its first location
+            location = pantry_item.locations[0]
+            _, _, current = location_changes.get(location.id, (None, None, location.quantity))
+            location_changes[location.id] = (pantry_item.id, location, current + quantity)
+        else:
+            new_locations[pantry_item.id] = new_locations.get(pantry_item.id, 0) + quantity
+
+    def update():
+        # At most four round trips, however many items were checked
+        set_location_quantities(supabase, list(location_changes.values()))
+
+        if new_locations:
+            supabase.table('pantry_locations').insert([
+                {'pantry_item_id': pantry_id, 'location_name': 'Pantry', 'quantity': quantity}
+                for pantry_id, quantity in new_locations.items()
+            ]).execute()
+
+        if new_items:
+            insert_pantry_items(supabase, household_id, [new_item for new_item, _ in new_items.values()])
 
     StateManager.update_and_invalidate(household_id, update)
 
-    # Return fresh state
-    state = StateManager.get_state(household_id)
+    return mutation_response(
+        household_id, return_mode, RESTOCK_SECTIONS, state,
+        added_count=added_count,
+        message=f"Added {added_count} items to pantry"
+    )
 
-    return {
-        "pantry_items": [item.model_dump() for item in state.pantry_items],
-        "shopping_list": [item.model_dump() for item in state.shopping_list],
-        "added_count": added_count,
-        "message": f"Added {added_count} items to pantry"
-    }
+
+# ===== WRITES =====
+# Shared by the endpoints above and POST /api/batch
+
+def insert_manual_items(supabase, household_id: str, items: List[ManualShoppingItemCreate]) -> List[str]:
+    """
+    Insert manual shopping items in one round trip.
+
+    Returns:
+        New item IDs, in the same order as items
+    """
+    response = supabase.table('shopping_list_manual').insert([
+        {
+            'household_id': household_id,
+            'name': item.name,
+            'quantity': item.quantity,
+            'unit': item.unit,
+            'category': item.category,
+            'checked': False
+        }
+        for item in items
+    ]).execute()
+
+    return [row['id'] for row in response.data]
+
+
+def update_manual_item_row(
+    supabase,
+    household_id: str,
+    item_id: str,
+    update: ShoppingItemUpdate,
+    user_id: str
+):
+    """Apply a partial update to a manual shopping item (write-through)."""
+    update_data = {}
+
+    if update.checked is not None:
+        update_data['checked'] = update.checked
+        if update.checked:
+            update_data['checked_at'] = datetime.now().isoformat()
+            update_data['checked_by'] = user_id
+        else:
+            update_data['checked_at'] = None
+            update_data['checked_by'] = None
+
+    if update.quantity is not None:
+        update_data['quantity'] = update.quantity
+
+    if update.name is not None:
+        update_data['name'] = update.name
+
+    if update.category is not None:
+        update_data['category'] = update.category
+
+    if update_data:
+        supabase.table('shopping_list_manual')\
+            .update(update_data)\
+            .eq('id', item_id)\
+            .eq('household_id', household_id)\
+            .execute()
+
+
+def delete_manual_item_row(supabase, household_id: str, item_id: str):
+    """Delete a manual shopping item."""
+    supabase.table('shopping_list_manual')\
+        .delete()\
+        .eq('id', item_id)\
+        .eq('household_id', household_id)\
+        .execute()
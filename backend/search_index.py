@@ -0,0 +1,176 @@
+"""
+Recipe Search Index - Python Age 5.0
+
+Inverted index over a household's recipes for GET /api/recipes/search.
+
+Built lazily the first time a household searches at a given state
+version, then reused until the state changes:
+- Name trigrams -> recipe positions (substring candidates)
+- Name tokens   -> recipe positions (ranking whole-word hits)
+- Tags          -> recipe positions
+- Ingredients   -> recipe positions (lowercased names)
+
+Compound queries intersect postings (smallest first), so a search only
+touches recipes that can actually match.
+"""
+
+from collections import OrderedDict, defaultdict
+from typing import Dict, List, Optional, Set
+import re
+import threading
+import logging
+
+from utils.log_queue import log_sampled
+from utils.invalidation import on_invalidate
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def trigrams(text: str) -> Set[str]:
+    """All 3-character substrings of text."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class RecipeSearchIndex:
+    """Postings for one household at one state version."""
+
+    MAX_HOUSEHOLDS = 256  # indexes kept in memory (least recently used dropped)
+
+    _indexes: "OrderedDict[str, RecipeSearchIndex]" = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, recipes: list, version: int):
+        self.recipes = recipes
+        self.version = version
+        self.names = [recipe.name.lower() for recipe in recipes]
+
+        self.name_trigrams: Dict[str, Set[int]] = defaultdict(set)
+        self.name_tokens: Dict[str, Set[int]] = defaultdict(set)
+        self.tags: Dict[str, Set[int]] = defaultdict(set)
+        self.ingredients: Dict[str, Set[int]] = defaultdict(set)
+
+        for position, recipe in enumerate(recipes):
+            name = self.names[position]
+            for gram in trigrams(name):
+                self.name_trigrams[gram].add(position)
+            for token in TOKEN_PATTERN.findall(name):
+                self.name_tokens[token].add(position)
+            for tag in recipe.tags:
+                self.tags[tag].add(position)
+            for ingredient in recipe.ingredients:
+                self.ingredients[ingredient.name.lower()].add(position)
+
+    @classmethod
+    def for_state(cls, state) -> "RecipeSearchIndex":
+        """
+        Get the index for a household state, building it if the state changed.
+
+        Args:
+            state: HouseholdState
+
+        Returns:
+            RecipeSearchIndex for state.version
+        """
+        with cls._lock:
+            index = cls._indexes.get(state.household_id)
+            if index is not None and index.version == state.version:
+                cls._indexes.move_to_end(state.household_id)
+                return index
+
+        index = cls(state.recipes, state.version)
+        if log_sampled(state.household_id):
+            logger.info("🔎 Built recipe index for household %s (%d recipes, %d trigrams)",
+                        state.household_id, len(state.recipes), len(index.name_trigrams))
+
+        with cls._lock:
+            cls._indexes[state.household_id] = index
+            cls._indexes.move_to_end(state.household_id)
+            while len(cls._indexes) > cls.MAX_HOUSEHOLDS:
+                cls._indexes.popitem(last=False)
+        return index
+
+    @classmethod
+    def forget(cls, household_id: Optional[str]):
+        """Drop a household's index (None drops all of them)."""
+        with cls._lock:
+            if household_id is None:
+                cls._indexes.clear()
+            else:
+                cls._indexes.pop(household_id, None)
+
+    def search(
+        self,
+        q: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        has_ingredients: Optional[List[str]] = None,
+        ready_ids: Set[str] = frozenset(),
+        ready_only: bool = False
+    ) -> list:
+        """
+        Find and rank recipes.
+
+        Same filters as before the index: q is a case-insensitive substring
+        of the name, any of tags, any of has_ingredients (exact name,
+        case-insensitive), and only ready_ids when ready_only.
+
+        Ranking: exact name, then name prefix, then whole-word hits, then
+        other substring hits; more matched ingredients and ready-to-cook
+        break ties; original order last.
+
+        Returns:
+            Matching recipes, best first
+        """
+        q_lower = q.lower() if q else None
+        wanted_ingredients = [ing.lower() for ing in has_ingredients] if has_ingredients else []
+
+        postings = []
+        if q_lower:
+            grams = trigrams(q_lower)
+            if grams:
+                postings.extend(self.name_trigrams.get(gram, set()) for gram in grams)
+        if tags:
+            postings.append(set().union(*(self.tags.get(tag, set()) for tag in tags)))
+        if wanted_ingredients:
+            postings.append(set().union(*(self.ingredients.get(ing, set()) for ing in wanted_ingredients)))
+
+        if postings:
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates &= posting
+        else:
+            candidates = set(range(len(self.recipes)))
+
+        # Trigrams over-approximate substrings (and short queries have none)
+        if q_lower:
+            candidates = {p for p in candidates if q_lower in self.names[p]}
+        if ready_only:
+            candidates = {p for p in candidates if self.recipes[p].id in ready_ids}
+
+        query_tokens = TOKEN_PATTERN.findall(q_lower) if q_lower else []
+
+        def rank(position):
+            name = self.names[position]
+            name_score = 0
+            if q_lower:
+                if name == q_lower:
+                    name_score = 3
+                elif name.startswith(q_lower):
+                    name_score = 2
+                elif query_tokens and all(position in self.name_tokens.get(t, ()) for t in query_tokens):
+                    name_score = 1
+            ingredient_hits = sum(
+                1 for ing in wanted_ingredients if position in self.ingredients.get(ing, ())
+            )
+            ready = 1 if self.recipes[position].id in ready_ids else 0
+            return (-name_score, -ingredient_hits, -ready, position)
+
+        return [self.recipes[position] for position in sorted(candidates, key=rank)]
+
+
+# Other workers' invalidations reach this process's indexes too
+on_invalidate("state", RecipeSearchIndex.forget)
@@ -4,5 +4,9 @@
 # Use Railway's PORT environment variable, or default to 8000
 PORT=${PORT:-8000}
 
-echo "Starting uvicorn on port $PORT..."
-exec uvicorn app:app --host 0.0.0.0 --port $PORT
+# Worker processes (one per core is a good start). Workers share Redis and
+# drop each other's in-process caches via pub/sub (utils/invalidation.py)
+WEB_CONCURRENCY=${WEB_CONCURRENCY:-1}
+
+echo "Starting uvicorn on port $PORT with $WEB_CONCURRENCY worker(s)..."
+exec uvicorn app:app --host 0.0.0.0 --port $PORT --workers $WEB_CONCURRENCY
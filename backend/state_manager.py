@@ -14,51 +14,30 @@ One source of truth. Everything flows from here.
 
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, date, timedelta
-from collections import defaultdict
+from collections import Counter, defaultdict
+import hashlib
+import heapq
+import json
 import redis
 import pickle
 import logging
-import os
+import time
 
 from models.pantry import PantryItem
 from models.recipe import Recipe
 from models.meal_plan import MealPlan
 from models.shopping import ShoppingItem
 from utils.supabase_client import get_supabase
+from utils.redis_client import get_redis
+from utils.timing import cache_tier, phase
+from utils.log_queue import log_sampled
+from utils.invalidation import broadcast, on_invalidate
+from utils.metrics import CACHE_INVALIDATIONS, CALCULATE_SECONDS, LOAD_TABLE_SECONDS, STATE_BLOB_BYTES
+from toggle_buffer import ShoppingToggleBuffer
+from ingredients import ingredient_key, normalize_name
 
 logger = logging.getLogger(__name__)
 
-# Redis connection - works both locally and in Railway
-try:
-    # Railway provides REDIS_URL, local dev uses localhost
-    redis_url = os.getenv('REDIS_URL')
-
-    if redis_url:
-        # Railway/production environment
-        redis_client = redis.from_url(
-            redis_url,
-            decode_responses=False,  # We use pickle for complex objects
-            socket_connect_timeout=2
-        )
-        logger.info("🔗 Connecting to Redis via REDIS_URL...")
-    else:
-        # Local development
-        redis_client = redis.Redis(
-            host='localhost',
-            port=6379,
-            db=0,
-            decode_responses=False,
-            socket_connect_timeout=2
-        )
-        logger.info("🔗 Connecting to Redis on localhost...")
-
-    redis_client.ping()
-    logger.info("✅ Redis connected successfully")
-except (redis.ConnectionError, redis.TimeoutError) as e:
-    logger.warning(f"⚠️ Redis not available - caching disabled: {e}")
-    redis_client = None
-
-
 class HouseholdState:
     """
     Complete state for a household.
@@ -68,6 +47,18 @@ class HouseholdState:
     All calculations happen automatically when data changes.
     """
 
+    # How entities in each list section are identified when diffing
+    ENTITY_KEYS = {
+        "pantry_items": lambda item: item.id,
+        "recipes": lambda recipe: recipe.id,
+        "meal_plans": lambda meal: meal.id,
+        "shopping_list": lambda item: HouseholdState.shopping_key(item),
+    }
+    ID_SECTIONS = ("ready_recipes", "ready_to_cook")
+
+    NEAR_MISS_MAX_MISSING = 3  # recipes missing more than this aren't "almost ready"
+    NEAR_MISS_TOP_K = 25
+
     def __init__(
         self,
         household_id: str,
@@ -82,12 +73,22 @@ class HouseholdState:
         self.meal_plans = meal_plans
         self.manual_shopping_items = manual_shopping_items or []
 
+        # Matching index (set by calculate_all, see _build_match_index)
+        self._pantry_by_key: Dict[str, List[Tuple[PantryItem, float]]] = {}
+        self._available_by_key: Dict[str, float] = {}
+        self._recipes_by_id: Dict[str, Recipe] = {}
+        self._ingredient_keys: Dict[str, List[Tuple[str, float]]] = {}
+        self._display: Dict[str, Tuple[str, str, float]] = {}
+        self.unit_vocabulary: Counter = Counter()  # raw unit (lowercased) -> uses
+
         # Calculated properties (set by calculate_all)
         self.reserved_ingredients: Dict[str, float] = {}
         self.shopping_list: List[ShoppingItem] = []
-        self.ready_to_cook_recipe_ids: List[int] = []
+        self.ready_to_cook_recipe_ids: List[str] = []
+        self.near_miss_recipes: List[dict] = []
 
         self.last_updated = datetime.now()
+        self.version = self._now_version()
 
         # Calculate everything on initialization
         self.calculate_all()
@@ -99,25 +100,83 @@ class HouseholdState:
 
         This is the synchronization magic!
         """
-        logger.info(f"🔄 Recalculating state for household {self.household_id}")
+        log = log_sampled(self.household_id)
+        if log:
+            logger.info("🔄 Recalculating state for household %s", self.household_id)
+
+        with phase("calc"), CALCULATE_SECONDS.time():
+            self._build_match_index()
+            self.reserved_ingredients = self._calculate_reserved()
+            self.shopping_list = self._calculate_shopping_list()
+            self.ready_to_cook_recipe_ids, self.near_miss_recipes = self._calculate_ready_recipes()
 
-        self.reserved_ingredients = self._calculate_reserved()
-        self.shopping_list = self._calculate_shopping_list()
-        self.ready_to_cook_recipe_ids = self._calculate_ready_recipes()
+        self.mark_changed()
 
+        if log:
+            logger.info("✅ State calculated: %d shopping items, %d ready recipes",
+                        len(self.shopping_list), len(self.ready_to_cook_recipe_ids))
+
+    def mark_changed(self):
+        """Stamp a new version (clients and derived caches key off it)."""
         self.last_updated = datetime.now()
+        self.version = max(self._now_version(), self.version + 1)
 
-        logger.info(f"✅ State calculated: {len(self.shopping_list)} shopping items, "
-                   f"{len(self.ready_to_cook_recipe_ids)} ready recipes")
+    @staticmethod
+    def _now_version() -> int:
+        # Microseconds keep versions inside JavaScript's safe integer range
+        return time.time_ns() // 1000
 
     # ===== CORE CALCULATIONS =====
 
+    def _build_match_index(self):
+        """
+        Normalize names/units once so every calculation matches on
+        canonical keys ("Eggs|whole" and "egg|each" are the same thing)
+        and works in base units ("2 cup milk" and "1 l milk" add up).
+
+        Quantities in reserved_ingredients and the availability checks are
+        in base units (g, ml, each); shopping items are converted back to
+        the unit the pantry (or else the recipe) uses.
+        """
+        self._pantry_by_key = defaultdict(list)
+        self._available_by_key = defaultdict(float)
+        self._display = {}
+        self.unit_vocabulary = Counter()
+        for item in self.pantry_items:
+            self._count_unit(item.unit)
+            key, factor = ingredient_key(item.name, item.unit)
+            self._pantry_by_key[key].append((item, factor))
+            self._available_by_key[key] += item.total_quantity * factor
+            self._display.setdefault(key, (item.name, item.unit, factor))
+        self._pantry_by_key = dict(self._pantry_by_key)
+        self._available_by_key = dict(self._available_by_key)
+
+        self._recipes_by_id = {recipe.id: recipe for recipe in self.recipes}
+        self._ingredient_keys = {}
+        for recipe in self.recipes:
+            matches = [ingredient_key(ing.name, ing.unit) for ing in recipe.ingredients]
+            self._ingredient_keys[recipe.id] = matches
+            for ingredient, (key, factor) in zip(recipe.ingredients, matches):
+                self._count_unit(ingredient.unit)
+                self._display.setdefault(key, (ingredient.name, ingredient.unit, factor))
+
+    def _count_unit(self, unit: str):
+        unit = (unit or "").lower().strip()
+        if unit:
+            self.unit_vocabulary[unit] += 1
+
+    @property
+    def units_etag(self) -> str:
+        """ETag for the unit vocabulary (changes only when the set of units does)"""
+        digest = hashlib.sha1("|".join(sorted(self.unit_vocabulary)).encode()).hexdigest()
+        return f'"{digest[:16]}"'
+
     def _calculate_reserved(self) -> Dict[str, float]:
         """
         Calculate what ingredients are reserved by upcoming meals.
 
         Returns:
-            Dict mapping "name|unit" to quantity reserved
+            Dict mapping "name|base unit" to quantity reserved (in base units)
         """
         reserved = defaultdict(float)
 
@@ -134,9 +193,8 @@ class HouseholdState:
             if not recipe:
                 continue
 
-            for ingredient in recipe.ingredients:
-                key = f"{ingredient.name.lower()}|{ingredient.unit}"
-                reserved[key] += ingredient.quantity * meal.serving_multiplier
+            for ingredient, (key, factor) in zip(recipe.ingredients, self._ingredient_keys[recipe.id]):
+                reserved[key] += ingredient.quantity * factor * meal.serving_multiplier
 
         return dict(reserved)
 
@@ -153,50 +211,44 @@ class HouseholdState:
             Complete shopping list
         """
         shopping = []
-        added_keys = set()  # Track to avoid duplicates
+        added = {}  # key -> meal item, to avoid duplicates
 
         # Part 1: What meals need
         for key, needed_qty in self.reserved_ingredients.items():
-            name, unit = key.split("|")
-
-            pantry_item = self._find_pantry_item(name, unit)
-            available = pantry_item.total_quantity if pantry_item else 0
+            matches = self._pantry_by_key.get(key)
+            available = self._available(key)
 
             if available < needed_qty:
-                shopping.append(ShoppingItem(
+                name, unit, factor = self._display[key]
+                shop_item = ShoppingItem(
                     name=name.title(),
-                    quantity=round(needed_qty - available, 2),
+                    quantity=round((needed_qty - available) / factor, 2),
                     unit=unit,
-                    category=pantry_item.category if pantry_item else "Other",
+                    category=matches[0][0].category if matches else "Other",
                     source="Meals",
                     checked=False
-                ))
-                added_keys.add(key)
-
-        # Part 2: Items below threshold
-        for item in self.pantry_items:
-            key = f"{item.name.lower()}|{item.unit}"
-
-            # Skip if already added from meals
-            if key in added_keys:
-                # But increase quantity if threshold requires more
-                for shop_item in shopping:
-                    if (shop_item.name.lower() == item.name.lower() and
-                        shop_item.unit == item.unit):
-                        threshold_shortfall = item.min_threshold - item.total_quantity
-                        if threshold_shortfall > 0:
-                            shop_item.quantity = max(
-                                shop_item.quantity,
-                                round(threshold_shortfall, 2)
-                            )
+                )
+                shopping.append(shop_item)
+                added[key] = shop_item
+
+        # Part 2: Items below threshold (duplicate rows count as one item)
+        for key, matches in self._pantry_by_key.items():
+            min_threshold = max(item.min_threshold * factor for item, factor in matches)
+            name, unit, factor = self._display[key]
+            shortfall = round((min_threshold - self._available(key)) / factor, 2)
+
+            # Already added from meals - increase quantity if threshold requires more
+            if key in added:
+                if shortfall > 0:
+                    added[key].quantity = max(added[key].quantity, shortfall)
                 continue
 
-            if item.total_quantity < item.min_threshold:
+            if shortfall > 0:
                 shopping.append(ShoppingItem(
-                    name=item.name.title(),
-                    quantity=round(item.min_threshold - item.total_quantity, 2),
-                    unit=item.unit,
-                    category=item.category,
+                    name=name.title(),
+                    quantity=shortfall,
+                    unit=unit,
+                    category=matches[0][0].category,
                     source="Threshold",
                     checked=False
                 ))
@@ -209,38 +261,65 @@ class HouseholdState:
 
         return shopping
 
-    def _calculate_ready_recipes(self) -> List[int]:
+    def _calculate_ready_recipes(self) -> Tuple[List[str], List[dict]]:
         """
-        Calculate which recipes can be made RIGHT NOW.
+        Calculate which recipes can be made RIGHT NOW, and which are close.
 
-        Accounts for reserved ingredients from planned meals.
+        Accounts for reserved ingredients from planned meals. Recipes
+        missing a few ingredients are ranked in the same pass (fewest
+        missing first, then smallest shortfall) and the best
+        NEAR_MISS_TOP_K are kept.
 
         Returns:
-            List of recipe IDs that are ready to cook
+            (IDs of recipes ready to cook, near-miss entries best first)
         """
         ready = []
+        near_misses = []
+        available_by_key = self._available_by_key
+        reserved_by_key = self.reserved_ingredients
 
-        for recipe in self.recipes:
-            can_make = True
-
-            for ingredient in recipe.ingredients:
-                pantry_item = self._find_pantry_item(ingredient.name, ingredient.unit)
-                available = pantry_item.total_quantity if pantry_item else 0
+        for position, recipe in enumerate(self.recipes):
+            missing = []  # (ingredient, short in base units, factor)
+            shortfall = 0.0  # sum of the missing fraction of each ingredient
 
+            for ingredient, (key, factor) in zip(recipe.ingredients, self._ingredient_keys[recipe.id]):
                 # Subtract reserved ingredients
-                key = f"{ingredient.name.lower()}|{ingredient.unit}"
-                reserved = self.reserved_ingredients.get(key, 0)
-
-                actual_available = available - reserved
-
-                if actual_available < ingredient.quantity:
-                    can_make = False
-                    break
+                actual_available = available_by_key.get(key, 0.0) - reserved_by_key.get(key, 0)
+                needed = ingredient.quantity * factor
+
+                if actual_available < needed:
+                    short = needed - max(actual_available, 0)
+                    missing.append((ingredient, short, factor))
+                    shortfall += short / needed if needed else 1
+                    if len(missing) > self.NEAR_MISS_MAX_MISSING:
+                        break
 
-            if can_make:
+            if not missing:
                 ready.append(recipe.id)
+            elif len(missing) <= self.NEAR_MISS_MAX_MISSING:
+                near_misses.append((len(missing), shortfall, position, missing))
+
+        # Only the top K get turned into response dicts
+        top = heapq.nsmallest(self.NEAR_MISS_TOP_K, near_misses, key=lambda entry: entry[:3])
+        near_miss_recipes = [
+            {
+                "recipe_id": self.recipes[position].id,
+                "name": self.recipes[position].name,
+                "missing_count": missing_count,
+                "shortfall": round(shortfall, 3),
+                "missing": [
+                    {
+                        "ingredient": ingredient.name,
+                        "unit": ingredient.unit,
+                        "short": round(short / factor, 2)
+                    }
+                    for ingredient, short, factor in missing
+                ]
+            }
+            for missing_count, shortfall, position, missing in top
+        ]
 
-        return ready
+        return ready, near_miss_recipes
 
     # ===== SMART FEATURES =====
 
@@ -297,10 +376,11 @@ class HouseholdState:
             seen_items.add(exp_item['item_name'])
 
             # Find recipes that use this ingredient
+            expiring_name = normalize_name(exp_item['item_name'])
             matching_recipes = []
             for recipe in self.recipes:
-                for ingredient in recipe.ingredients:
-                    if ingredient.name.lower() == exp_item['item_name'].lower():
+                for key, _ in self._ingredient_keys[recipe.id]:
+                    if key.split("|")[0] == expiring_name:
                         matching_recipes.append({
                             "id": recipe.id,
                             "name": recipe.name,
@@ -337,10 +417,9 @@ class HouseholdState:
 
         missing = []
 
-        for ingredient in recipe.ingredients:
+        for ingredient, (key, factor) in zip(recipe.ingredients, self._ingredient_keys[recipe.id]):
             needed = ingredient.quantity * meal.serving_multiplier
-            pantry_item = self._find_pantry_item(ingredient.name, ingredient.unit)
-            available = pantry_item.total_quantity if pantry_item else 0
+            available = self._available(key) / factor  # in the recipe's unit
 
             if available < needed:
                 missing.append({
@@ -357,6 +436,45 @@ class HouseholdState:
             "recipe_name": recipe.name
         }
 
+    def plan_meal_depletion(self, meal: MealPlan) -> List[tuple]:
+        """
+        Work out what cooking a meal takes out of the pantry.
+
+        Each ingredient is taken from every matching pantry item (same
+        canonical key, any compatible unit), soonest-expiring location first.
+
+        Returns:
+            (pantry_item_id, PantryLocation, new_quantity) for each location that changes
+        """
+        recipe = self._get_recipe(meal.recipe_id)
+        if not recipe:
+            return []
+
+        changes: Dict[str, tuple] = {}  # location id -> change (an ingredient can repeat)
+
+        for ingredient, (key, factor) in zip(recipe.ingredients, self._ingredient_keys[recipe.id]):
+            needed = ingredient.quantity * meal.serving_multiplier * factor  # base units
+
+            stock = [
+                (location, item, item_factor)
+                for item, item_factor in self._pantry_by_key.get(key, [])
+                for location in item.locations
+            ]
+            stock.sort(key=lambda entry: entry[0].expiration_date or date.max)
+
+            for location, item, item_factor in stock:
+                if needed <= 0:
+                    break
+                on_hand = changes[location.id][2] if location.id in changes else location.quantity
+                if on_hand <= 0:
+                    continue
+
+                used = min(on_hand, needed / item_factor)  # in the pantry item's unit
+                changes[location.id] = (item.id, location, round(on_hand - used, 6))
+                needed -= used * item_factor
+
+        return list(changes.values())
+
     def get_pantry_health(self) -> dict:
         """
         Overall pantry health score.
@@ -387,22 +505,98 @@ class HouseholdState:
                      "fair" if health_score >= 40 else "poor"
         }
 
+    # ===== RESPONSES =====
+
+    def serialize_section(self, section: str):
+        """
+        Serialize one section of state for an API response.
+
+        Sections: pantry_items, recipes, meal_plans, shopping_list,
+        reserved_ingredients, ready_recipes / ready_to_cook (recipe IDs)
+        """
+        if section in self.ID_SECTIONS:
+            return self.ready_to_cook_recipe_ids
+        if section == "reserved_ingredients":
+            return self.reserved_ingredients
+        return [entity.model_dump() for entity in getattr(self, section)]
+
+    def diff(self, previous: "HouseholdState", sections: List[str]) -> dict:
+        """
+        Compare sections of this state against an earlier state.
+
+        Entity lists report added/changed entities in full and removed
+        ones by key. ID lists report added/removed IDs. Reserved
+        ingredients report changed quantities and removed keys.
+
+        Args:
+            previous: State captured before the change
+            sections: Section names (see serialize_section)
+
+        Returns:
+            dict of section name -> changes
+        """
+        delta = {}
+
+        for section in sections:
+            if section in self.ID_SECTIONS:
+                old_ids = set(previous.ready_to_cook_recipe_ids)
+                new_ids = set(self.ready_to_cook_recipe_ids)
+                delta[section] = {
+                    "added": [i for i in self.ready_to_cook_recipe_ids if i not in old_ids],
+                    "removed": [i for i in previous.ready_to_cook_recipe_ids if i not in new_ids]
+                }
+            elif section == "reserved_ingredients":
+                old, new = previous.reserved_ingredients, self.reserved_ingredients
+                delta[section] = {
+                    "changed": {k: v for k, v in new.items() if old.get(k) != v},
+                    "removed": [k for k in old if k not in new]
+                }
+            else:
+                key_of = self.ENTITY_KEYS[section]
+                old_entities = {key_of(e): e for e in getattr(previous, section)}
+                new_entities = {key_of(e): e for e in getattr(self, section)}
+                delta[section] = {
+                    "added": [e.model_dump() for k, e in new_entities.items() if k not in old_entities],
+                    "changed": [
+                        e.model_dump() for k, e in new_entities.items()
+                        if k in old_entities and e != old_entities[k]
+                    ],
+                    "removed": [k for k in old_entities if k not in new_entities]
+                }
+
+        return delta
+
     # ===== HELPER METHODS =====
 
-    def _find_pantry_item(self, name: str, unit: str) -> Optional[PantryItem]:
-        """Find pantry item by name and unit"""
-        name_lower = name.lower()
-        for item in self.pantry_items:
-            if item.name.lower() == name_lower and item.unit == unit:
-                return item
-        return None
+    @staticmethod
+    def shopping_key(item: ShoppingItem) -> str:
+        """Stable identity for a shopping item (manual items have DB ids)"""
+        if item.id:
+            return f"manual|{item.id}"
+        return f"{item.source}|{item.name.lower()}|{item.unit}"
+
+    def match_pantry_item(self, name: str, unit: str) -> Optional[Tuple[PantryItem, float]]:
+        """
+        Pantry item for a name and unit, matched on the canonical key
+        ("Eggs"/"lbs" finds "egg"/"lb", "milk"/"cup" finds "Milk"/"l").
+
+        Returns:
+            (pantry item, how many of its unit one `unit` makes), or None
+        """
+        key, factor = ingredient_key(name, unit)
+        matches = self._pantry_by_key.get(key)
+        if not matches:
+            return None
+        item, item_factor = matches[0]
+        return item, factor / item_factor
+
+    def _available(self, key: str) -> float:
+        """Quantity on hand for a canonical key, in base units (all matching rows)"""
+        return self._available_by_key.get(key, 0.0)
 
     def _get_recipe(self, recipe_id: str) -> Optional[Recipe]:
         """Get recipe by ID"""
-        for recipe in self.recipes:
-            if recipe.id == recipe_id:
-                return recipe
-        return None
+        return self._recipes_by_id.get(recipe_id)
 
 
 class StateManager:
@@ -413,6 +607,22 @@ class StateManager:
     """
 
     CACHE_TTL = 300  # 5 minutes
+    CACHE_FORMAT = 7  # Bump when HouseholdState gains attributes or keys change (old pickles are skipped)
+
+    @classmethod
+    def _cache_key(cls, household_id: str) -> str:
+        return f"state:v{cls.CACHE_FORMAT}:{household_id}"
+
+    @classmethod
+    def is_cached(cls, household_id: str) -> bool:
+        """Whether Redis holds a current-format state (one EXISTS, no unpickling)."""
+        redis_client = get_redis()
+        if not redis_client:
+            return False
+        try:
+            return bool(redis_client.exists(cls._cache_key(household_id)))
+        except redis.RedisError:
+            return False
 
     @classmethod
     def get_state(cls, household_id: str) -> HouseholdState:
@@ -421,36 +631,102 @@ class StateManager:
 
         Checks cache first, loads from DB if needed.
         """
+        redis_client = get_redis()
+
         # Try cache
         if redis_client:
-            cache_key = f"state:{household_id}"
+            cache_key = cls._cache_key(household_id)
             try:
-                cached_data = redis_client.get(cache_key)
+                with phase("redis"):
+                    cached_data = redis_client.get(cache_key)
 
                 if cached_data:
-                    logger.info(f"💰 Cache HIT for household {household_id}")
-                    return pickle.loads(cached_data)
+                    if log_sampled(household_id):
+                        logger.info("💰 Cache HIT for household %s", household_id)
+                    cache_tier("state", "redis")
+                    with phase("unpickle"):
+                        return pickle.loads(cached_data)
             except Exception as e:
                 logger.warning(f"Cache read error: {e}")
 
         # Load from database
-        logger.info(f"📀 Cache MISS - Loading household {household_id} from database")
-        state = cls._load_from_database(household_id)
+        if log_sampled(household_id):
+            logger.info("📀 Cache MISS - Loading household %s from database", household_id)
+        cache_tier("state", "db")
+        with phase("load"):
+            state = cls._load_from_database(household_id)
 
         # Cache it
+        cls.cache_state(state)
+
+        return state
+
+    @classmethod
+    def cache_state(cls, state: HouseholdState):
+        """Store a state in the cache."""
+        redis_client = get_redis()
         if redis_client:
-            cache_key = f"state:{household_id}"
+            cache_key = cls._cache_key(state.household_id)
             try:
-                redis_client.setex(
-                    cache_key,
-                    cls.CACHE_TTL,
-                    pickle.dumps(state)
-                )
-                logger.info(f"💾 Cached state for household {household_id}")
+                with phase("pickle"):
+                    data = pickle.dumps(state)
+                STATE_BLOB_BYTES.observe(len(data))
+                with phase("redis"):
+                    redis_client.setex(cache_key, cls.CACHE_TTL, data)
+                if log_sampled(state.household_id):
+                    logger.info("💾 Cached state for household %s", state.household_id)
             except Exception as e:
                 logger.warning(f"Cache write error: {e}")
 
-        return state
+    @classmethod
+    def update_cached_state(cls, household_id: str, mutate) -> HouseholdState:
+        """
+        Apply an in-memory change to the cached state without a DB reload.
+
+        Uses WATCH so a concurrent invalidate/reload isn't overwritten with
+        an older state. If the cache keeps changing underneath us, fall back
+        to invalidating.
+
+        Args:
+            household_id: Household to update
+            mutate: Function that modifies the HouseholdState in place
+
+        Returns:
+            The updated state
+        """
+        redis_client = get_redis()
+        if not redis_client:
+            state = cls._load_from_database(household_id)
+            mutate(state)
+            state.mark_changed()
+            return state
+
+        cache_key = cls._cache_key(household_id)
+        try:
+            with redis_client.pipeline() as pipe:
+                for _ in range(3):
+                    try:
+                        pipe.watch(cache_key)
+                        cached_data = pipe.get(cache_key)
+                        if cached_data:
+                            state = pickle.loads(cached_data)
+                        else:
+                            state = cls._load_from_database(household_id)
+
+                        mutate(state)
+                        state.mark_changed()
+
+                        pipe.multi()
+                        pipe.setex(cache_key, cls.CACHE_TTL, pickle.dumps(state))
+                        pipe.execute()
+                        return state
+                    except redis.WatchError:
+                        continue
+        except Exception as e:
+            logger.warning(f"Cache update error: {e}")
+
+        cls.invalidate(household_id)
+        return cls.get_state(household_id)
 
     @classmethod
     def _load_from_database(cls, household_id: str) -> HouseholdState:
@@ -459,10 +735,11 @@ class StateManager:
 
         # Load pantry items with locations
         logger.debug("Loading pantry items...")
-        pantry_response = supabase.table('pantry_items')\
-            .select('*, pantry_locations(*)')\
-            .eq('household_id', household_id)\
-            .execute()
+        with LOAD_TABLE_SECONDS.time('pantry_items'):
+            pantry_response = supabase.table('pantry_items')\
+                .select('*, pantry_locations(*)')\
+                .eq('household_id', household_id)\
+                .execute()
 
         pantry_items = []
         for item_data in pantry_response.data:
@@ -473,10 +750,11 @@ class StateManager:
 
         # Load recipes (ingredients stored as JSONB in recipes table)
         logger.debug("Loading recipes...")
-        recipes_response = supabase.table('recipes')\
-            .select('*')\
-            .eq('household_id', household_id)\
-            .execute()
+        with LOAD_TABLE_SECONDS.time('recipes'):
+            recipes_response = supabase.table('recipes')\
+                .select('*')\
+                .eq('household_id', household_id)\
+                .execute()
 
         recipes = [
             Recipe.from_supabase(recipe_data)
@@ -487,11 +765,12 @@ class StateManager:
         logger.debug("Loading meal plans...")
         try:
             # Use planned_date column (actual DB column name)
-            meals_response = supabase.table('meal_plans')\
-                .select('*')\
-                .eq('household_id', household_id)\
-                .gte('planned_date', date.today().isoformat())\
-                .execute()
+            with LOAD_TABLE_SECONDS.time('meal_plans'):
+                meals_response = supabase.table('meal_plans')\
+                    .select('*')\
+                    .eq('household_id', household_id)\
+                    .gte('planned_date', date.today().isoformat())\
+                    .execute()
 
             meal_plans = []
             for meal_data in meals_response.data:
@@ -513,10 +792,11 @@ class StateManager:
         # Load manual shopping items
         logger.debug("Loading manual shopping items...")
         try:
-            shopping_response = supabase.table('shopping_list_manual')\
-                .select('*')\
-                .eq('household_id', household_id)\
-                .execute()
+            with LOAD_TABLE_SECONDS.time('shopping_list_manual'):
+                shopping_response = supabase.table('shopping_list_manual')\
+                    .select('*')\
+                    .eq('household_id', household_id)\
+                    .execute()
 
             manual_shopping_items = [
                 ShoppingItem(
@@ -537,8 +817,12 @@ class StateManager:
             logger.warning(f"Manual shopping items not loaded: {e}")
             manual_shopping_items = []
 
+        # Toggles still waiting in the write-behind buffer win over the DB
+        ShoppingToggleBuffer.apply_pending(household_id, manual_shopping_items)
+
         # Create state (automatically calculates everything!)
-        logger.info(f"✨ Creating state for household {household_id}")
+        if log_sampled(household_id):
+            logger.info("✨ Creating state for household %s", household_id)
         return HouseholdState(
             household_id=household_id,
             pantry_items=pantry_items,
@@ -554,14 +838,70 @@ class StateManager:
 
         Next request will reload from DB and recalculate.
         """
+        redis_client = get_redis()
+        CACHE_INVALIDATIONS.inc("state")
         if redis_client:
-            cache_key = f"state:{household_id}"
+            cache_key = cls._cache_key(household_id)
             try:
                 redis_client.delete(cache_key)
-                logger.info(f"🗑️ Cache invalidated for household {household_id}")
+                logger.info("🗑️ Cache invalidated for household %s", household_id)
             except Exception as e:
                 logger.warning(f"Cache delete error: {e}")
 
+        # In-process caches, in this worker and the others
+        broadcast("state", household_id)
+
+    # ===== SETTINGS =====
+    # Household settings (locations, categories, emojis) are cached next to
+    # the state but separately: they change rarely and don't affect any
+    # calculation. Writers call cache_settings with the row they got back
+    # (or invalidate_settings).
+
+    SETTINGS_TTL = 3600  # 1 hour
+
+    @staticmethod
+    def _settings_key(household_id: str) -> str:
+        return f"settings:{household_id}"
+
+    @classmethod
+    def get_cached_settings(cls, household_id: str) -> Optional[dict]:
+        """Cached household_settings row, or None."""
+        redis_client = get_redis()
+        if not redis_client:
+            return None
+        try:
+            cached = redis_client.get(cls._settings_key(household_id))
+            cache_tier("settings", "redis" if cached else "db")
+            return json.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(f"Settings cache read error: {e}")
+            return None
+
+    @classmethod
+    def cache_settings(cls, household_id: str, settings: dict):
+        """Store a household_settings row in the cache."""
+        redis_client = get_redis()
+        if redis_client:
+            try:
+                redis_client.setex(
+                    cls._settings_key(household_id),
+                    cls.SETTINGS_TTL,
+                    json.dumps(settings, default=str)
+                )
+            except Exception as e:
+                logger.warning(f"Settings cache write error: {e}")
+
+    @classmethod
+    def invalidate_settings(cls, household_id: str):
+        """Drop cached settings for a household."""
+        CACHE_INVALIDATIONS.inc("settings")
+        redis_client = get_redis()
+        if redis_client:
+            try:
+                redis_client.delete(cls._settings_key(household_id))
+            except Exception as e:
+                logger.warning(f"Settings cache delete error: {e}")
+
     @classmethod
     def update_and_invalidate(cls, household_id: str, update_function):
         """
@@ -579,11 +919,29 @@ class StateManager:
             household_id: Household to invalidate
             update_function: Function that performs the database update
         """
+        # Pending check-offs should land before anything that reads them back
+        # (if they can't yet, they stay pending and are retried in the background)
+        if ShoppingToggleBuffer.has_pending(household_id):
+            ShoppingToggleBuffer.flush_or_retry(household_id)
+
         # Execute the update
-        logger.info(f"📝 Executing update for household {household_id}")
-        result = update_function()
+        logger.info("📝 Executing update for household %s", household_id)
+        try:
+            return update_function()
+        finally:
+            # Invalidate even on failure - part of the update may have landed
+            cls.invalidate(household_id)
+
+
+def _flush_toggles_for_remote_change(household_id: Optional[str]):
+    """
+    Another worker changed a household we hold unwritten check-offs for.
+    Write them now and invalidate again, so its reload doesn't miss them
+    for the rest of the flush delay.
+    """
+    if household_id and ShoppingToggleBuffer.has_pending(household_id):
+        ShoppingToggleBuffer.flush_or_retry(household_id)
+        StateManager.invalidate(household_id)
 
-        # Invalidate cache
-        cls.invalidate(household_id)
 
-        return result
+on_invalidate("state", _flush_toggles_for_remote_change, remote_only=True)
@@ -0,0 +1,47 @@
+"""
+Test setup - Python Age 5.0
+
+Tests run against the in-memory fakes in benchmarks/fakes.py, never a
+real Supabase project or Redis.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.load_test import prepare_environment, seed_households  # noqa: E402
+
+prepare_environment()
+
+
+@pytest.fixture(scope="session")
+def fakes():
+    """Fake Supabase and Redis wired into the app (shared by the session, like the app's own caches)."""
+    import utils.redis_client
+    import utils.supabase_client
+    from benchmarks.fakes import FakeRedis, FakeSupabase
+
+    db, redis_client = FakeSupabase(), FakeRedis()
+    utils.supabase_client.supabase = db
+    utils.redis_client.redis_client = redis_client
+    return db, redis_client
+
+
+@pytest.fixture(scope="session")
+def household(fakes):
+    """One medium-sized generated household and a member's auth headers."""
+    import utils.auth
+
+    db, _ = fakes
+    return seed_households(db, 1, "medium", 7, utils.auth.JWT_SECRET)[0]
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    import app
+
+    return TestClient(app.app)
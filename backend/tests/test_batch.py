@@ -0,0 +1,59 @@
+"""
+Batch route tests - Python Age 5.0
+
+POST /api/batch through the fakes: the documented path resolves,
+operations apply in order, and a partly applied batch can't be applied
+twice through its Idempotency-Key.
+"""
+
+import uuid
+
+import pytest
+
+
+def _manual_names(db, household):
+    return [row["name"] for row in db.rows("shopping_list_manual") if row["household_id"] == household.household_id]
+
+
+@pytest.mark.parametrize("path", ["/api/batch", "/api/batch/"])
+def test_batch_path_resolves(client, fakes, household, path):
+    db, _ = fakes
+    name = f"Batch item {uuid.uuid4().hex[:6]}"
+    body = {"operations": [
+        {"op": "shopping.add", "data": {"name": name, "quantity": 1, "unit": "each"}},
+        {"op": "shopping.update", "id": household.manual_items[0], "data": {"quantity": 3}},
+    ]}
+
+    response = client.post(path, json=body, headers=household.headers)
+
+    assert response.status_code == 200, response.text
+    assert [result["op"] for result in response.json()["results"]] == ["shopping.add", "shopping.update"]
+    assert name in _manual_names(db, household)
+
+
+def test_partly_applied_batch_replays_its_error(client, fakes, household, monkeypatch):
+    import routes.batch
+
+    db, _ = fakes
+
+    def broken_delete(*args):
+        raise RuntimeError("database down")
+
+    handlers = dict(routes.batch.BATCH_HANDLERS)
+    handlers["meal_plans"] = handlers["meal_plans"][:4] + (broken_delete,) + handlers["meal_plans"][5:]
+    monkeypatch.setattr(routes.batch, "BATCH_HANDLERS", handlers)
+
+    name = f"Batch item {uuid.uuid4().hex[:6]}"
+    body = {"operations": [
+        {"op": "shopping.add", "data": {"name": name, "quantity": 1, "unit": "each"}},
+        {"op": "meal_plans.delete", "id": str(uuid.uuid4())},
+    ]}
+    headers = {**household.headers, "Idempotency-Key": uuid.uuid4().hex}
+
+    first = client.post("/api/batch", json=body, headers=headers)
+    retry = client.post("/api/batch", json=body, headers=headers)
+
+    assert first.status_code == retry.status_code == 400
+    assert first.json()["detail"]["failed_index"] == 1
+    assert retry.headers.get("Idempotent-Replayed") == "true"
+    assert _manual_names(db, household).count(name) == 1
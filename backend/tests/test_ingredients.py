@@ -0,0 +1,70 @@
+"""
+Ingredient matching tests - Python Age 5.0
+
+Names and units people type map onto the same canonical keys.
+"""
+
+import pytest
+
+from ingredients import ingredient_key, normalize_name, normalize_unit, singularize
+
+
+@pytest.mark.parametrize("plural,singular", [
+    ("eggs", "egg"),
+    ("tomatoes", "tomato"),
+    ("cherries", "cherry"),
+    ("cookies", "cookie"),
+    ("pies", "pie"),
+    ("peaches", "peach"),
+    ("radishes", "radish"),
+    ("boxes", "box"),
+    ("leaves", "leaf"),
+    ("loaves", "loaf"),
+])
+def test_singularize_plurals(plural, singular):
+    assert singularize(plural) == singular
+
+
+@pytest.mark.parametrize("word", ["asparagus", "couscous", "hummus", "swiss", "glass", "pea", "egg"])
+def test_singularize_leaves_singulars_alone(word):
+    assert singularize(word) == word
+
+
+@pytest.mark.parametrize("raw,canonical", [
+    ("  Large  Eggs ", "large egg"),
+    ("Green Beans", "green bean"),
+    ("beans green", "beans green"),  # only the last word is singularized
+    ("Olive  Oil", "olive oil"),
+])
+def test_normalize_name(raw, canonical):
+    assert normalize_name(raw) == canonical
+
+
+@pytest.mark.parametrize("raw,canonical", [
+    ("Lbs.", "lb"),
+    ("pounds", "lb"),
+    ("Tablespoons", "tbsp"),
+    ("tsp.", "tsp"),
+    ("fl. oz", "fl oz"),
+    ("Grams", "g"),
+    ("pcs", "each"),
+    ("", ""),
+    ("Sprigs", "sprigs"),  # unknown units are only cleaned up
+])
+def test_normalize_unit(raw, canonical):
+    assert normalize_unit(raw) == canonical
+
+
+@pytest.mark.parametrize("a,b", [
+    (("Eggs", "each"), ("egg", "pcs")),
+    (("Large Eggs", "lbs"), ("large egg", "lb")),
+    (("Cookies", "dozen"), ("cookie", "each")),
+    (("Flour", "kg"), ("flour", "grams")),
+])
+def test_spellings_share_a_key(a, b):
+    assert ingredient_key(*a)[0] == ingredient_key(*b)[0]
+
+
+def test_different_ingredients_keep_apart():
+    assert ingredient_key("egg", "each")[0] != ingredient_key("eggplant", "each")[0]
+    assert ingredient_key("pie", "each")[0] != ingredient_key("py", "each")[0]
@@ -0,0 +1,141 @@
+"""
+Pagination tests - Python Age 5.0
+
+Cursor pages cover a list exactly once, survive rows disappearing
+between pages, and reject cursors and fields they can't use.
+"""
+
+import base64
+import json
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from utils.pagination import PageParams, decode_cursor, encode_cursor, paginate
+
+
+class Row(BaseModel):
+    id: str
+    name: str
+    notes: str = ""
+
+
+ROWS = [Row(id=f"id-{n}", name=name) for n, name in enumerate(["pear", "Apple", "fig", "apple", "kiwi"])]
+FIELDS = set(Row.model_fields)
+
+
+def _key(row):
+    return (row.name.lower(), row.id)
+
+
+def _walk(rows, limit):
+    """All pages for a list, following next_cursor."""
+    pages, cursor = [], None
+    while True:
+        page, cursor = paginate(rows, _key, PageParams(limit=limit, cursor=cursor), FIELDS)
+        pages.append([row["id"] for row in page])
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 5, 6])
+def test_pages_cover_list_once_in_order(limit):
+    pages = _walk(ROWS, limit)
+    flat = [row_id for page in pages for row_id in page]
+    assert flat == ["id-1", "id-3", "id-2", "id-4", "id-0"]  # name, then id for equal names
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_last_full_page_has_no_cursor():
+    page, cursor = paginate(ROWS, _key, PageParams(limit=len(ROWS)), FIELDS)
+    assert len(page) == len(ROWS) and cursor is None
+
+
+def test_empty_list():
+    assert paginate([], _key, PageParams(limit=3), FIELDS) == ([], None)
+
+
+def test_cursor_survives_deleted_row():
+    page, cursor = paginate(ROWS, _key, PageParams(limit=2), FIELDS)
+    remaining = [row for row in ROWS if row.id != page[-1]["id"]]  # the cursor's own row is gone
+
+    page, _ = paginate(remaining, _key, PageParams(limit=2, cursor=cursor), FIELDS)
+    assert [row["id"] for row in page] == ["id-2", "id-4"]
+
+
+def test_cursor_past_the_end():
+    cursor = encode_cursor(("zzz", "id-9"))
+    assert paginate(ROWS, _key, PageParams(cursor=cursor), FIELDS) == ([], None)
+
+
+def test_unpaginated_keeps_original_order():
+    rows, cursor = paginate(ROWS, _key, PageParams(), FIELDS)
+    assert [row["id"] for row in rows] == [row.id for row in ROWS] and cursor is None
+
+
+def test_fields_projection_keeps_id():
+    rows, _ = paginate(ROWS, _key, PageParams(fields={"name"}), FIELDS)
+    assert rows[0] == {"id": "id-0", "name": "pear"}
+
+
+def test_unknown_fields_rejected():
+    with pytest.raises(HTTPException) as excinfo:
+        paginate(ROWS, _key, PageParams(fields={"name", "secret"}), FIELDS)
+    assert excinfo.value.status_code == 400
+    assert "secret" in excinfo.value.detail
+
+
+def _b64(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    _b64(5),
+    _b64("apple"),
+    _b64({"apple": "id-1"}),
+    _b64([]),
+    _b64(["apple", 1]),
+])
+def test_invalid_cursor_rejected(cursor):
+    with pytest.raises(HTTPException) as excinfo:
+        decode_cursor(cursor)
+    assert excinfo.value.status_code == 400
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor(("apple", "id-1"))) == ("apple", "id-1")
+
+
+def test_recipes_endpoint_pages(client, household):
+    full = client.get("/api/recipes/", headers=household.headers).json()["recipes"]
+    expected = sorted((recipe["name"].lower(), recipe["id"]) for recipe in full)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 7, "fields": "name"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/recipes/", params=params, headers=household.headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert all(set(recipe) == {"id", "name"} for recipe in body["recipes"])
+        seen.extend((recipe["name"].lower(), recipe["id"]) for recipe in body["recipes"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == expected
+
+
+@pytest.mark.parametrize("params,status", [
+    ({"limit": 0}, 422),
+    ({"limit": 501}, 422),
+    ({"cursor": "garbage"}, 400),
+    ({"fields": "name,nope"}, 400),
+])
+def test_recipes_endpoint_rejects_bad_params(client, household, params, status):
+    response = client.get("/api/recipes/", params=params, headers=household.headers)
+    assert response.status_code == status, response.text
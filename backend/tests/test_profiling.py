@@ -0,0 +1,51 @@
+"""
+Profiler trigger tests - Python Age 5.0
+
+PROFILE_HOUSEHOLDS only profiles requests authenticated as a member of
+the allowlisted household.
+"""
+
+import time
+
+import pytest
+from jose import jwt
+
+import utils.auth
+import utils.profiling
+
+
+@pytest.fixture
+def profiling_on(monkeypatch, household):
+    monkeypatch.setattr(utils.profiling, "PROFILE_TOKEN", "admin-secret")
+    monkeypatch.setattr(utils.profiling, "PROFILE_HOUSEHOLDS", {household.household_id})
+
+
+def _token(user_id):
+    return jwt.encode(
+        {"sub": user_id, "aud": "authenticated", "role": "authenticated", "exp": int(time.time()) + 3600},
+        utils.auth.JWT_SECRET, algorithm="HS256"
+    )
+
+
+def test_member_of_allowlisted_household_is_profiled(client, household, profiling_on):
+    response = client.get("/api/pantry/", headers=household.headers)
+    assert response.status_code == 200
+    assert "x-profile-id" in response.headers
+
+
+@pytest.mark.parametrize("authorization", [None, "Bearer not-a-token", "other-user"])
+def test_allowlisted_household_needs_a_member_token(client, household, profiling_on, authorization):
+    headers = {"X-Household-Id": household.household_id}
+    if authorization == "other-user":
+        authorization = f"Bearer {_token('00000000-0000-4000-8000-000000000000')}"
+    if authorization:
+        headers["Authorization"] = authorization
+
+    response = client.get("/api/pantry/", headers=headers)
+
+    assert "x-profile-id" not in response.headers
+
+
+def test_admin_token_profiles_any_request(client, household, profiling_on):
+    response = client.get("/health", headers={"X-Profile": "admin-secret"})
+    assert "x-profile-id" in response.headers
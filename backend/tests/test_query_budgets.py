@@ -0,0 +1,139 @@
+"""
+Query budget tests - Python Age 5.0
+
+Drive every budgeted route through the fakes and check its Supabase
+round trips against the budget it declares (@query_budget). The
+household is medium-sized (2000 pantry items, 400 recipes), so a route
+that queries per item blows its budget here rather than in production.
+"""
+
+from datetime import date, timedelta
+import re
+
+import pytest
+
+import utils.query_budget
+
+# (method, path, body) - {pantry_item}, {recipe}, {meal}, {manual_item} are filled in per household
+CASES = [
+    ("GET", "/api/pantry/", None),
+    ("GET", "/api/pantry/units", None),
+    ("POST", "/api/pantry/", {"name": "Budget flour", "category": "Pantry", "unit": "g",
+                              "locations": [{"location": "Pantry", "quantity": 500}]}),
+    ("PUT", "/api/pantry/{pantry_item}", {"name": "Budget rice",
+                                          "locations": [{"location": "Pantry", "quantity": 2}]}),
+    ("DELETE", "/api/pantry/{pantry_item}", None),
+    ("GET", "/api/recipes/", None),
+    ("GET", "/api/recipes/search?q=chicken", None),
+    ("GET", "/api/recipes/{recipe}", None),
+    ("GET", "/api/recipes/{recipe}/scaled?multiplier=2", None),
+    ("POST", "/api/recipes/", {"name": "Budget soup", "ingredients": [
+        {"name": "onion", "quantity": 1, "unit": "each"}, {"name": "water", "quantity": 1, "unit": "l"}]}),
+    ("PUT", "/api/recipes/{recipe}", {"tags": ["Quick"]}),
+    ("DELETE", "/api/recipes/{recipe}", None),
+    ("GET", "/api/meal-plans/", None),
+    ("POST", "/api/meal-plans/", {"date": "{tomorrow}", "recipe_id": "{recipe}"}),
+    ("POST", "/api/meal-plans/batch", {"meals": [{"date": "{tomorrow}", "recipe_id": "{recipe}"}] * 7}),
+    ("PUT", "/api/meal-plans/{meal}", {"serving_multiplier": 2}),
+    ("POST", "/api/meal-plans/{meal}/validate", None),
+    ("POST", "/api/meal-plans/{meal}/cook?force=true", None),
+    ("DELETE", "/api/meal-plans/{meal}", None),
+    ("GET", "/api/shopping-list/", None),
+    ("POST", "/api/shopping-list/regenerate", None),
+    ("POST", "/api/shopping-list/items", {"name": "Budget foil", "quantity": 1, "unit": "roll"}),
+    ("PATCH", "/api/shopping-list/items/{manual_item}", {"checked": True}),
+    ("POST", "/api/shopping-list/add-checked-to-pantry", None),
+    ("POST", "/api/shopping-list/clear-checked", None),
+    ("DELETE", "/api/shopping-list/items/{manual_item}", None),
+    ("GET", "/api/autocomplete?q=on", None),
+    ("GET", "/api/autocomplete/?q=on", None),
+    ("GET", "/api/alerts/expiring", None),
+    ("GET", "/api/alerts/suggestions/use-expiring", None),
+    ("GET", "/api/alerts/suggestions/ready-to-cook", None),
+    ("GET", "/api/alerts/suggestions/almost-ready", None),
+    ("GET", "/api/alerts/pantry-health", None),
+    ("GET", "/api/alerts/dashboard", None),
+]
+
+
+@pytest.fixture
+def measured(monkeypatch):
+    """Record (endpoint, used, limit) for every budget check."""
+    checks = []
+    original = utils.query_budget.check_budget
+
+    def record(name, used, limit, mode=None):
+        checks.append((name, used, limit))
+        return original(name, used, limit, mode)
+
+    monkeypatch.setattr(utils.query_budget, "check_budget", record)
+    monkeypatch.setattr(utils.query_budget, "QUERY_BUDGET_MODE", "strict")
+    return checks
+
+
+def _ids(db, household) -> dict:
+    def first(table, **match):
+        return next(
+            str(row["id"]) for row in db.rows(table)
+            if row["household_id"] == household.household_id and all(row.get(k) == v for k, v in match.items())
+        )
+
+    return {
+        "pantry_item": first("pantry_items"),
+        "recipe": first("recipes"),
+        "meal": first("meal_plans", is_cooked=False),
+        "manual_item": household.manual_items[-1],
+        "tomorrow": (date.today() + timedelta(days=1)).isoformat(),
+    }
+
+
+def _fill(value, ids: dict):
+    if isinstance(value, str):
+        return value.format(**ids)
+    if isinstance(value, list):
+        return [_fill(item, ids) for item in value]
+    if isinstance(value, dict):
+        return {key: _fill(item, ids) for key, item in value.items()}
+    return value
+
+
+def _shape(path: str) -> str:
+    """/api/pantry/{item_id}?x=1 -> /api/pantry/{}"""
+    return re.sub(r"\{\w+\}", "{}", path.split("?")[0])
+
+
+def test_every_budgeted_route_is_covered(client):
+    budgeted = {
+        (method, _shape(route.path))
+        for route in client.app.routes
+        if hasattr(getattr(route, "endpoint", None), "query_budget")
+        for method in route.methods
+    }
+    covered = {(method, _shape(path)) for method, path, _ in CASES}
+    assert budgeted <= covered, f"routes without a budget test: {sorted(budgeted - covered)}"
+
+
+@pytest.mark.parametrize("method,path,body", CASES, ids=[f"{m} {p}" for m, p, _ in CASES])
+def test_route_stays_within_budget(client, fakes, household, measured, method, path, body):
+    db, _ = fakes
+    ids = _ids(db, household)
+
+    response = client.request(method, _fill(path, ids), json=_fill(body, ids), headers=household.headers)
+
+    assert response.status_code < 400, response.text
+    assert measured, "the route didn't go through @query_budget"
+    name, used, limit = measured[-1]
+    assert used <= limit, f"{name} made {used} Supabase round trips (budget {limit})"
+
+
+def test_write_after_burst_of_check_offs(client, fakes, household, measured):
+    """Flushing pending check-offs before a write fits the mutation allowance."""
+    for item_id in household.manual_items[:20]:
+        client.patch(f"/api/shopping-list/items/{item_id}", json={"checked": True}, headers=household.headers)
+
+    response = client.post("/api/shopping-list/items", json={"name": "Budget bags", "quantity": 1, "unit": "pack"},
+                           headers=household.headers)
+
+    assert response.status_code < 400, response.text
+    name, used, limit = measured[-1]
+    assert used <= limit, f"{name} made {used} Supabase round trips (budget {limit})"
@@ -0,0 +1,118 @@
+"""
+Recipe search index tests - Python Age 5.0
+
+The index answers the same filters as a plain scan, ranks results and
+is rebuilt only when the state version changes.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from models.recipe import Recipe, RecipeIngredient
+from search_index import RecipeSearchIndex
+
+RECIPES = [
+    ("r1", "Tomato Soup", ["soup", "vegetarian"], ["Tomato", "Onion"]),
+    ("r2", "Soup", ["soup"], ["Water"]),
+    ("r3", "Soupy Rice", ["rice"], ["Rice", "Tomato"]),
+    ("r4", "Chicken Noodle Soup", ["soup"], ["Chicken", "Noodles", "Onion"]),
+    ("r5", "Pasta al Pomodoro", ["pasta", "vegetarian"], ["Pasta", "Tomato"]),
+    ("r6", "Oxtail Stew", [], ["Oxtail"]),
+]
+
+
+def _recipes():
+    return [
+        Recipe(
+            id=recipe_id, household_id="search-household", name=name, tags=tags,
+            ingredients=[RecipeIngredient(name=ing, quantity=1, unit="each") for ing in ingredients],
+        )
+        for recipe_id, name, tags, ingredients in RECIPES
+    ]
+
+
+@pytest.fixture
+def index():
+    return RecipeSearchIndex(_recipes(), version=1)
+
+
+def _ids(recipes):
+    return [recipe.id for recipe in recipes]
+
+
+def test_no_filters_returns_everything_in_order(index):
+    assert _ids(index.search()) == ["r1", "r2", "r3", "r4", "r5", "r6"]
+
+
+def test_name_ranking(index):
+    # exact, then prefix, then whole word, then other substring hits
+    assert _ids(index.search(q="soup")) == ["r2", "r3", "r1", "r4"]
+
+
+def test_query_is_case_insensitive_substring(index):
+    assert _ids(index.search(q="ODOR")) == ["r5"]
+    assert _ids(index.search(q="noodle soup")) == ["r4"]
+
+
+@pytest.mark.parametrize("q,expected", [
+    ("ox", ["r6"]),           # shorter than a trigram
+    ("p", ["r1", "r2", "r3", "r4", "r5"]),
+    ("", ["r1", "r2", "r3", "r4", "r5", "r6"]),
+])
+def test_short_queries_still_match(index, q, expected):
+    assert sorted(_ids(index.search(q=q))) == expected
+
+
+def test_trigrams_alone_are_not_a_match(index):
+    # Every trigram of "tomatomato" is in "tomato soup", but it isn't a substring
+    assert index.search(q="tomatomato") == []
+    assert index.search(q="zzz") == []
+
+
+def test_tags_match_any(index):
+    assert _ids(index.search(tags=["rice", "pasta"])) == ["r3", "r5"]
+    assert index.search(tags=["dessert"]) == []
+
+
+def test_filters_intersect(index):
+    assert _ids(index.search(q="soup", tags=["vegetarian"])) == ["r1"]
+    assert _ids(index.search(tags=["soup"], has_ingredients=["onion"])) == ["r1", "r4"]
+
+
+def test_ingredients_match_any_and_rank_by_hits(index):
+    assert _ids(index.search(has_ingredients=["TOMATO", "onion"])) == ["r1", "r3", "r4", "r5"]
+
+
+def test_ready_only_and_ready_tiebreak(index):
+    assert _ids(index.search(tags=["soup"], ready_ids={"r4"})) == ["r4", "r1", "r2"]
+    assert _ids(index.search(q="soup", ready_ids={"r4"}, ready_only=True)) == ["r4"]
+    assert index.search(ready_only=True) == []
+
+
+def test_for_state_rebuilds_on_new_version():
+    state = SimpleNamespace(household_id="search-household", recipes=_recipes(), version=1)
+    first = RecipeSearchIndex.for_state(state)
+    assert RecipeSearchIndex.for_state(state) is first
+
+    state.version = 2
+    second = RecipeSearchIndex.for_state(state)
+    assert second is not first and second.version == 2
+
+    RecipeSearchIndex.forget("search-household")
+    assert RecipeSearchIndex.for_state(state) is not second
+    RecipeSearchIndex.forget("search-household")
+
+
+def test_least_recently_used_index_is_dropped(monkeypatch):
+    monkeypatch.setattr(RecipeSearchIndex, "MAX_HOUSEHOLDS", 2)
+    states = [SimpleNamespace(household_id=f"lru-{n}", recipes=[], version=1) for n in range(3)]
+    first = RecipeSearchIndex.for_state(states[0])
+    RecipeSearchIndex.for_state(states[1])
+    RecipeSearchIndex.for_state(states[0])  # most recently used now
+    RecipeSearchIndex.for_state(states[2])
+
+    assert RecipeSearchIndex.for_state(states[0]) is first
+    assert "lru-1" not in RecipeSearchIndex._indexes
+    for state in states:
+        RecipeSearchIndex.forget(state.household_id)
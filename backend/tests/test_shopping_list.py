@@ -0,0 +1,70 @@
+"""
+Shopping list route tests - Python Age 5.0
+
+Restocking from the shopping list matches pantry items on canonical
+keys (ingredients.py), not on the raw name and unit.
+"""
+
+import uuid
+
+import pytest
+
+
+def _pantry_rows(db, household, name):
+    return [
+        row for row in db.rows("pantry_items")
+        if row["household_id"] == household.household_id and row["name"].lower().startswith(name.lower())
+    ]
+
+
+def _location_quantity(db, pantry_id):
+    return sum(row["quantity"] for row in db.rows("pantry_locations") if row["pantry_item_id"] == pantry_id)
+
+
+def _add_checked(client, household, name, quantity, unit):
+    response = client.post("/api/shopping-list/items", json={"name": name, "quantity": quantity, "unit": unit},
+                           headers=household.headers)
+    assert response.status_code == 200, response.text
+    item_id = response.json()["id"]
+    response = client.patch(f"/api/shopping-list/items/{item_id}", json={"checked": True}, headers=household.headers)
+    assert response.status_code == 200, response.text
+
+
+@pytest.mark.parametrize("pantry,shopping,expected", [
+    # (name, quantity, unit) in the pantry, then on the list -> pantry quantity afterwards
+    (("{tag} egg", 2, "lb"), ("{tag} Eggs", 1, "lbs"), 3),
+    (("{tag} Milk", 1, "l"), ("{tag} milk", 2, "cups"), 1 + 2 * 0.2365882365),
+])
+def test_restock_matches_canonical_pantry_item(client, fakes, household, pantry, shopping, expected):
+    db, _ = fakes
+    tag = uuid.uuid4().hex[:6]
+    pantry_name, pantry_quantity, pantry_unit = pantry
+    response = client.post("/api/pantry/", json={
+        "name": pantry_name.format(tag=tag), "unit": pantry_unit,
+        "locations": [{"location": "Pantry", "quantity": pantry_quantity}]
+    }, headers=household.headers)
+    assert response.status_code == 200, response.text
+
+    shopping_name, shopping_quantity, shopping_unit = shopping
+    _add_checked(client, household, shopping_name.format(tag=tag), shopping_quantity, shopping_unit)
+
+    response = client.post("/api/shopping-list/add-checked-to-pantry", headers=household.headers)
+    assert response.status_code == 200, response.text
+
+    rows = _pantry_rows(db, household, tag)
+    assert len(rows) == 1, "restocking created a duplicate pantry row"
+    assert _location_quantity(db, rows[0]["id"]) == pytest.approx(expected)
+
+
+def test_restock_merges_spellings_into_one_new_item(client, fakes, household):
+    db, _ = fakes
+    tag = uuid.uuid4().hex[:6]
+    _add_checked(client, household, f"{tag} Cookies", 1, "dozen")
+    _add_checked(client, household, f"{tag} cookie", 6, "each")
+
+    response = client.post("/api/shopping-list/add-checked-to-pantry", headers=household.headers)
+    assert response.status_code == 200, response.text
+
+    rows = _pantry_rows(db, household, tag)
+    assert len(rows) == 1
+    assert _location_quantity(db, rows[0]["id"]) == pytest.approx(1.5)  # dozen
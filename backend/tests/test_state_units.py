@@ -0,0 +1,126 @@
+"""
+State unit tests - Python Age 5.0
+
+Reserved quantities and shopping shortfalls add up mixed units of one
+ingredient in its base unit, and report them in the pantry's unit.
+"""
+
+from datetime import date, timedelta
+
+import pytest
+
+from models.meal_plan import MealPlan
+from models.pantry import PantryItem, PantryLocation
+from models.recipe import Recipe, RecipeIngredient
+from state_manager import HouseholdState
+from units import to_base
+
+HOUSEHOLD = "units-household"
+
+
+def _pantry(item_id, name, unit, quantity, min_threshold=0):
+    return PantryItem(
+        id=item_id, household_id=HOUSEHOLD, name=name, category="Dairy", unit=unit,
+        min_threshold=min_threshold, locations=[PantryLocation(location="Fridge", quantity=quantity)],
+    )
+
+
+def _recipe(recipe_id, *ingredients):
+    return Recipe(
+        id=recipe_id, household_id=HOUSEHOLD, name=recipe_id,
+        ingredients=[RecipeIngredient(name=name, quantity=qty, unit=unit) for name, qty, unit in ingredients],
+    )
+
+
+def _meal(meal_id, recipe_id, multiplier=1.0, days=1, cooked=False):
+    return MealPlan(
+        id=meal_id, household_id=HOUSEHOLD, date=date.today() + timedelta(days=days),
+        recipe_id=recipe_id, serving_multiplier=multiplier, cooked=cooked,
+    )
+
+
+def _state(pantry, recipes, meals):
+    return HouseholdState(HOUSEHOLD, pantry, recipes, meals)
+
+
+def _shopping(state, name):
+    return [item for item in state.shopping_list if item.name == name]
+
+
+CUP = to_base("cup")[1]
+FL_OZ = to_base("fl oz")[1]
+
+
+def test_reserved_adds_mixed_units_in_base_unit():
+    state = _state(
+        [_pantry("milk", "Milk", "l", 2)],
+        [_recipe("pancakes", ("milk", 2, "cups")), _recipe("latte", ("Milk", 8, "oz"))],
+        [_meal("m1", "pancakes"), _meal("m2", "latte", multiplier=2)],
+    )
+
+    assert set(state.reserved_ingredients) == {"milk|ml"}
+    assert state.reserved_ingredients["milk|ml"] == pytest.approx(2 * CUP + 2 * 8 * FL_OZ)
+    assert _shopping(state, "Milk") == []  # 2 l covers ~0.95 l
+
+
+def test_reserved_skips_cooked_and_past_meals():
+    state = _state(
+        [],
+        [_recipe("omelette", ("Eggs", 3, "each"))],
+        [_meal("m1", "omelette"), _meal("m2", "omelette", cooked=True), _meal("m3", "omelette", days=-1)],
+    )
+
+    assert state.reserved_ingredients == {"egg|each": 3}
+
+
+def test_meal_shortfall_reported_in_pantry_unit():
+    state = _state(
+        [_pantry("milk", "Milk", "l", 0.5)],
+        [_recipe("pancakes", ("milk", 4, "cups"))],
+        [_meal("m1", "pancakes")],
+    )
+
+    [item] = _shopping(state, "Milk")
+    assert item.unit == "l"
+    assert item.source == "Meals"
+    assert item.quantity == pytest.approx(round((4 * CUP - 500) / 1000, 2))
+
+
+def test_threshold_shortfall_across_units():
+    # 0.3 kg + 200 g = 0.5 kg on hand against a 1 kg minimum
+    state = _state(
+        [_pantry("flour-kg", "Flour", "kg", 0.3, min_threshold=1), _pantry("flour-g", "flour", "grams", 200)],
+        [],
+        [],
+    )
+
+    [item] = _shopping(state, "Flour")
+    assert item.unit == "kg"
+    assert item.source == "Threshold"
+    assert item.quantity == pytest.approx(0.5)
+
+
+def test_threshold_raises_meal_shortfall():
+    state = _state(
+        [_pantry("eggs", "Eggs", "dozen", 0.5, min_threshold=2)],
+        [_recipe("omelette", ("egg", 9, "each"))],
+        [_meal("m1", "omelette")],
+    )
+
+    # Meals need 9 - 6 = 3 eggs (0.25 dozen), the threshold needs 1.5 dozen
+    [item] = _shopping(state, "Eggs")
+    assert item.source == "Meals"
+    assert item.quantity == pytest.approx(1.5)
+
+
+def test_different_unit_families_stay_apart():
+    state = _state(
+        [_pantry("cheddar", "Cheddar", "oz", 16)],
+        [_recipe("toastie", ("cheddar", 2, "cups"))],
+        [_meal("m1", "toastie")],
+    )
+
+    assert set(state.reserved_ingredients) == {"cheddar|ml"}
+    [item] = _shopping(state, "Cheddar")
+    assert item.unit == "cups"
+    assert item.quantity == pytest.approx(2)
@@ -0,0 +1,161 @@
+"""
+Toggle buffer tests - Python Age 5.0
+
+Check-offs are coalesced per item, written in shared updates, kept
+pending until they commit, and land before any other write.
+"""
+
+import asyncio
+import uuid
+
+import pytest
+
+import toggle_buffer
+from state_manager import StateManager
+from toggle_buffer import ShoppingToggleBuffer
+
+UPDATES = "update:shopping_list_manual"
+
+
+class _Hooked:
+    """Supabase client that runs a hook before each query."""
+
+    def __init__(self, db, hook):
+        self.db, self.hook = db, hook
+
+    def table(self, name):
+        self.hook()
+        return self.db.table(name)
+
+
+@pytest.fixture
+def items(fakes):
+    """A fresh household with three unchecked manual items."""
+    db, _ = fakes
+    household_id = f"toggles-{uuid.uuid4().hex[:8]}"
+    rows = [
+        db.add_row("shopping_list_manual", {
+            "household_id": household_id, "name": f"Item {n}", "quantity": 1, "unit": "each",
+            "category": "Other", "checked": False, "checked_at": None, "checked_by": None,
+        })
+        for n in range(3)
+    ]
+    yield household_id, [row["id"] for row in rows]
+    ShoppingToggleBuffer._pending.pop(household_id, None)
+
+
+@pytest.fixture
+def no_scheduling(monkeypatch):
+    """Keep toggles pending until a test flushes them; record retries instead of running them."""
+    retries = []
+    monkeypatch.setattr(ShoppingToggleBuffer, "_schedule_flush", classmethod(lambda cls, *a, **kw: None))
+    monkeypatch.setattr(ShoppingToggleBuffer, "_schedule_retry", classmethod(lambda cls, hid: retries.append(hid)))
+    return retries
+
+
+def _row(db, item_id):
+    return next(row for row in db.rows("shopping_list_manual") if row["id"] == item_id)
+
+
+def test_last_toggle_wins(fakes, items, no_scheduling):
+    db, _ = fakes
+    household_id, (item_id, *_) = items
+
+    for checked in (True, False, True):
+        ShoppingToggleBuffer.record(household_id, item_id, checked, "user-1")
+
+    before = db.calls[UPDATES]
+    assert ShoppingToggleBuffer.flush(household_id) == 1
+    assert db.calls[UPDATES] - before == 1
+    assert _row(db, item_id)["checked"] is True
+    assert _row(db, item_id)["checked_by"] == "user-1"
+    assert not ShoppingToggleBuffer.has_pending(household_id)
+
+
+def test_burst_shares_one_update_per_group(fakes, items, no_scheduling):
+    db, _ = fakes
+    household_id, item_ids = items
+
+    for item_id in item_ids[:2]:
+        ShoppingToggleBuffer.record(household_id, item_id, True, "user-1")
+    ShoppingToggleBuffer.record(household_id, item_ids[2], False, "user-1")
+
+    # Ticks within one second share checked_at, so this is usually one update for the checks
+    # and one for the uncheck
+    groups = {tuple(update.values()) for update in ShoppingToggleBuffer._pending[household_id].values()}
+    before = db.calls[UPDATES]
+    assert ShoppingToggleBuffer.flush(household_id) == 3
+    assert db.calls[UPDATES] - before == len(groups)
+    assert [_row(db, item_id)["checked"] for item_id in item_ids] == [True, True, False]
+
+
+def test_retoggle_during_flush_stays_pending(fakes, items, no_scheduling, monkeypatch):
+    db, _ = fakes
+    household_id, (item_id, *_) = items
+    ShoppingToggleBuffer.record(household_id, item_id, True, "user-1")
+
+    def untick_once():
+        if not retoggled:
+            retoggled.append(ShoppingToggleBuffer.record(household_id, item_id, False, "user-1"))
+
+    retoggled = []
+    monkeypatch.setattr(toggle_buffer, "get_supabase", lambda: _Hooked(db, untick_once))
+    ShoppingToggleBuffer.flush(household_id)
+
+    # The first write landed, but the newer toggle wasn't forgotten with it
+    assert _row(db, item_id)["checked"] is True
+    assert ShoppingToggleBuffer._pending[household_id] == {str(item_id): retoggled[0]}
+
+    ShoppingToggleBuffer.flush(household_id)
+    assert _row(db, item_id)["checked"] is False
+    assert not ShoppingToggleBuffer.has_pending(household_id)
+
+
+def test_failed_flush_keeps_toggles_and_retries(fakes, items, no_scheduling, monkeypatch):
+    db, _ = fakes
+    household_id, (item_id, *_) = items
+    ShoppingToggleBuffer.record(household_id, item_id, True, "user-1")
+
+    def fail():
+        raise ConnectionError("database unavailable")
+
+    monkeypatch.setattr(toggle_buffer, "get_supabase", lambda: _Hooked(db, fail))
+    with pytest.raises(ConnectionError):
+        ShoppingToggleBuffer.flush(household_id)
+    assert ShoppingToggleBuffer.has_pending(household_id)
+
+    ShoppingToggleBuffer.flush_or_retry(household_id)  # doesn't raise
+    assert no_scheduling == [household_id]
+    assert ShoppingToggleBuffer.has_pending(household_id)
+    assert _row(db, item_id)["checked"] is False
+
+
+def test_pending_toggles_land_before_other_writes(fakes, items, no_scheduling):
+    db, _ = fakes
+    household_id, (item_id, *_) = items
+    ShoppingToggleBuffer.record(household_id, item_id, True, "user-1")
+
+    seen = []
+    StateManager.update_and_invalidate(household_id, lambda: seen.append(_row(db, item_id)["checked"]))
+
+    assert seen == [True]
+    assert not ShoppingToggleBuffer.has_pending(household_id)
+
+
+def test_delayed_flush_coalesces(fakes, items, monkeypatch):
+    db, _ = fakes
+    household_id, (item_id, *_) = items
+    monkeypatch.setattr(ShoppingToggleBuffer, "FLUSH_DELAY", 0.05)
+
+    async def burst():
+        for checked in (True, False, True, False, True):
+            ShoppingToggleBuffer.record(household_id, item_id, checked, "user-1")
+        assert _row(db, item_id)["checked"] is False  # acknowledged, not yet written
+        await ShoppingToggleBuffer._tasks[household_id]
+
+    before = db.calls[UPDATES]
+    asyncio.run(burst())
+
+    assert db.calls[UPDATES] - before == 1
+    assert _row(db, item_id)["checked"] is True
+    assert household_id not in ShoppingToggleBuffer._tasks
@@ -0,0 +1,43 @@
+"""
+Unit conversion tests - Python Age 5.0
+
+Families, base factors and the liquid-ounce rule in ingredient_key.
+"""
+
+import pytest
+
+from ingredients import ingredient_key
+from units import to_base
+
+
+@pytest.mark.parametrize("unit,base,factor", [
+    ("kg", "g", 1000.0),
+    ("lb", "g", 453.59237),
+    ("oz", "g", 28.349523125),
+    ("cup", "ml", 236.5882365),
+    ("fl oz", "ml", 29.5735295625),
+    ("tbsp", "ml", 14.7867647813),
+    ("dozen", "each", 12.0),
+    ("can", "can", 1.0),
+])
+def test_to_base(unit, base, factor):
+    assert to_base(unit)[0] == base
+    assert to_base(unit)[1] == pytest.approx(factor)
+
+
+def test_cups_and_ounces_of_milk_share_a_key():
+    cups_key, cup_factor = ingredient_key("Milk", "cups")
+    oz_key, oz_factor = ingredient_key("milk", "oz")
+
+    assert cups_key == oz_key == "milk|ml"
+    assert 2 * cup_factor == pytest.approx(16 * oz_factor)
+
+
+def test_ounces_of_a_solid_stay_weight():
+    assert ingredient_key("Cheddar Cheese", "oz")[0] == "cheddar cheese|g"
+    assert ingredient_key("Cheddar Cheese", "oz")[0] != ingredient_key("cheddar cheese", "cup")[0]
+
+
+def test_units_in_different_families_dont_match():
+    assert ingredient_key("flour", "cup")[0] != ingredient_key("flour", "g")[0]
+    assert ingredient_key("tomato", "can")[0] != ingredient_key("tomato", "each")[0]
@@ -0,0 +1,243 @@
+"""
+Shopping Toggle Buffer - Python Age 5.0
+
+Write-behind buffer for shopping list check-offs.
+
+In focus mode people tick items off in rapid bursts. Instead of one
+Supabase update plus a full state reload per tick, toggles are:
+- Acknowledged immediately (applied to the cached state)
+- Coalesced per item (only the last toggle is written)
+- Flushed to shopping_list_manual in batches after a bounded delay
+- Flushed before any other write, and on shutdown
+"""
+
+from typing import Dict, List, Optional
+from datetime import datetime
+from collections import defaultdict
+import asyncio
+import threading
+import logging
+import os
+
+from models.shopping import ShoppingItem
+from utils.supabase_client import get_supabase
+
+logger = logging.getLogger(__name__)
+
+
+class ShoppingToggleBuffer:
+    """
+    Pending check-offs per household, keyed by manual item id.
+
+    Only the latest toggle per item is kept, so ticking an item on and
+    off ten times costs one write.
+    """
+
+    FLUSH_DELAY = float(os.getenv("TOGGLE_FLUSH_DELAY", "2.0"))  # seconds after first toggle
+    MAX_PENDING = 50  # flush right away once a household has this many items waiting
+    MAX_RETRY_DELAY = 30.0
+
+    _pending: Dict[str, Dict[str, dict]] = defaultdict(dict)
+    _tasks: Dict[str, asyncio.Task] = {}
+    _loop: Optional[asyncio.AbstractEventLoop] = None  # for retries scheduled from other threads
+    _lock = threading.Lock()
+
+    @classmethod
+    def record(cls, household_id: str, item_id: str, checked: bool, user_id: str) -> dict:
+        """
+        Record a toggle, replacing any earlier pending toggle of the same item.
+
+        Returns:
+            The column values that will be written for this item
+        """
+        update_data = {
+            'checked': checked,
+            # Whole seconds, so a burst of ticks shares a timestamp and one update
+            'checked_at': datetime.now().isoformat(timespec='seconds') if checked else None,
+            'checked_by': user_id if checked else None
+        }
+
+        with cls._lock:
+            cls._pending[household_id][str(item_id)] = update_data
+            pending_count = len(cls._pending[household_id])
+
+        cls._schedule_flush(household_id, immediate=pending_count >= cls.MAX_PENDING)
+
+        return update_data
+
+    @classmethod
+    def apply_pending(cls, household_id: str, items: List[ShoppingItem]):
+        """Overlay toggles that haven't reached the database yet."""
+        with cls._lock:
+            pending = dict(cls._pending.get(household_id, {}))
+
+        if not pending:
+            return
+
+        for item in items:
+            update_data = pending.get(str(item.id))
+            if update_data:
+                cls.apply(item, update_data)
+
+    @staticmethod
+    def apply(item: ShoppingItem, update_data: dict):
+        """Apply a recorded toggle to an in-memory shopping item."""
+        checked_at = update_data['checked_at']
+        item.checked = update_data['checked']
+        item.checked_at = datetime.fromisoformat(checked_at) if checked_at else None
+        item.checked_by = update_data['checked_by']
+
+    @classmethod
+    def has_pending(cls, household_id: str) -> bool:
+        """Whether a household has toggles waiting to be written."""
+        with cls._lock:
+            return bool(cls._pending.get(household_id))
+
+    @classmethod
+    def flush(cls, household_id: str) -> int:
+        """
+        Write pending toggles for a household to the database.
+
+        Items with the same target values (checked, checked_at, checked_by)
+        share one update, so a burst of check-offs within a second costs
+        one write instead of one per item. Every item keeps its own
+        checked_at.
+
+        Toggles stay pending until their update has committed, so a state
+        loaded from the database in the meantime still overlays them.
+
+        Raises:
+            Exception: If an update fails (everything unwritten stays pending)
+
+        Returns:
+            Number of items written
+        """
+        with cls._lock:
+            pending = dict(cls._pending.get(household_id, {}))
+
+        if not pending:
+            return 0
+
+        groups: Dict[tuple, List[str]] = defaultdict(list)
+        for item_id, update_data in pending.items():
+            groups[(update_data['checked'], update_data['checked_at'], update_data['checked_by'])].append(item_id)
+
+        supabase = get_supabase()
+        written = 0
+
+        for (checked, checked_at, checked_by), item_ids in groups.items():
+            try:
+                supabase.table('shopping_list_manual')\
+                    .update({
+                        'checked': checked,
+                        'checked_at': checked_at,
+                        'checked_by': checked_by
+                    })\
+                    .in_('id', item_ids)\
+                    .eq('household_id', household_id)\
+                    .execute()
+            except Exception as e:
+                logger.warning(f"Toggle flush failed for household {household_id}: {e}")
+                raise
+            written += len(item_ids)
+            cls._forget(household_id, {item_id: pending[item_id] for item_id in item_ids})
+
+        logger.info("🧺 Flushed %d shopping toggles for household %s", written, household_id)
+        return written
+
+    @classmethod
+    def flush_or_retry(cls, household_id: str):
+        """
+        Flush now; if that fails, leave the toggles pending and retry in
+        the background instead of failing the caller.
+
+        Used before other writes, which shouldn't fail because a check-off
+        couldn't be written yet.
+        """
+        try:
+            cls.flush(household_id)
+        except Exception:
+            cls._schedule_retry(household_id)
+
+    @classmethod
+    def _forget(cls, household_id: str, written: Dict[str, dict]):
+        """Drop written toggles, unless the item was toggled again meanwhile."""
+        with cls._lock:
+            current = cls._pending.get(household_id)
+            if current is None:
+                return
+            for item_id, update_data in written.items():
+                if current.get(item_id) is update_data:
+                    del current[item_id]
+            if not current:
+                del cls._pending[household_id]
+
+    @classmethod
+    def flush_all(cls):
+        """Flush every household (used on shutdown)."""
+        for task in list(cls._tasks.values()):
+            task.cancel()
+        cls._tasks.clear()
+
+        with cls._lock:
+            household_ids = list(cls._pending.keys())
+
+        for household_id in household_ids:
+            try:
+                cls.flush(household_id)
+            except Exception:
+                logger.error(f"Dropping unflushed shopping toggles for household {household_id}")
+
+    # ===== SCHEDULING =====
+
+    @classmethod
+    def _schedule_flush(cls, household_id: str, immediate: bool = False):
+        """Start a delayed flush unless one is already waiting."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, shutdown) - write through
+            cls.flush(household_id)
+            return
+        cls._loop = loop
+
+        task = cls._tasks.get(household_id)
+        if task and not task.done():
+            if not immediate:
+                return
+            task.cancel()
+
+        delay = 0 if immediate else cls.FLUSH_DELAY
+        cls._tasks[household_id] = loop.create_task(cls._flush_later(household_id, delay))
+
+    @classmethod
+    def _schedule_retry(cls, household_id: str):
+        """Schedule a delayed flush from any thread (no write-through)."""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            loop = cls._loop
+            if loop is None or loop.is_closed():
+                logger.error(f"No event loop to retry shopping toggles for household {household_id}")
+                return
+            loop.call_soon_threadsafe(cls._schedule_flush, household_id)
+            return
+        cls._schedule_flush(household_id)
+
+    @classmethod
+    async def _flush_later(cls, household_id: str, delay: float):
+        """Flush after a delay, backing off while the database is unavailable."""
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await asyncio.to_thread(cls.flush, household_id)
+            except Exception:
+                delay = min(max(delay, cls.FLUSH_DELAY) * 2, cls.MAX_RETRY_DELAY)
+                continue
+
+            if not cls.has_pending(household_id):
+                break
+            delay = cls.FLUSH_DELAY
+
+        if cls._tasks.get(household_id) is asyncio.current_task():
+            del cls._tasks[household_id]
@@ -0,0 +1,77 @@
+"""
+Unit Conversion - Python Age 5.0
+
+"2 cup milk" in a recipe and "1 l milk" in the pantry are the same
+ingredient. Units are compiled into a small graph of families:
+
+- mass   (base g):    mg, g, kg, oz, lb
+- volume (base ml):   ml, l, tsp, tbsp, fl oz, cup, pint, quart, gallon
+- count  (base each): each, dozen
+
+State calculations convert every quantity to its family's base unit once
+at load time, so the hot loops only multiply floats. Units outside these
+families (can, bunch, clove, ...) stay as they are and only match
+themselves. "oz" is weight here. ingredients.ingredient_key reads it as
+"fl oz" for liquids.
+
+Units here are canonical (see ingredients.normalize_unit).
+"""
+
+from typing import Dict, Tuple
+
+# Edges: (unit, other unit, how many "other" make one "unit")
+UNIT_EDGES = [
+    # mass
+    ("kg", "g", 1000.0),
+    ("g", "mg", 1000.0),
+    ("lb", "oz", 16.0),
+    ("oz", "g", 28.349523125),
+    # volume
+    ("l", "ml", 1000.0),
+    ("gallon", "quart", 4.0),
+    ("quart", "pint", 2.0),
+    ("pint", "cup", 2.0),
+    ("cup", "fl oz", 8.0),
+    ("fl oz", "tbsp", 2.0),
+    ("tbsp", "tsp", 3.0),
+    ("cup", "ml", 236.5882365),
+    # count
+    ("dozen", "each", 12.0),
+]
+
+BASE_UNITS = ("g", "ml", "each")
+
+
+def _compile(edges) -> Dict[str, Tuple[str, float]]:
+    """Walk the graph from each base unit: unit -> (base unit, base units per unit)."""
+    neighbours = {}
+    for unit, other, factor in edges:
+        neighbours.setdefault(unit, []).append((other, factor))
+        neighbours.setdefault(other, []).append((unit, 1.0 / factor))
+
+    compiled = {}
+    for base in BASE_UNITS:
+        compiled[base] = (base, 1.0)
+        queue = [base]
+        while queue:
+            unit = queue.pop()
+            for other, factor in neighbours.get(unit, ()):
+                if other not in compiled:
+                    # 1 other = (1 / factor) unit = (1 / factor) * to_base(unit)
+                    compiled[other] = (base, compiled[unit][1] / factor)
+                    queue.append(other)
+    return compiled
+
+
+# Every convertible unit -> (base unit, factor), built once at import
+BASE_FACTORS: Dict[str, Tuple[str, float]] = _compile(UNIT_EDGES)
+
+
+def to_base(unit: str) -> Tuple[str, float]:
+    """
+    Base unit and factor for a canonical unit.
+
+    Returns:
+        (base unit, base units per 1 unit); unknown units map to themselves
+    """
+    return BASE_FACTORS.get(unit, (unit, 1.0))
@@ -3,12 +3,15 @@ Chef's Kiss - Utilities
 Python Age 5.0
 """
 
-from .supabase_client import get_supabase, supabase
+from .supabase_client import get_supabase
+from .redis_client import get_redis
 from .auth import get_current_user, get_current_household
+from .memberships import MembershipCache
 
 __all__ = [
     'get_supabase',
-    'supabase',
+    'get_redis',
     'get_current_user',
     'get_current_household',
+    'MembershipCache',
 ]
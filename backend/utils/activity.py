@@ -0,0 +1,79 @@
+"""
+Household Activity - Python Age 5.0
+
+Which households were active recently. They are kept in a Redis sorted
+set that maps household id to last-seen time (unix seconds). The cache
+warmup (warmup.py) reads it to preload the states people are about to
+ask for.
+
+Activity is recorded when a request resolves its household. Warmup
+loads go through StateManager directly, so they don't count. Recording
+is throttled per process: a household is written at most once per
+ACTIVITY_RECORD_INTERVAL, so a busy household costs one ZADD a minute
+rather than one per request.
+"""
+
+from typing import Dict, List
+import logging
+import os
+import threading
+import time
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_KEY = "active_households"
+ACTIVITY_RECORD_INTERVAL = 60  # seconds between writes for one household
+ACTIVITY_WINDOW = float(os.getenv("ACTIVITY_WINDOW_HOURS", "24")) * 3600
+MAX_TRACKED = 10000  # bound on the throttle table
+
+_last_recorded: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+def record_active(household_id: str):
+    """Mark a household as active now (throttled, never raises)."""
+    now = time.monotonic()
+    with _lock:
+        last = _last_recorded.get(household_id)
+        if last is not None and now - last < ACTIVITY_RECORD_INTERVAL:
+            return
+        if len(_last_recorded) >= MAX_TRACKED:
+            _last_recorded.clear()
+        _last_recorded[household_id] = now
+
+    redis_client = get_redis()
+    if not redis_client:
+        return
+    try:
+        redis_client.zadd(ACTIVE_KEY, {household_id: time.time()})
+    except Exception as e:
+        logger.warning(f"Could not record activity for household {household_id}: {e}")
+
+
+def recent_households(limit: int, window: float = ACTIVITY_WINDOW) -> List[str]:
+    """
+    Most recently active households, newest first.
+
+    Entries older than the window are trimmed along the way.
+
+    Args:
+        limit: Maximum number of household ids
+        window: How far back to look, in seconds
+
+    Returns:
+        Household ids ([] when Redis is unavailable)
+    """
+    redis_client = get_redis()
+    if not redis_client:
+        return []
+
+    cutoff = time.time() - window
+    try:
+        redis_client.zremrangebyscore(ACTIVE_KEY, "-inf", cutoff)
+        members = redis_client.zrevrangebyscore(ACTIVE_KEY, "+inf", cutoff, start=0, num=limit)
+    except Exception as e:
+        logger.warning(f"Could not read recently active households: {e}")
+        return []
+    return [member.decode() if isinstance(member, bytes) else member for member in members]
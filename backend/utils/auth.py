@@ -8,54 +8,252 @@ from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from typing import Optional
+import asyncio
+import hashlib
+import json
+import logging
 import os
+import threading
+import time
+import urllib.request
 from dotenv import load_dotenv
 
 from .supabase_client import get_supabase
+from .memberships import MembershipCache
+from .activity import record_active
+from .timing import cache_tier, phase
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", os.getenv("JWT_SECRET_KEY"))
+JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+# Public keys for asymmetric (RS256/ES256) tokens, cached on disk
+JWKS_FILE = os.getenv(
+    "SUPABASE_JWKS_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".jwks_cache.json")
+)
+JWKS_URL = os.getenv(
+    "SUPABASE_JWKS_URL",
+    f"{os.getenv('SUPABASE_URL', '').rstrip('/')}/auth/v1/.well-known/jwks.json"
+)
+JWKS_REFRESH_INTERVAL = 300  # don't refetch more often than this on unknown kids
+# Opt-in: ask Supabase when a token can't be checked locally
+AUTH_REMOTE_FALLBACK = os.getenv("AUTH_REMOTE_FALLBACK", "false").lower() == "true"
+
+HMAC_ALGORITHMS = ("HS256",)
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+CLAIMS_CACHE_MAX = 10000
+
 security = HTTPBearer()
 
 
+class UnverifiableToken(Exception):
+    """No local key can check this token (unknown alg or kid)."""
+
+
+# ===== LOCAL VERIFICATION =====
+
+class _KeyStore:
+    """
+    JWKS keys by kid: memory -> JWKS file -> Supabase.
+
+    get() never touches the disk or network. refresh() does, so the
+    async path runs it in a thread (see _ensure_signing_key).
+    """
+
+    _keys = None
+    _fetched_at = 0.0
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, kid: Optional[str]) -> Optional[dict]:
+        return (cls._keys or {}).get(kid)
+
+    @classmethod
+    def needs_refresh(cls, kid: Optional[str]) -> bool:
+        """Nothing loaded yet, or an unknown kid (rotation) and the last fetch is old enough."""
+        keys = cls._keys
+        return keys is None or (kid not in keys and time.time() - cls._fetched_at > JWKS_REFRESH_INTERVAL)
+
+    @classmethod
+    def refresh(cls, kid: Optional[str]):
+        """Load the JWKS file, then fetch from Supabase if kid is still unknown (blocking)."""
+        with cls._lock:
+            if cls._keys is None:
+                cls._keys = cls._read_file()
+
+            if kid not in cls._keys and time.time() - cls._fetched_at > JWKS_REFRESH_INTERVAL:
+                # New signing key (rotation) or nothing cached yet
+                cls._fetched_at = time.time()
+                fetched = cls._fetch()
+                if fetched:
+                    cls._keys = fetched
+
+    @staticmethod
+    def _index(jwks: dict) -> dict:
+        return {key.get('kid'): key for key in jwks.get('keys', [])}
+
+    @classmethod
+    def _read_file(cls) -> dict:
+        try:
+            with open(JWKS_FILE) as f:
+                return cls._index(json.load(f))
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable JWKS file {JWKS_FILE}: {e}")
+            return {}
+
+    @classmethod
+    def _fetch(cls) -> Optional[dict]:
+        if not JWKS_URL.startswith("http"):
+            return None
+        try:
+            with urllib.request.urlopen(JWKS_URL, timeout=3) as response:
+                jwks = json.load(response)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not fetch JWKS from {JWKS_URL}: {e}")
+            return None
+
+        try:
+            with open(JWKS_FILE, 'w') as f:
+                json.dump(jwks, f)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write JWKS file {JWKS_FILE}: {e}")
+
+        logger.info(f"🔑 Loaded {len(jwks.get('keys', []))} signing keys from JWKS")
+        return cls._index(jwks)
+
+
+# token hash -> (user, exp)
+_claims_cache = {}
+
+
+def verify_token_locally(token: str) -> dict:
+    """
+    Check signature, expiry and audience without calling Supabase.
+
+    Raises:
+        JWTError: Token is invalid or expired
+        UnverifiableToken: No local key for this token
+
+    Returns:
+        dict: Verified claims
+    """
+    header = jwt.get_unverified_header(token)
+    algorithm = header.get('alg')
+
+    if algorithm in HMAC_ALGORITHMS and JWT_SECRET:
+        key = JWT_SECRET
+    elif algorithm in ASYMMETRIC_ALGORITHMS:
+        if _KeyStore.needs_refresh(header.get('kid')):
+            _KeyStore.refresh(header.get('kid'))
+        key = _KeyStore.get(header.get('kid'))
+        if key is None:
+            raise UnverifiableToken(f"no JWKS key for kid {header.get('kid')}")
+    else:
+        raise UnverifiableToken(f"no local key for alg {algorithm}")
+
+    return jwt.decode(
+        token,
+        key,
+        algorithms=[algorithm],
+        audience=JWT_AUDIENCE,
+        # A signed token without exp would never expire
+        options={"verify_aud": bool(JWT_AUDIENCE), "require_exp": True}
+    )
+
+
+async def _ensure_signing_key(token: str):
+    """Load or fetch the JWKS key for an asymmetric token off the event loop."""
+    try:
+        header = jwt.get_unverified_header(token)
+    except JWTError:
+        return  # verify_token_locally reports it
+    kid = header.get('kid')
+    if header.get('alg') in ASYMMETRIC_ALGORITHMS and _KeyStore.needs_refresh(kid):
+        await asyncio.to_thread(_KeyStore.refresh, kid)
+
+
+def _user_from_claims(token: str) -> dict:
+    """Verified user for a token, cached until the token expires."""
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    now = time.time()
+
+    cached = _claims_cache.get(cache_key)
+    if cached and cached[1] > now:
+        cache_tier("token", "cache")
+        return cached[0]
+
+    cache_tier("token", "verify")
+    claims = verify_token_locally(token)
+    user = {
+        "id": claims['sub'],
+        "email": claims.get('email'),
+        "role": claims.get('role')
+    }
+
+    if len(_claims_cache) >= CLAIMS_CACHE_MAX:
+        for key in [k for k, (_, exp) in _claims_cache.items() if exp <= now]:
+            del _claims_cache[key]
+        if len(_claims_cache) >= CLAIMS_CACHE_MAX:
+            _claims_cache.clear()
+
+    _claims_cache[cache_key] = (user, claims.get('exp', now))
+    return user
+
+
+def _user_from_supabase(token: str) -> dict:
+    """Validate token with the Supabase API (network round trip)."""
+    user_response = get_supabase().auth.get_user(token)
+
+    if not user_response or not user_response.user:
+        raise JWTError("Supabase rejected token")
+
+    user = user_response.user
+    return {
+        "id": user.id,
+        "email": user.email,
+        "role": user.role if hasattr(user, 'role') else None
+    }
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> dict:
     """
-    Validate JWT token using Supabase API and return user info.
+    Validate JWT token and return user info.
+
+    Tokens are verified locally (HS256 with SUPABASE_JWT_SECRET, RS256/ES256
+    with the JWKS keys; exp is required) and cached until they expire.
+    Fetching the JWKS happens in a thread, not on the event loop. With
+    AUTH_REMOTE_FALLBACK=true, tokens that can't be checked locally are
+    sent to Supabase instead.
 
     Raises:
         HTTPException: If token is invalid or expired
 
     Returns:
-        dict: User info from Supabase
+        dict: User info (id, email, role)
     """
     token = credentials.credentials
-    supabase = get_supabase()
 
     try:
-        # Use Supabase API to validate token (works with any algorithm)
-        user_response = supabase.auth.get_user(token)
-
-        if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token"
-            )
-
-        user = user_response.user
-
-        return {
-            "id": user.id,
-            "email": user.email,
-            "role": user.role if hasattr(user, 'role') else None
-        }
+        with phase("auth"):
+            await _ensure_signing_key(token)
+            try:
+                return _user_from_claims(token)
+            except UnverifiableToken as e:
+                if not AUTH_REMOTE_FALLBACK:
+                    raise JWTError(str(e))
+                logger.info(f"🔁 Verifying token with Supabase ({e})")
+                cache_tier("token", "remote")
+                return _user_from_supabase(token)
 
     except Exception as e:
         # Log the error for debugging
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Token validation failed: {str(e)}")
 
         raise HTTPException(
@@ -64,6 +262,23 @@ async def get_current_user(
         )
 
 
+async def is_household_member(authorization: Optional[str], household_id: str) -> bool:
+    """
+    Whether an Authorization header carries a valid token for a member of
+    household_id. For middleware, which runs before the route's auth
+    dependencies. Never raises.
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        await _ensure_signing_key(token)
+        user = _user_from_claims(token)
+        return household_id in MembershipCache.household_ids(user['id'])
+    except Exception:
+        return False
+
+
 async def get_current_household(
     request: Request,
     user: dict = Depends(get_current_user)
@@ -74,6 +289,8 @@ async def get_current_household(
     Supports multi-household via X-Household-Id header.
     If header is provided and user is a member, use that household.
     Otherwise fall back to the user's first household.
+    Memberships come from MembershipCache (no query on the hot path).
+    The household is recorded as recently active, for the cache warmup.
 
     Raises:
         HTTPException: If user has no household
@@ -81,31 +298,28 @@ async def get_current_household(
     Returns:
         str: Household ID (UUID)
     """
-    supabase = get_supabase()
-
     # Check for explicit household selection via header
     requested_hid = request.headers.get('X-Household-Id')
 
     # Get all household memberships
-    response = supabase.table('household_members')\
-        .select('household_id')\
-        .eq('user_id', user['id'])\
-        .execute()
+    with phase("members"):
+        member_hids = MembershipCache.household_ids(user['id'])
 
-    if not response.data:
+    if not member_hids:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User is not part of any household"
         )
 
-    member_hids = [m['household_id'] for m in response.data]
-
     # If a specific household was requested, verify membership
     if requested_hid and requested_hid in member_hids:
-        return requested_hid
+        household_id = requested_hid
+    else:
+        # Default to first household
+        household_id = member_hids[0]
 
-    # Default to first household
-    return member_hids[0]
+    record_active(household_id)
+    return household_id
 
 
 async def get_optional_household(
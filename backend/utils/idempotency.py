@@ -0,0 +1,161 @@
+"""
+Idempotency Keys - Python Age 5.0
+
+On flaky mobile networks the frontend retries POSTs. Without protection
+every retry inserts another row and reloads the whole state.
+
+Clients send an Idempotency-Key header (any unique string, e.g. a UUID
+generated once per user action). The first request runs normally and its
+response is kept in Redis for a short while. Retries with the same key
+get the stored response back without touching Supabase.
+
+A failed request releases its key so the client can retry, unless it
+raised CommittedError: part of it was written, so the error response is
+stored and replayed like a success rather than applied twice.
+"""
+
+from fastapi import Header, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from typing import Optional
+import functools
+import hashlib
+import json
+import logging
+import os
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "600"))  # keep results 10 minutes
+IDEMPOTENCY_LOCK_TTL = 60  # a crashed request stops blocking retries after this
+
+
+class CommittedError(HTTPException):
+    """An error response for a request that already changed some data."""
+
+
+async def get_idempotency_key(
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+) -> Optional[str]:
+    """Dependency for the optional Idempotency-Key header."""
+    return idempotency_key
+
+
+def idempotent(scope: str):
+    """
+    Make a POST endpoint replay its stored result for repeated keys.
+
+    The endpoint must take `household_id` and `idempotency_key`
+    parameters. All other parameters (body, query) are fingerprinted so a
+    key reused for a different request is rejected.
+
+    Example:
+        @router.post("/")
+        @idempotent("pantry:add")
+        async def add_pantry_item(item, idempotency_key = Depends(get_idempotency_key), ...):
+
+    Args:
+        scope: Name for the operation (keys are per household + scope)
+    """
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            key = kwargs.get('idempotency_key')
+            redis_client = get_redis()
+
+            if not key or not redis_client:
+                return await endpoint(*args, **kwargs)
+
+            household_id = kwargs['household_id']
+            record_key = f"idem:{household_id}:{scope}:{key}"
+            fingerprint = _fingerprint(kwargs)
+
+            try:
+                claimed = redis_client.set(
+                    record_key,
+                    json.dumps({"status": "pending", "fingerprint": fingerprint}),
+                    nx=True,
+                    ex=IDEMPOTENCY_LOCK_TTL
+                )
+            except Exception as e:
+                logger.warning(f"Idempotency store unavailable, running request: {e}")
+                return await endpoint(*args, **kwargs)
+
+            if not claimed:
+                return _replay(redis_client, record_key, fingerprint)
+
+            try:
+                result = await endpoint(*args, **kwargs)
+            except CommittedError as e:
+                # Partly applied - a retry must not apply it again
+                _store(redis_client, record_key, fingerprint, {"detail": jsonable_encoder(e.detail)}, e.status_code)
+                raise
+            except Exception:
+                # Let the client retry a failed request
+                _forget(redis_client, record_key)
+                raise
+
+            body = jsonable_encoder(result)
+            _store(redis_client, record_key, fingerprint, body)
+            return body
+
+        return wrapper
+    return decorator
+
+
+def _replay(redis_client, record_key: str, fingerprint: str):
+    """Answer a repeated key from the stored record."""
+    raw = redis_client.get(record_key)
+    if raw is None:
+        # Expired between SET NX and GET - treat as in progress, client retries
+        raw = json.dumps({"status": "pending", "fingerprint": fingerprint})
+    record = json.loads(raw)
+
+    if record["fingerprint"] != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request"
+        )
+
+    if record["status"] != "done":
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still in progress"
+        )
+
+    logger.info(f"♻️ Replaying stored response for {record_key}")
+    return JSONResponse(
+        content=record["body"],
+        status_code=record.get("status_code", status.HTTP_200_OK),
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+
+def _store(redis_client, record_key: str, fingerprint: str, body, status_code: int = status.HTTP_200_OK):
+    try:
+        redis_client.set(
+            record_key,
+            json.dumps({"status": "done", "fingerprint": fingerprint, "body": body, "status_code": status_code}),
+            ex=IDEMPOTENCY_TTL
+        )
+    except Exception as e:
+        logger.warning(f"Could not store idempotent result: {e}")
+
+
+def _forget(redis_client, record_key: str):
+    try:
+        redis_client.delete(record_key)
+    except Exception as e:
+        logger.warning(f"Could not release idempotency key: {e}")
+
+
+def _fingerprint(kwargs: dict) -> str:
+    """Hash of the request parameters (minus the key and household)."""
+    params = {
+        name: value for name, value in kwargs.items()
+        if name not in ('idempotency_key', 'household_id')
+    }
+    payload = json.dumps(jsonable_encoder(params), sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
@@ -0,0 +1,148 @@
+"""
+Cache Invalidation Broadcast - Python Age 5.0
+
+With several workers (WEB_CONCURRENCY > 1) or several containers, each
+process keeps its own in-process caches: recipe search and autocomplete
+indexes, the membership cache, and so on. Redis is shared, but those
+caches are not. When one worker invalidates a household, the others
+have to hear about it.
+
+broadcast(kind, key) does two things. It runs this worker's handlers
+right away, and it PUBLISHes the event on a Redis channel. Every
+worker runs a listener thread subscribed to that channel, which runs
+its own handlers for events that came from other workers. Delivery is
+typically well under a millisecond.
+
+Caches register what to drop:
+
+    on_invalidate("state", RecipeSearchIndex.forget)
+
+A handler gets the key (household or user id), or None for "drop
+everything". The listener sends None when it (re)subscribes, because
+events published while it was disconnected were missed.
+"""
+
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from .redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache:invalidate"
+CACHE_BROADCAST = os.getenv("CACHE_BROADCAST", "true").lower() == "true"
+WORKER_ID = uuid.uuid4().hex  # tells our own messages apart from other workers'
+
+# kind -> [(handler, remote_only)]
+_handlers: Dict[str, List[Tuple[Callable[[Optional[str]], None], bool]]] = defaultdict(list)
+
+_listener: Optional[threading.Thread] = None
+_stop = threading.Event()
+
+
+def on_invalidate(kind: str, handler: Callable[[Optional[str]], None], remote_only: bool = False):
+    """
+    Register a handler for invalidations of one kind ("state", "members").
+
+    Args:
+        kind: Event kind
+        handler: Called with the key, or None to drop everything
+        remote_only: Only run for events from other workers
+    """
+    _handlers[kind].append((handler, remote_only))
+
+
+def broadcast(kind: str, key: str):
+    """Drop key from this worker's caches now, and tell the other workers."""
+    _run_handlers(kind, key, remote=False)
+
+    redis_client = get_redis()
+    if not CACHE_BROADCAST or not redis_client:
+        return
+    try:
+        redis_client.publish(CHANNEL, json.dumps({"kind": kind, "key": key, "origin": WORKER_ID}))
+    except Exception as e:
+        logger.warning(f"⚠️ Could not broadcast {kind} invalidation for {key}: {e}")
+
+
+def _run_handlers(kind: str, key: Optional[str], remote: bool):
+    for handler, remote_only in _handlers.get(kind, []):
+        if remote_only and not remote:
+            continue
+        try:
+            handler(key)
+        except Exception as e:
+            logger.warning(f"Invalidation handler {handler.__qualname__} failed for {key}: {e}")
+
+
+# ===== LISTENER =====
+
+def start_listener():
+    """Start the subscriber thread (once per process, from the lifespan)."""
+    global _listener
+    if not CACHE_BROADCAST or (_listener is not None and _listener.is_alive()):
+        return
+    _stop.clear()
+    _listener = threading.Thread(target=_listen, name="cache-invalidation", daemon=True)
+    _listener.start()
+
+
+def stop_listener():
+    global _listener
+    _stop.set()
+    if _listener is not None:
+        _listener.join(timeout=2)
+        _listener = None
+
+
+def _listen():
+    delay = 1.0
+    while not _stop.is_set():
+        redis_client = get_redis()
+        if redis_client is None:
+            # Caching is off - wait for the Redis supervisor to reconnect
+            _stop.wait(delay)
+            continue
+
+        pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(CHANNEL)
+            # Anything published while we weren't subscribed is lost
+            for kind in list(_handlers):
+                _run_handlers(kind, None, remote=True)
+            logger.info(f"📡 Listening for cache invalidations (worker {WORKER_ID[:8]})")
+            delay = 1.0
+
+            while not _stop.is_set() and get_redis() is redis_client:
+                message = pubsub.get_message(timeout=1.0)
+                if message:
+                    _handle_message(message)
+        except Exception as e:
+            logger.warning(f"⚠️ Invalidation listener lost Redis, resubscribing: {e}")
+            _stop.wait(delay)
+            delay = min(delay * 2, 30.0)
+        finally:
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+
+
+def _handle_message(message: dict):
+    try:
+        event = json.loads(message["data"])
+    except (TypeError, ValueError):
+        return
+    if event.get("origin") == WORKER_ID:
+        return
+
+    started = time.perf_counter()
+    _run_handlers(event.get("kind"), event.get("key"), remote=True)
+    logger.debug("Applied remote %s invalidation for %s in %.2f ms",
+                 event.get("kind"), event.get("key"), (time.perf_counter() - started) * 1000)
@@ -0,0 +1,122 @@
+"""
+Log Pipeline - Python Age 5.0
+
+Logging off the event loop. Every handler (ours and uvicorn's) sits
+behind one in-memory queue: a log call on the hot path only puts the
+record on the queue, and a background thread formats it and writes it
+to stdout.
+
+Records are queued unformatted, so hot-path calls use lazy %-style
+arguments (logger.info("💰 Cache HIT for household %s", household_id)).
+The message is only built on the listener thread, and never for levels
+that are filtered out. Pass immutable arguments (ids, counts), because
+formatting happens a moment later.
+
+If the queue fills up (LOG_QUEUE_SIZE), new records are dropped rather
+than blocking a request; logs_dropped_total counts them.
+
+Per-household sampling: the per-request state messages (cache hit/miss,
+recalculation) are logged for a LOG_SAMPLE_RATE share of households
+(default 0.1). The choice is a stable hash, so a sampled household's
+story is complete. Counts stay exact in /metrics (cache_lookups_total,
+state_calculate_seconds_count).
+"""
+
+from typing import List, Optional
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import zlib
+
+from .metrics import LOGS_DROPPED
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_QUEUE = os.getenv("LOG_QUEUE", "true").lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+
+# Loggers that bring their own handlers (uvicorn sets these up before importing the app)
+OWN_HANDLER_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class _DeferredHandler(logging.handlers.QueueHandler):
+    """Queue a record for the listener, remembering which handlers it's for."""
+
+    def __init__(self, records: queue.Queue, targets: List[logging.Handler]):
+        super().__init__(records)
+        self.targets = targets
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler.prepare, don't format here - that's the listener's job
+        record.deferred_to = self.targets
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOGS_DROPPED.inc()
+
+
+class _Dispatcher(logging.Handler):
+    """Listener side: hand each record to the handlers it was queued for."""
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        for handler in record.deferred_to:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
+def configure_logging(level: int = logging.INFO):
+    """
+    Set up logging for the app (call once, at import).
+
+    Root gets a stdout handler (like logging.basicConfig). With LOG_QUEUE
+    on, root's and uvicorn's handlers are moved behind the queue.
+    """
+    global _listener
+
+    root = logging.getLogger()
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(level)
+
+    if not LOG_QUEUE or _listener is not None:
+        return
+
+    records: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    for logger in [root] + [logging.getLogger(name) for name in OWN_HANDLER_LOGGERS]:
+        targets = list(logger.handlers)
+        if not targets:
+            continue
+        for handler in targets:
+            logger.removeHandler(handler)
+        logger.addHandler(_DeferredHandler(records, targets))
+
+    _listener = logging.handlers.QueueListener(records, _Dispatcher())
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Write out whatever is still queued and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_sampled(household_id: Optional[str]) -> bool:
+    """Whether per-request messages for this household should be logged."""
+    if LOG_SAMPLE_RATE >= 1:
+        return True
+    if LOG_SAMPLE_RATE <= 0 or not household_id:
+        return False
+    return zlib.crc32(household_id.encode()) % 10000 < LOG_SAMPLE_RATE * 10000
@@ -0,0 +1,142 @@
+"""
+Household Memberships - Python Age 5.0
+
+Every authenticated request resolves the user's household. Memberships
+almost never change, so they're cached per user: in process first, then
+Redis, then the household_members table.
+
+Anything that adds or removes a membership (signup, accepting an invite,
+leaving a household) must call MembershipCache.invalidate(user_id).
+"""
+
+from typing import List, Optional
+import json
+import logging
+import os
+import threading
+import time
+
+from .supabase_client import get_supabase
+from .redis_client import get_redis
+from .timing import cache_tier
+from .metrics import CACHE_INVALIDATIONS
+from .invalidation import broadcast, on_invalidate
+
+logger = logging.getLogger(__name__)
+
+
+class MembershipCache:
+    """
+    User -> [{"household_id", "role"}] in the order the database returns them
+    (the first one is the default household).
+    """
+
+    LOCAL_TTL = int(os.getenv("MEMBERSHIP_LOCAL_TTL", "30"))  # safety net if a broadcast is missed
+    REDIS_TTL = int(os.getenv("MEMBERSHIP_CACHE_TTL", "600"))
+
+    _local = {}  # user_id -> (memberships, expires_at)
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _redis_key(user_id: str) -> str:
+        return f"members:{user_id}"
+
+    @classmethod
+    def get(cls, user_id: str) -> List[dict]:
+        """
+        Get a user's memberships.
+
+        Args:
+            user_id: User UUID
+
+        Returns:
+            List of {"household_id", "role"} dicts (empty if none)
+        """
+        now = time.monotonic()
+        with cls._lock:
+            cached = cls._local.get(user_id)
+        if cached and cached[1] > now:
+            cache_tier("members", "local")
+            return cached[0]
+
+        memberships = cls._from_redis(user_id)
+        if memberships is not None:
+            cache_tier("members", "redis")
+        else:
+            cache_tier("members", "db")
+            response = get_supabase().table('household_members')\
+                .select('household_id, role')\
+                .eq('user_id', user_id)\
+                .execute()
+            memberships = [
+                {"household_id": m['household_id'], "role": m.get('role')}
+                for m in response.data
+            ]
+            cls._to_redis(user_id, memberships)
+
+        with cls._lock:
+            cls._local[user_id] = (memberships, now + cls.LOCAL_TTL)
+        return memberships
+
+    @classmethod
+    def household_ids(cls, user_id: str) -> List[str]:
+        """Household IDs for a user, default household first."""
+        return [m['household_id'] for m in cls.get(user_id)]
+
+    @classmethod
+    def role(cls, user_id: str, household_id: str) -> Optional[str]:
+        """User's role in a household (None if not a member)."""
+        for membership in cls.get(user_id):
+            if membership['household_id'] == household_id:
+                return membership['role'] or 'member'
+        return None
+
+    @classmethod
+    def invalidate(cls, user_id: str):
+        """Forget a user's memberships (call after any membership change)."""
+        CACHE_INVALIDATIONS.inc("members")
+
+        redis_client = get_redis()
+        if redis_client:
+            try:
+                redis_client.delete(cls._redis_key(user_id))
+            except Exception as e:
+                logger.warning(f"⚠️ Could not invalidate memberships for {user_id}: {e}")
+
+        # This worker's local copy, and every other worker's
+        broadcast("members", user_id)
+        logger.info(f"🗑️ Membership cache invalidated for user {user_id}")
+
+    @classmethod
+    def forget_local(cls, user_id: Optional[str]):
+        """Drop the in-process copy for a user (None drops everyone)."""
+        with cls._lock:
+            if user_id is None:
+                cls._local.clear()
+            else:
+                cls._local.pop(user_id, None)
+
+    @classmethod
+    def _from_redis(cls, user_id: str) -> Optional[List[dict]]:
+        redis_client = get_redis()
+        if not redis_client:
+            return None
+        try:
+            raw = redis_client.get(cls._redis_key(user_id))
+        except Exception as e:
+            logger.warning(f"⚠️ Membership cache read failed: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    @classmethod
+    def _to_redis(cls, user_id: str, memberships: List[dict]):
+        redis_client = get_redis()
+        if not redis_client:
+            return
+        try:
+            redis_client.setex(cls._redis_key(user_id), cls.REDIS_TTL, json.dumps(memberships))
+        except Exception as e:
+            logger.warning(f"⚠️ Membership cache write failed: {e}")
+
+
+on_invalidate("members", MembershipCache.forget_local)
@@ -0,0 +1,234 @@
+"""
+Metrics - Python Age 5.0
+
+Minimal Prometheus-style registry behind GET /metrics: counters and
+histograms with labels, rendered in the text exposition format.
+
+Recording never takes a lock (apart from a thread's very first
+record). Every thread writes to its own shard (a plain dict), and a
+scrape sums the shards. The event loop thread and
+each threadpool worker therefore never contend, and an increment is a
+dict lookup plus an add.
+
+Exported:
+- http_request_duration_seconds{method,route,status}
+- state_calculate_seconds, state_load_table_seconds{table}
+- state_blob_bytes
+- cache_lookups_total{cache,tier}, cache_invalidations_total{cache}
+- supabase_requests_total{table,outcome}, supabase_request_seconds{table}
+- logs_dropped_total
+"""
+
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+import threading
+import time
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Response adds the charset
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(10))  # 1 KB .. 256 MB
+
+
+class _Shards:
+    """Per-thread dicts; only the owning thread writes to its shard."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._live: List[Tuple[threading.Thread, dict]] = []
+        self._retired: dict = {}  # folded-in shards of threads that have exited
+        self._lock = threading.Lock()  # taken on a thread's first record and on scrape
+
+    def mine(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._lock:
+                self._live.append((threading.current_thread(), shard))
+        return shard
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            # Short-lived threads (timers, flushes) would pile up shards forever
+            for thread, shard in [entry for entry in self._live if not entry[0].is_alive()]:
+                _merge_into(self._retired, shard)
+                self._live.remove((thread, shard))
+            return [self._retired.copy()] + [shard.copy() for _, shard in self._live]
+
+
+def _merge_into(target: dict, shard: dict):
+    for key, value in shard.items():
+        if isinstance(value, list):
+            existing = target.get(key)
+            target[key] = list(value) if existing is None else [a + b for a, b in zip(existing, value)]
+        else:
+            target[key] = target.get(key, 0.0) + value
+
+
+_shards = _Shards()
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        REGISTRY.append(self)
+
+    def inc(self, *label_values: str, amount: float = 1.0):
+        shard = _shards.mine()
+        key = (self, label_values)
+        shard[key] = shard.get(key, 0.0) + amount
+
+    def render(self, shards: List[dict]) -> List[str]:
+        totals: Dict[tuple, float] = {}
+        for shard in shards:
+            for (metric, label_values), value in shard.items():
+                if metric is self:
+                    totals[label_values] = totals.get(label_values, 0.0) + value
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(totals.items()):
+            lines.append(f"{self.name}{_labels(self.labels, label_values)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self.buckets = buckets
+        REGISTRY.append(self)
+
+    def observe(self, value: float, *label_values: str):
+        shard = _shards.mine()
+        key = (self, label_values)
+        series = shard.get(key)
+        if series is None:
+            # one count per bucket (+Inf last), then sum
+            series = shard[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *label_values: str) -> "_Timer":
+        """Context manager that observes the block's duration in seconds."""
+        return _Timer(self, label_values)
+
+    def render(self, shards: List[dict]) -> List[str]:
+        totals: Dict[tuple, list] = {}
+        for shard in shards:
+            for (metric, label_values), series in shard.items():
+                if metric is self:
+                    series = list(series)
+                    merged = totals.get(label_values)
+                    totals[label_values] = series if merged is None else [a + b for a, b in zip(merged, series)]
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(totals.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), series):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labels + ('le',), label_values + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, label_values)} {_number(series[-1])}")
+            lines.append(f"{self.name}_count{_labels(self.labels, label_values)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "label_values", "started")
+
+    def __init__(self, histogram: Histogram, label_values: tuple):
+        self.histogram = histogram
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.label_values)
+        return False
+
+
+REGISTRY: List = []
+
+
+# ===== METRICS =====
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route template",
+    ("method", "route", "status")
+)
+CALCULATE_SECONDS = Histogram("state_calculate_seconds", "HouseholdState.calculate_all duration")
+LOAD_TABLE_SECONDS = Histogram(
+    "state_load_table_seconds", "StateManager._load_from_database query time per table", ("table",)
+)
+STATE_BLOB_BYTES = Histogram("state_blob_bytes", "Pickled household state size", buckets=SIZE_BUCKETS)
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total", "Cache lookups by the tier that answered (db/verify = miss)", ("cache", "tier")
+)
+CACHE_INVALIDATIONS = Counter("cache_invalidations_total", "Cache invalidations", ("cache",))
+SUPABASE_REQUESTS = Counter(
+    "supabase_requests_total", "Supabase round trips by table/function and outcome", ("table", "outcome")
+)
+SUPABASE_SECONDS = Histogram("supabase_request_seconds", "Supabase round-trip latency", ("table",))
+LOGS_DROPPED = Counter("logs_dropped_total", "Log records dropped because the log queue was full")
+
+
+def render() -> str:
+    """Every metric in the Prometheus text format."""
+    shards = _shards.snapshot()
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render(shards))
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware: observe request latency per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Templates ("/api/recipes/{recipe_id}") keep label cardinality bounded
+            route = scope.get("route")
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                scope.get("method", ""),
+                getattr(route, "path", "unmatched"),
+                str(status_code)
+            )
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
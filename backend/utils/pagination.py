@@ -0,0 +1,108 @@
+"""
+List Pagination - Python Age 5.0
+
+Cursor pagination and field projection for the big list endpoints
+(recipes, pantry, meal plans), served straight from the cached state.
+
+- ?limit=N          page size (omit for the whole list, as before)
+- ?cursor=...       next_cursor from the previous page
+- ?fields=id,name   only these fields per row (id is always included)
+
+Rows are ordered by a stable key (name or date, then id), so pages stay
+consistent while items are added or removed. Only the rows on the page
+are serialized.
+"""
+
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from typing import Callable, List, Optional, Set, Tuple
+import base64
+import bisect
+import json
+
+
+class PageParams(BaseModel):
+    """Pagination/projection options from the query string"""
+    cursor: Optional[str] = None
+    limit: Optional[int] = None
+    fields: Optional[Set[str]] = None
+
+    @property
+    def paginated(self) -> bool:
+        return self.limit is not None or self.cursor is not None
+
+
+def get_page_params(
+    cursor: Optional[str] = Query(None, max_length=500),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    fields: Optional[str] = Query(None, max_length=500)
+) -> PageParams:
+    """Dependency for ?cursor=&limit=&fields=."""
+    field_set = None
+    if fields:
+        field_set = {name.strip() for name in fields.split(',') if name.strip()}
+    return PageParams(cursor=cursor, limit=limit, fields=field_set)
+
+
+def encode_cursor(key: tuple) -> str:
+    """Opaque cursor for a sort key (tuple of strings)."""
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(key, list) and key and all(isinstance(part, str) for part in key):
+            return tuple(key)
+    except (ValueError, TypeError):
+        pass
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+
+def paginate(
+    entities: list,
+    sort_key: Callable[[object], tuple],
+    params: PageParams,
+    model_fields: Set[str]
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Page and project a list of models.
+
+    Args:
+        entities: Models from the state (e.g. state.recipes)
+        sort_key: Stable ordering key, must end with the entity id
+        params: PageParams from get_page_params
+        model_fields: Fields the model has (to validate ?fields=)
+
+    Returns:
+        (serialized rows, next_cursor or None)
+    """
+    include = None
+    if params.fields:
+        unknown = params.fields - model_fields
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+        include = params.fields | {"id"}
+
+    if not params.paginated:
+        return [entity.model_dump(include=include) for entity in entities], None
+
+    keyed = sorted((sort_key(entity), entity) for entity in entities)
+    keys = [key for key, _ in keyed]
+
+    start = 0
+    if params.cursor:
+        start = bisect.bisect_right(keys, decode_cursor(params.cursor))
+
+    end = len(keyed) if params.limit is None else start + params.limit
+    page = keyed[start:end]
+
+    next_cursor = encode_cursor(page[-1][0]) if page and end < len(keyed) else None
+    return [entity.model_dump(include=include) for _, entity in page], next_cursor
@@ -0,0 +1,190 @@
+"""
+Request Profiling - Python Age 5.0
+
+A slow household is hard to reproduce locally because its data is
+private. Instead, profile the real request where it runs. A sampling
+profiler watches one request and stores its stacks in collapsed format
+(one "frame;frame;frame count" line per distinct stack). flamegraph.pl,
+speedscope and inferno all read that format.
+
+Opt-in and admin-only. Nothing runs unless PROFILE_TOKEN is set. When it
+is, a request is profiled if:
+- it sends X-Profile: <PROFILE_TOKEN>, or
+- its X-Household-Id is listed in PROFILE_HOUSEHOLDS (comma-separated)
+  and its bearer token belongs to a member of that household (checked
+  here, before the route's own auth, so an anonymous caller naming an
+  allowlisted household isn't profiled)
+
+The response carries an X-Profile-Id header. Download the stacks from
+GET /debug/profiles/{id} with Authorization: Bearer <PROFILE_TOKEN>.
+
+Sampling happens on a background thread that reads the serving thread's
+stack every PROFILE_INTERVAL_MS (5 ms by default), so the request itself
+runs unchanged. Requests are async: anything else the event loop runs at
+the same moment also lands in the samples, so profile a quiet worker
+when that matters.
+"""
+
+from collections import Counter, OrderedDict
+from typing import Optional
+import hmac
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+
+from .redis_client import get_redis
+from .auth import is_household_member
+
+logger = logging.getLogger(__name__)
+
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_HOUSEHOLDS = {
+    household.strip() for household in os.getenv("PROFILE_HOUSEHOLDS", "").split(",") if household.strip()
+}
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_TTL = int(os.getenv("PROFILE_TTL", "86400"))  # keep profiles a day
+MAX_PROFILE_SECONDS = 30  # stop sampling a request that hangs
+LOCAL_PROFILES = 32  # kept in-process when Redis is down
+
+
+class StackSampler:
+    """Sample one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> "StackSampler":
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed (folded) format, most frequent first."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def _run(self):
+        deadline = time.perf_counter() + MAX_PROFILE_SECONDS
+        while not self._stop.wait(self.interval) and time.perf_counter() < deadline:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+                self.samples += 1
+
+
+def _collapse(frame) -> str:
+    names = []
+    while frame is not None:
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+# ===== STORAGE =====
+
+_local: "OrderedDict[str, dict]" = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def save_profile(profile_id: str, record: dict):
+    """Keep a profile in Redis (any worker can serve it) and in this process."""
+    with _local_lock:
+        _local[profile_id] = record
+        while len(_local) > LOCAL_PROFILES:
+            _local.popitem(last=False)
+
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            redis_client.setex(f"profile:{profile_id}", PROFILE_TTL, json.dumps(record))
+        except Exception as e:
+            logger.warning(f"Could not store profile {profile_id}: {e}")
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    with _local_lock:
+        record = _local.get(profile_id)
+    if record is not None:
+        return record
+
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            data = redis_client.get(f"profile:{profile_id}")
+            if data:
+                return json.loads(data)
+        except Exception as e:
+            logger.warning(f"Could not read profile {profile_id}: {e}")
+    return None
+
+
+def is_admin_token(value: Optional[str]) -> bool:
+    return bool(PROFILE_TOKEN and value) and hmac.compare_digest(value, PROFILE_TOKEN)
+
+
+# ===== MIDDLEWARE =====
+
+class ProfilerMiddleware:
+    """ASGI middleware: sample the requests that ask for it (see module docstring)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILE_TOKEN:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        household_id = headers.get(b"x-household-id", b"").decode("latin-1")
+        requested = is_admin_token(headers.get(b"x-profile", b"").decode("latin-1"))
+        if not requested and not (
+            household_id in PROFILE_HOUSEHOLDS
+            and await is_household_member(headers.get(b"authorization", b"").decode("latin-1"), household_id)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident()).start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            sampler.stop()
+            save_profile(profile_id, {
+                "id": profile_id,
+                "method": scope.get("method"),
+                "path": scope.get("path"),
+                "household_id": household_id or None,
+                "status": status_code,
+                "duration_ms": round(sampler.duration * 1000, 2),
+                "interval_ms": round(sampler.interval * 1000, 2),
+                "samples": sampler.samples,
+                "created_at": time.time(),
+                "stacks": sampler.collapsed(),
+            })
+            logger.info(f"🔬 Profiled {scope.get('method')} {scope.get('path')} "
+                        f"({sampler.samples} samples) -> /debug/profiles/{profile_id}")
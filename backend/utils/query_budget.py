@@ -0,0 +1,98 @@
+"""
+Query Budgets - Python Age 5.0
+
+A route that queries once per item (N+1) is quick in development with
+three items and slow in production with three hundred. Each route
+declares how many Supabase round trips it may make, and the budget is a
+constant: it must not grow with the payload.
+
+Round trips are counted by the instrumented client (TimedClient in
+utils/supabase_client.py) - the same number Server-Timing reports as
+db;desc="N calls". Only the endpoint body counts; auth dependencies
+run before it.
+
+QUERY_BUDGET_MODE:
+- strict: exceeding a budget raises QueryBudgetExceeded (a 500) - the
+          default in development, the load test and tests/, so
+          regressions fail (after the endpoint ran - writes are done)
+- warn:   log a warning and carry on (default everywhere else)
+- off:    don't check
+"""
+
+from typing import Optional
+import functools
+import logging
+import math
+import os
+
+from .timing import current_timings
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_MODE = os.getenv(
+    "QUERY_BUDGET_MODE",
+    "strict" if os.getenv("ENVIRONMENT") in ("development", "test") else "warn"
+).lower()
+
+# What a full state load costs (pantry_items, recipes, meal_plans, shopping_list_manual)
+STATE_LOAD_QUERIES = 4
+# Pending check-offs are flushed before a write: one update per (checked, checked_at, checked_by)
+# group. checked_at is in whole seconds and toggles wait at most TOGGLE_FLUSH_DELAY, so
+# check-offs span that many seconds (+1), plus one group of unchecks
+TOGGLE_FLUSH_QUERIES = math.ceil(float(os.getenv("TOGGLE_FLUSH_DELAY", "2.0"))) + 2
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A route made more Supabase round trips than it declared."""
+
+
+def query_budget(queries: int, mutation: bool = False):
+    """
+    Declare how many Supabase round trips an endpoint may make.
+
+    Put it directly under the @router decorator so idempotent replays
+    (which don't query) are measured too.
+
+    Example:
+        @router.post("/add-checked-to-pantry")
+        @query_budget(4, mutation=True)
+        async def add_checked_to_pantry(...):
+
+    Args:
+        queries: Round trips the endpoint makes itself (reads and writes),
+            on top of loading state
+        mutation: The endpoint writes through update_and_invalidate, so it
+            may also flush pending toggles and load state a second time
+            for the response
+    """
+    limit = queries + STATE_LOAD_QUERIES
+    if mutation:
+        limit += STATE_LOAD_QUERIES + TOGGLE_FLUSH_QUERIES
+
+    def decorator(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timings = current_timings()
+            if timings is None or QUERY_BUDGET_MODE == "off":
+                return await endpoint(*args, **kwargs)
+
+            before = timings.counts.get("db", 0)
+            result = await endpoint(*args, **kwargs)
+            check_budget(endpoint.__name__, timings.counts.get("db", 0) - before, limit)
+            return result
+
+        wrapper.query_budget = limit
+        return wrapper
+
+    return decorator
+
+
+def check_budget(name: str, used: int, limit: int, mode: Optional[str] = None):
+    """Warn about (or, in strict mode, fail) a route that went over budget."""
+    if used <= limit:
+        return
+
+    message = f"{name} made {used} Supabase round trips (budget {limit})"
+    if (mode or QUERY_BUDGET_MODE) == "strict":
+        raise QueryBudgetExceeded(message)
+    logger.warning(f"🐢 Query budget exceeded: {message}")
@@ -0,0 +1,145 @@
+"""
+Redis Client - Python Age 5.0
+
+Shared Redis connection for state caching and short-lived records
+(idempotency keys, etc.). Redis is optional: while it's unreachable,
+get_redis() returns None and callers fall back to the database.
+
+Nothing connects at import. The app's lifespan starts supervise_redis(),
+which connects in the background (retrying with backoff if Redis is
+down at boot), pings it every REDIS_HEALTH_INTERVAL seconds, and turns
+caching off when Redis goes away and back on when it returns.
+"""
+
+from typing import Optional
+import asyncio
+import logging
+import os
+import random
+import time
+
+import redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REDIS_RETRY_MIN = 1.0  # seconds before the first reconnect attempt
+REDIS_RETRY_MAX = 60.0
+REDIS_HEALTH_INTERVAL = float(os.getenv("REDIS_HEALTH_INTERVAL", "15"))
+
+# Cached copies of database rows; invalidations sent while Redis was
+# unreachable were lost, so these are dropped when it comes back
+DERIVED_KEY_PATTERNS = ("state:*", "settings:*", "members:*")
+
+redis_client: Optional[redis.Redis] = None
+_was_connected = False
+
+
+def _build_client() -> redis.Redis:
+    """Client object only - redis-py doesn't connect until the first command."""
+    # Railway provides REDIS_URL, local dev uses localhost
+    redis_url = os.getenv('REDIS_URL')
+
+    if redis_url:
+        # Railway/production environment
+        logger.info("🔗 Connecting to Redis via REDIS_URL...")
+        return redis.from_url(
+            redis_url,
+            decode_responses=False,  # We use pickle for complex objects
+            socket_connect_timeout=2
+        )
+
+    # Local development
+    logger.info("🔗 Connecting to Redis on localhost...")
+    return redis.Redis(
+        host='localhost',
+        port=6379,
+        db=0,
+        decode_responses=False,
+        socket_connect_timeout=2
+    )
+
+
+def connect_redis() -> bool:
+    """
+    Try to connect once (blocking). Enables caching on success.
+
+    Returns:
+        Whether Redis is now available
+    """
+    global redis_client, _was_connected
+
+    try:
+        client = _build_client()
+        client.ping()
+    except (redis.ConnectionError, redis.TimeoutError) as e:
+        logger.warning(f"⚠️ Redis not available - caching disabled: {e}")
+        return False
+
+    if _was_connected:
+        _drop_derived_keys(client)
+    redis_client = client
+    _was_connected = True
+    logger.info("✅ Redis connected successfully")
+    return True
+
+
+async def supervise_redis():
+    """
+    Keep the Redis connection alive for the life of the app.
+
+    Run as a background task from the lifespan; cancel it on shutdown.
+    """
+    global redis_client
+
+    delay = REDIS_RETRY_MIN
+    while True:
+        if redis_client is None:
+            if await asyncio.to_thread(connect_redis):
+                delay = REDIS_RETRY_MIN
+                continue
+            # Jittered so several workers don't retry in lockstep
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, REDIS_RETRY_MAX)
+            continue
+
+        await asyncio.sleep(REDIS_HEALTH_INTERVAL)
+        client = redis_client
+        if client is None:
+            continue
+        try:
+            await asyncio.to_thread(client.ping)
+        except (redis.ConnectionError, redis.TimeoutError) as e:
+            if redis_client is client:
+                redis_client = None
+                logger.warning(f"⚠️ Redis lost - caching disabled until it's back: {e}")
+
+
+def _drop_derived_keys(client: redis.Redis):
+    """Forget cached rows that may have missed invalidations during an outage."""
+    started = time.perf_counter()
+    dropped = 0
+    try:
+        for pattern in DERIVED_KEY_PATTERNS:
+            batch = []
+            for key in client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    dropped += client.delete(*batch)
+                    batch = []
+            if batch:
+                dropped += client.delete(*batch)
+    except redis.RedisError as e:
+        logger.warning(f"Could not clear cached state after reconnecting: {e}")
+        return
+    logger.info(f"🧹 Dropped {dropped} cached entries after Redis outage "
+                f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """
+    Get Redis client instance (None when caching is disabled).
+    """
+    return redis_client
@@ -0,0 +1,65 @@
+"""
+Mutation Responses - Python Age 5.0
+
+Mutation endpoints support ?return=full|delta|none:
+- full:  the complete sections (default, what the frontend has always used)
+- delta: only added/changed/removed entities plus the new state version
+- none:  just the result (no state reload at all)
+"""
+
+from fastapi import Query
+from typing import List, Optional
+
+from state_manager import StateManager, HouseholdState
+
+RETURN_MODE_PATTERN = "^(full|delta|none)$"
+
+def get_return_mode(
+    return_mode: str = Query("full", alias="return", pattern=RETURN_MODE_PATTERN)
+) -> str:
+    """Dependency for the ?return= query parameter."""
+    return return_mode
+
+
+def capture_previous(household_id: str, return_mode: str) -> Optional[HouseholdState]:
+    """Grab the state before a change (only needed for delta responses)."""
+    if return_mode == "delta":
+        return StateManager.get_state(household_id)
+    return None
+
+
+def mutation_response(
+    household_id: str,
+    return_mode: str,
+    sections: List[str],
+    previous: Optional[HouseholdState] = None,
+    state: Optional[HouseholdState] = None,
+    **extra
+) -> dict:
+    """
+    Build the response for a mutation endpoint.
+
+    Args:
+        household_id: Household that changed
+        return_mode: full, delta or none
+        sections: State sections this endpoint reports
+        previous: State from before the change (required for delta)
+        state: Fresh state if the caller already has it
+        **extra: Endpoint-specific fields (id, message, ...)
+
+    Returns:
+        Response dict
+    """
+    if return_mode == "none":
+        return {**extra, "status": "ok"}
+
+    state = state or StateManager.get_state(household_id)
+    response = {**extra, "version": state.version}
+
+    if return_mode == "delta" and previous is not None:
+        response["delta"] = state.diff(previous, sections)
+        return response
+
+    for section in sections:
+        response[section] = state.serialize_section(section)
+    return response
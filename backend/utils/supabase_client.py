@@ -3,12 +3,20 @@ Supabase Client - Python Age 5.0
 
 Connection to Supabase for database operations.
 Python handles all logic, Supabase handles storage.
+
+The client is created on first use (or by the app's lifespan at
+startup), not at import.
 """
 
 from supabase import create_client, Client
+from typing import Optional
 import os
+import threading
 from dotenv import load_dotenv
 
+from .timing import count, phase
+from .metrics import SUPABASE_REQUESTS, SUPABASE_SECONDS
+
 load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
@@ -20,8 +28,74 @@ if not SUPABASE_URL or not SUPABASE_KEY:
         "Please set SUPABASE_URL and SUPABASE_SERVICE_KEY in .env file"
     )
 
-# Initialize Supabase client (singleton)
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Supabase client (singleton, see connect_supabase)
+supabase: Optional[Client] = None
+_connect_lock = threading.Lock()
+
+
+def connect_supabase() -> Client:
+    """Create the shared client if it doesn't exist yet."""
+    global supabase
+    if supabase is None:
+        with _connect_lock:
+            if supabase is None:
+                supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return supabase
+
+
+class _TimedQuery:
+    """Wraps a query builder so execute() is timed and counted (per request and in /metrics)."""
+
+    __slots__ = ("_builder", "_label")
+
+    def __init__(self, builder, label: str):
+        self._builder = builder
+        self._label = label
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            # Filters/modifiers return the next builder - keep wrapping
+            return _TimedQuery(result, self._label) if hasattr(result, "execute") else result
+        return chained
+
+    def execute(self):
+        count("db")
+        with phase("db"), SUPABASE_SECONDS.time(self._label):
+            try:
+                response = self._builder.execute()
+            except Exception:
+                SUPABASE_REQUESTS.inc(self._label, "error")
+                raise
+        SUPABASE_REQUESTS.inc(self._label, "ok")
+        return response
+
+
+class TimedClient:
+    """
+    Supabase client that records every round trip in the request timings
+    (see utils/timing.py). Everything except table()/rpc() is passed
+    straight through.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def table(self, name: str):
+        return _TimedQuery(self.client.table(name), name)
+
+    def rpc(self, fn: str, params: dict = None):
+        return _TimedQuery(self.client.rpc(fn, params or {}), f"rpc:{fn}")
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+_timed_client = None
 
 
 def get_supabase() -> Client:
@@ -29,4 +103,8 @@ def get_supabase() -> Client:
     Get Supabase client instance.
     Use this in API endpoints for dependency injection.
     """
-    return supabase
+    global _timed_client
+    client = supabase or connect_supabase()
+    if _timed_client is None or _timed_client.client is not client:
+        _timed_client = TimedClient(client)
+    return _timed_client
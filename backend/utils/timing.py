@@ -0,0 +1,192 @@
+"""
+Request Timing - Python Age 5.0
+
+Where did a slow request spend its time? Every request gets a
+RequestTimings (via a context variable) that the hot paths add to:
+
+- phases:   auth, members, redis, unpickle, load, calc, pickle, db
+- counters: Supabase round trips (db)
+- tiers:    which cache answered (state=redis|db, members=local|redis|db,
+            token=cache|verify|remote)
+
+ServerTimingMiddleware sends them back as a Server-Timing header (shown
+in the browser's network panel) and writes one JSON log line per
+request on the "timing" logger.
+
+Outside a request (background flushes, scripts) the hooks are no-ops.
+"""
+
+from contextvars import ContextVar
+from typing import Dict, Optional
+import json
+import logging
+import os
+import time
+
+from .metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger("timing")
+
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING", "true").lower() == "true"
+TIMING_LOG = os.getenv("TIMING_LOG", "true").lower() == "true"
+
+
+class RequestTimings:
+    """Phase durations, counters and cache tiers for one request."""
+
+    __slots__ = ("started", "phases", "counts", "tiers")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}  # name -> total ms
+        self.counts: Dict[str, int] = {}
+        self.tiers: Dict[str, str] = {}
+
+    def add(self, name: str, ms: float):
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms: float) -> str:
+        """Server-Timing header value."""
+        entries = []
+        for name, ms in self.phases.items():
+            entry = f"{name};dur={ms:.2f}"
+            if name in self.counts:
+                entry += f';desc="{self.counts[name]} calls"'
+            entries.append(entry)
+        if self.tiers:
+            entries.append('cache;desc="' + " ".join(f"{k}={v}" for k, v in self.tiers.items()) + '"')
+        entries.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+class _Phase:
+    __slots__ = ("name", "timings", "started")
+
+    def __init__(self, name: str, timings: RequestTimings):
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+class _NoPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_PHASE = _NoPhase()
+
+
+def phase(name: str):
+    """
+    Time a block as part of the current request.
+
+    Example:
+        with phase("unpickle"):
+            state = pickle.loads(data)
+    """
+    timings = _current.get()
+    if timings is None:
+        return _NO_PHASE
+    return _Phase(name, timings)
+
+
+def count(name: str, n: int = 1):
+    """Count an event (e.g. a Supabase round trip) for the current request."""
+    timings = _current.get()
+    if timings is not None:
+        timings.counts[name] = timings.counts.get(name, 0) + n
+
+
+def cache_tier(cache: str, tier: str):
+    """Record which tier answered a cache lookup ("state", "redis")."""
+    CACHE_LOOKUPS.inc(cache, tier)
+    timings = _current.get()
+    if timings is not None:
+        timings.tiers[cache] = tier
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI middleware: collect timings per request, add the Server-Timing
+    header and log a JSON summary.
+
+    Plain ASGI (not BaseHTTPMiddleware) so it adds no extra task or
+    body buffering - the overhead is a few perf_counter() calls.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if SERVER_TIMING_HEADER:
+                    header = timings.server_timing(timings.elapsed_ms()).encode("latin-1")
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [(b"server-timing", header)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if TIMING_LOG and logger.isEnabledFor(logging.INFO):
+                log_request(scope, status_code, timings)
+
+
+class _JsonLine:
+    """Serialized when the log handler formats it (off the event loop)."""
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: dict):
+        self.fields = fields
+
+    def __str__(self) -> str:
+        return json.dumps(self.fields, separators=(",", ":"))
+
+
+def log_request(scope, status_code: int, timings: RequestTimings):
+    """One structured line per request."""
+    logger.info("%s", _JsonLine({
+        "event": "request",
+        "method": scope.get("method"),
+        "path": scope.get("path"),
+        "status": status_code,
+        "total_ms": round(timings.elapsed_ms(), 2),
+        "phases": {name: round(ms, 2) for name, ms in timings.phases.items()},
+        "counts": timings.counts,
+        "cache": timings.tiers,
+    }))
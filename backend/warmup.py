@@ -0,0 +1,143 @@
+"""
+Cache Warmup - Python Age 5.0
+
+After a deploy, every household starts cold. Its first request pays
+for the whole load (4 queries plus calculate_all). The warmup loads
+the states of recently active households (utils/activity.py) into
+Redis before they ask for them.
+
+- At startup (WARMUP_ON_STARTUP, on by default), once Redis is up.
+  With WARMUP_WAIT_SECONDS > 0, startup waits for the warmup to finish,
+  or for the wait to run out. A platform that routes traffic on
+  readiness then sends it to a warm instance.
+- Every WARMUP_INTERVAL seconds, if set (0 = off). An interval below
+  StateManager.CACHE_TTL keeps active households warm between visits.
+
+At most WARMUP_CONCURRENCY loads run at once, so a warmup doesn't
+flood Supabase. Households that are already cached are skipped. A
+short Redis lock means only one worker warms at a time.
+"""
+
+from typing import Optional
+import asyncio
+import logging
+import os
+import time
+
+from state_manager import StateManager
+from utils.activity import recent_households
+from utils.invalidation import WORKER_ID
+from utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() == "true"
+WARMUP_LIMIT = int(os.getenv("WARMUP_LIMIT", "200"))  # households per pass
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "4"))
+WARMUP_INTERVAL = float(os.getenv("WARMUP_INTERVAL", "0"))
+WARMUP_WAIT_SECONDS = float(os.getenv("WARMUP_WAIT_SECONDS", "0"))
+REDIS_WAIT = 30.0  # give up on the startup pass if Redis isn't up by then
+LOCK_KEY = "warmup:lock"
+LOCK_TTL = 300
+
+last_warmup: Optional[dict] = None  # reported by /health
+
+
+async def warm_households(limit: int = WARMUP_LIMIT, concurrency: int = WARMUP_CONCURRENCY) -> dict:
+    """
+    Load recently active households' states into the cache.
+
+    Args:
+        limit: Maximum number of households to consider
+        concurrency: Maximum number of state loads at once
+
+    Returns:
+        Summary: loaded/cached/failed counts and duration, or why it was skipped
+    """
+    global last_warmup
+
+    redis_client = get_redis()
+    if not redis_client:
+        return {"skipped": "redis unavailable"}
+    if not await asyncio.to_thread(redis_client.set, LOCK_KEY, WORKER_ID, nx=True, ex=LOCK_TTL):
+        return {"skipped": "another worker is warming"}
+
+    started = time.perf_counter()
+    try:
+        household_ids = await asyncio.to_thread(recent_households, limit)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def warm(household_id: str) -> str:
+            async with semaphore:
+                return await asyncio.to_thread(_warm_one, household_id)
+
+        outcomes = await asyncio.gather(*(warm(household_id) for household_id in household_ids))
+    finally:
+        await asyncio.to_thread(_release_lock, redis_client)
+
+    summary = {
+        "households": len(household_ids),
+        "loaded": outcomes.count("loaded"),
+        "cached": outcomes.count("cached"),
+        "failed": outcomes.count("failed"),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "finished_at": time.time(),
+    }
+    last_warmup = summary
+    logger.info(f"🔥 Warmed {summary['loaded']} households in {summary['duration_ms']} ms "
+                f"({summary['cached']} already cached, {summary['failed']} failed)")
+    return summary
+
+
+def _warm_one(household_id: str) -> str:
+    if StateManager.is_cached(household_id):
+        return "cached"
+    try:
+        StateManager.get_state(household_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not warm household {household_id}: {e}")
+        return "failed"
+    return "loaded"
+
+
+def _release_lock(redis_client):
+    try:
+        if redis_client.get(LOCK_KEY) == WORKER_ID.encode():
+            redis_client.delete(LOCK_KEY)
+    except Exception as e:
+        logger.warning(f"Could not release warmup lock: {e}")
+
+
+async def run_warmups(startup_done: asyncio.Event):
+    """
+    Background task: the startup pass, then the scheduled ones.
+
+    Run from the lifespan and cancel it on shutdown. startup_done is set
+    once the startup pass is over (or skipped).
+    """
+    try:
+        if WARMUP_ON_STARTUP and await _wait_for_redis(REDIS_WAIT):
+            await _warm_logged()
+    finally:
+        startup_done.set()
+
+    while WARMUP_INTERVAL > 0:
+        await asyncio.sleep(WARMUP_INTERVAL)
+        await _warm_logged()
+
+
+async def _warm_logged():
+    try:
+        await warm_households()
+    except Exception as e:
+        logger.warning(f"⚠️ Cache warmup failed: {e}")
+
+
+async def _wait_for_redis(timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while get_redis() is None:
+        if time.monotonic() >= deadline:
+            logger.info("Skipping cache warmup - Redis isn't available")
+            return False
+        await asyncio.sleep(0.5)
+    return True
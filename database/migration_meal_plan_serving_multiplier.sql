@@ -0,0 +1,25 @@
+-- Chef's Kiss - Meal Plan Serving Multiplier Migration
+-- Persists the serving multiplier so scaled meals reserve the right amounts
+
+-- ============================================
+-- meal_plans.serving_multiplier
+-- ============================================
+-- MealPlanCreate/MealPlanUpdate accept serving_multiplier (0 < x <= 10),
+-- but the column did not exist so every meal was planned at 1x.
+
+ALTER TABLE meal_plans
+  ADD COLUMN IF NOT EXISTS serving_multiplier NUMERIC NOT NULL DEFAULT 1
+  CHECK (serving_multiplier > 0 AND serving_multiplier <= 10);
+
+-- ============================================
+-- Verify migration
+-- ============================================
+
+SELECT
+  column_name,
+  data_type,
+  is_nullable,
+  column_default
+FROM information_schema.columns
+WHERE table_name = 'meal_plans'
+  AND column_name = 'serving_multiplier';
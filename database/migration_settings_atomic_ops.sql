@@ -0,0 +1,157 @@
+-- Chef's Kiss - Atomic Household Settings Operations
+-- Server-side JSONB edits so concurrent setting changes can't overwrite each other
+
+-- ============================================
+-- Why
+-- ============================================
+-- Adding/removing a location or category used to read the whole JSONB
+-- array, change it in Python and write it back (two round trips). Two
+-- people editing at once lost one of the changes. Each function below
+-- is a single statement on a locked row and returns the new settings.
+-- Rows are created with the table defaults if they don't exist yet.
+--
+-- The functions run with the caller's rights (household_settings RLS
+-- still applies) and only the backend's service role may call them:
+-- PostgREST would otherwise expose them to the public anon key.
+
+-- ============================================
+-- Add a location or category (no duplicates)
+-- ============================================
+-- p_field: 'locations' or 'categories'
+-- p_emoji: optional, only used for categories
+
+CREATE OR REPLACE FUNCTION settings_add_item(
+  p_household_id UUID,
+  p_field TEXT,
+  p_value TEXT,
+  p_emoji TEXT DEFAULT NULL
+)
+RETURNS household_settings AS $$
+DECLARE
+  v_settings household_settings;
+BEGIN
+  IF p_field NOT IN ('locations', 'categories') THEN
+    RAISE EXCEPTION 'Unknown settings field: %', p_field;
+  END IF;
+
+  INSERT INTO household_settings (household_id)
+  VALUES (p_household_id)
+  ON CONFLICT (household_id) DO NOTHING;
+
+  UPDATE household_settings
+  SET
+    locations = CASE
+      WHEN p_field = 'locations' AND NOT (COALESCE(locations, '[]'::jsonb) ? p_value)
+        THEN COALESCE(locations, '[]'::jsonb) || to_jsonb(p_value)
+      ELSE locations
+    END,
+    categories = CASE
+      WHEN p_field = 'categories' AND NOT (COALESCE(categories, '[]'::jsonb) ? p_value)
+        THEN COALESCE(categories, '[]'::jsonb) || to_jsonb(p_value)
+      ELSE categories
+    END,
+    category_emojis = CASE
+      WHEN p_field = 'categories' AND COALESCE(p_emoji, '') <> ''
+        THEN COALESCE(category_emojis, '{}'::jsonb) || jsonb_build_object(p_value, p_emoji)
+      ELSE category_emojis
+    END
+  WHERE household_id = p_household_id
+  RETURNING * INTO v_settings;
+
+  RETURN v_settings;
+END;
+$$ LANGUAGE plpgsql SECURITY INVOKER SET search_path = public;
+
+-- ============================================
+-- Remove a location or category
+-- ============================================
+-- Removing a category also drops its emoji
+
+CREATE OR REPLACE FUNCTION settings_remove_item(
+  p_household_id UUID,
+  p_field TEXT,
+  p_value TEXT
+)
+RETURNS household_settings AS $$
+DECLARE
+  v_settings household_settings;
+BEGIN
+  IF p_field NOT IN ('locations', 'categories') THEN
+    RAISE EXCEPTION 'Unknown settings field: %', p_field;
+  END IF;
+
+  INSERT INTO household_settings (household_id)
+  VALUES (p_household_id)
+  ON CONFLICT (household_id) DO NOTHING;
+
+  UPDATE household_settings
+  SET
+    locations = CASE
+      WHEN p_field = 'locations' THEN COALESCE(locations, '[]'::jsonb) - p_value
+      ELSE locations
+    END,
+    categories = CASE
+      WHEN p_field = 'categories' THEN COALESCE(categories, '[]'::jsonb) - p_value
+      ELSE categories
+    END,
+    category_emojis = CASE
+      WHEN p_field = 'categories' THEN COALESCE(category_emojis, '{}'::jsonb) - p_value
+      ELSE category_emojis
+    END
+  WHERE household_id = p_household_id
+  RETURNING * INTO v_settings;
+
+  RETURN v_settings;
+END;
+$$ LANGUAGE plpgsql SECURITY INVOKER SET search_path = public;
+
+-- ============================================
+-- Set (or clear) a category emoji
+-- ============================================
+-- An empty p_emoji removes the mapping
+
+CREATE OR REPLACE FUNCTION settings_set_emoji(
+  p_household_id UUID,
+  p_category TEXT,
+  p_emoji TEXT
+)
+RETURNS household_settings AS $$
+DECLARE
+  v_settings household_settings;
+BEGIN
+  INSERT INTO household_settings (household_id)
+  VALUES (p_household_id)
+  ON CONFLICT (household_id) DO NOTHING;
+
+  UPDATE household_settings
+  SET category_emojis = CASE
+    WHEN COALESCE(p_emoji, '') = '' THEN COALESCE(category_emojis, '{}'::jsonb) - p_category
+    ELSE COALESCE(category_emojis, '{}'::jsonb) || jsonb_build_object(p_category, p_emoji)
+  END
+  WHERE household_id = p_household_id
+  RETURNING * INTO v_settings;
+
+  RETURN v_settings;
+END;
+$$ LANGUAGE plpgsql SECURITY INVOKER SET search_path = public;
+
+-- ============================================
+-- Backend only
+-- ============================================
+
+REVOKE EXECUTE ON FUNCTION settings_add_item(UUID, TEXT, TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION settings_remove_item(UUID, TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION settings_set_emoji(UUID, TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+
+GRANT EXECUTE ON FUNCTION settings_add_item(UUID, TEXT, TEXT, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION settings_remove_item(UUID, TEXT, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION settings_set_emoji(UUID, TEXT, TEXT) TO service_role;
+
+-- ============================================
+-- Verify migration
+-- ============================================
+
+SELECT routine_name
+FROM information_schema.routines
+WHERE routine_name IN ('settings_add_item', 'settings_remove_item', 'settings_set_emoji')
+ORDER BY routine_name;